@@ -0,0 +1,116 @@
+"""Thông lượng Tầng 3 (Enigma) của TripleBlockCipher: từng byte vs cả buffer.
+
+    python benchmarks/bench_tbc.py [--sizes 1024,65536,1048576]
+
+Nếu load được tbc.dll thì đo TripleBlockCipher.encrypt thật (vòng lặp
+EnigmaMachine_process từng byte so với đường bulk). Không có DLL thì đo
+trên một EnigmaMachine giả lập cùng layout: vòng lặp Python từng byte so
+với _EnigmaTier.process. Chi phí mỗi byte của đường bulk phải gần như không
+đổi theo kích thước, không còn bị overhead của interpreter chi phối.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from tbcryptography import _compat, backends
+from tbcryptography.tbcomplex import tbc as tbc_module
+
+def synthetic_snapshot(seed: int = 0) -> bytes:
+    """EnigmaMachine ngẫu nhiên cùng layout với bản bên tbc.dll."""
+    rng = random.Random(seed)
+    raw = bytearray()
+    for _ in range(tbc_module._ENIGMA_ROTORS):
+        forward = list(range(256))
+        rng.shuffle(forward)
+        backward = [0] * 256
+        for i, v in enumerate(forward):
+            backward[v] = i
+        raw += bytes(forward) + bytes(backward) + bytes([rng.randrange(256)])
+    pairs = list(range(256))
+    rng.shuffle(pairs)
+    reflector = [0] * 256
+    for i in range(0, 256, 2):
+        reflector[pairs[i]], reflector[pairs[i + 1]] = pairs[i + 1], pairs[i]
+    return bytes(raw + bytes(reflector))
+
+def per_byte_loop(tier, data: bytearray) -> None:
+    """Mô phỏng vòng lặp cũ: mỗi byte một lần gọi, đi qua 10 rotor."""
+    counter = tier.start
+    fwd, bwd, refl = tier.forward, tier.backward, tier.reflector
+    for i, x in enumerate(data):
+        counter += 1
+        pos = counter.to_bytes(16, "little")
+        for r in range(10):
+            x = (fwd[r][(x + pos[r]) & 0xFF] - pos[r]) & 0xFF
+        x = refl[x]
+        for r in range(9, -1, -1):
+            x = (bwd[r][(x + pos[r]) & 0xFF] - pos[r]) & 0xFF
+        data[i] = x
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+def with_engine(engine: str, func):
+    # Ép engine Tầng 3 qua biến môi trường của registry, xong thì trả lại như cũ
+    saved = os.environ.get(backends.ENV_BACKEND)
+    os.environ[backends.ENV_BACKEND] = f"tbc_enigma={engine}"
+    backends.reset()
+    try:
+        return func()
+    finally:
+        if saved is None:
+            del os.environ[backends.ENV_BACKEND]
+        else:
+            os.environ[backends.ENV_BACKEND] = saved
+        backends.reset()
+
+def report(label: str, size: int, seconds: float) -> None:
+    print(f"{label:28} {size:>10} B {size / seconds / 1e6:10.2f} MB/s {seconds * 1e9 / size:10.1f} ns/B")
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="256,4096,65536,1048576")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    sizes = [int(s) for s in args.sizes.split(",")]
+
+    np = _compat.numpy()
+    if np is None:
+        print("Cần NumPy cho đường bulk: pip install numpy")
+        return 1
+
+    try:
+        cipher = tbc_module.TripleBlockCipher()
+    except OSError as exc:
+        cipher = None
+        print(f"# tbc.dll không dùng được ({exc}); đo trên EnigmaMachine giả lập\n")
+
+    for size in sizes:
+        data = os.urandom(size)
+        if cipher is not None:
+            bulk = with_engine("numpy", lambda: best_of(lambda: cipher.encrypt(data, 7, 3.5), args.repeat))
+            loop = with_engine("native", lambda: best_of(lambda: cipher.encrypt(data, 7, 3.5), 1))
+            report("encrypt, per-byte ctypes", size, loop)
+            report("encrypt, bulk tier 3", size, bulk)
+        else:
+            tier = tbc_module._EnigmaTier(synthetic_snapshot())
+            # Vòng lặp từng byte rất chậm nên chỉ đo tối đa 64 KiB rồi quy đổi
+            sample = min(size, 1 << 16)
+            loop = best_of(lambda: per_byte_loop(tier, bytearray(data[:sample])), 1) * size / sample
+            bulk = best_of(lambda: tier.process(np, bytearray(data)), args.repeat)
+            report("tier 3, per-byte loop", size, loop)
+            report("tier 3, bulk", size, bulk)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+"""Đo thời gian import lạnh của tbcryptography, mỗi mục một process mới.
+
+    python benchmarks/import_time.py [--budget-ms 30] [--runs 5]
+
+Mỗi mục chỉ truy cập đúng một thuộc tính (ví dụ `tbcryptography.tfsc`)
+rồi in ra thời gian và các module tbcryptography đã bị import. Vượt ngân
+sách thì thoát với mã 1.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+
+TARGETS = ["", "atbash", "caesar", "vigenere", "EnigmaMachine", "tbc", "tfsc", "TBAEMS"]
+
+_PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+import tbcryptography
+t1 = time.perf_counter()
+error = None
+if {name!r}:
+    try:
+        getattr(tbcryptography, {name!r})
+    except OSError as exc:
+        error = type(exc).__name__
+t2 = time.perf_counter()
+print(json.dumps({{
+    "package_ms": (t1 - t0) * 1e3,
+    "total_ms": (t2 - t0) * 1e3,
+    "error": error,
+    "modules": sorted(m for m in sys.modules if m.startswith("tbcryptography")),
+}}))
+"""
+
+def probe(name: str) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(name=name)],
+        capture_output=True, text=True, check=True,
+        env={"PYTHONPATH": str(SRC_DIR)},
+    )
+    return json.loads(out.stdout)
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=30.0,
+                        help="ngân sách cho mỗi mục (median, ms)")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    failed = False
+    for name in TARGETS:
+        samples = [probe(name) for _ in range(args.runs)]
+        median = statistics.median(s["total_ms"] for s in samples)
+        last = samples[-1]
+        status = "OK" if median <= args.budget_ms else "OVER"
+        failed |= status == "OVER"
+        label = f"tbcryptography.{name}" if name else "import tbcryptography"
+        note = f" ({last['error']})" if last["error"] else ""
+        print(f"{status:4} {label:34} {median:8.2f} ms{note}")
+        print(f"     modules: {', '.join(last['modules'])}")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
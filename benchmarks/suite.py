@@ -0,0 +1,299 @@
+"""Bộ benchmark cho mọi cipher, mọi backend và nhiều kích thước payload.
+
+    python benchmarks/suite.py [--sizes 16,4096,1048576] [--cases tfsc,tbc]
+                               [--output out.json] [--baseline base.json]
+                               [--threshold 0.10]
+
+Mỗi tổ hợp (cipher, thao tác, backend, kích thước) chạy trong một process
+riêng để đo peak RSS cho đúng. Kết quả gồm thông lượng (theo trung vị),
+latency p50/p90/p99, peak RSS, số byte cấp phát tối đa trong một lần gọi
+(tracemalloc) và số block Python còn giữ lại sau lần gọi đó.
+
+Backend: "native" là DLL, "python" là engine dự phòng (dùng NumPy nếu có),
+"pure" là engine dự phòng với NumPy bị tắt. Tổ hợp nào không chạy được trên
+máy hiện tại (ví dụ thiếu DLL) được ghi là skipped chứ không làm hỏng cả lượt.
+
+Có --baseline thì so thông lượng với file JSON cũ; chậm hơn quá --threshold
+ở bất kỳ dòng nào thì thoát với mã 1.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+sys.path.insert(0, str(SRC))
+
+DEFAULT_SIZES = "16,256,4096,65536,1048576,16777216"
+# Backend thuần Python chậm cỡ vài MB/s, chạy 1 GB thì mất cả buổi
+PURE_MAX_SIZE = 16 << 20
+SEED = 20240904
+
+_TEXT_TABLE = bytes(b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz .,"[i % 55] for i in range(256))
+
+class Skip(Exception):
+    pass
+
+def text_payload(rng: random.Random, size: int) -> str:
+    return rng.randbytes(size).translate(_TEXT_TABLE).decode("ascii")
+
+def use_backend(cipher, attr: str, backend: str):
+    if backend == "native":
+        if getattr(cipher, attr) is None:
+            raise Skip("không load được DLL")
+    else:
+        setattr(cipher, attr, None)
+    return cipher
+
+# Mỗi case: (các thao tác, các backend, hàm dựng) — hàm dựng trả về callable đo được
+def _caesar(op, backend, size, rng):
+    from tbcryptography.tbstandard.caesar import CaesarCipher
+    cipher = use_backend(CaesarCipher(), "_lib", backend)
+    text = text_payload(rng, size)
+    return lambda: cipher.process(text, 7)
+
+def _atbash(op, backend, size, rng):
+    from tbcryptography.tbstandard.atbash import AtbashCipher
+    cipher = use_backend(AtbashCipher(), "_lib", backend)
+    text = text_payload(rng, size)
+    return lambda: cipher.process(text)
+
+def _vigenere(op, backend, size, rng):
+    from tbcryptography.tbstandard.vigenere import VigenereCipher
+    cipher = use_backend(VigenereCipher(), "_lib", backend)
+    text = text_payload(rng, size)
+    func = cipher.encrypt if op == "encrypt" else cipher.decrypt
+    return lambda: func(text, "TebeeKey")
+
+def _enigma(op, backend, size, rng):
+    from tbcryptography.tbstandard.enigma import EnigmaMachine
+    machine = EnigmaMachine(SEED)
+    text = text_payload(rng, size)
+    return lambda: machine.process_text(text)
+
+def _tbc(op, backend, size, rng):
+    from tbcryptography.tbcomplex.tbc import TripleBlockCipher
+    try:
+        cipher = TripleBlockCipher()
+    except OSError as exc:
+        raise Skip(str(exc)) from None
+    data = rng.randbytes(size)
+    if op == "decrypt":
+        data = cipher.__process__(data, 7, 1.5, "encrypt")
+    return lambda: cipher.__process__(data, 7, 1.5, op)
+
+def _tfsc(op, backend, size, rng):
+    from tbcryptography.tbcomplex.tfsc import TebeeFastStreamCipher
+    cipher = use_backend(TebeeFastStreamCipher(), "__lib__", backend)
+    key = cipher.prepare_key(rng.randbytes(128))
+    data = rng.randbytes(size)
+    if op == "encrypt":
+        # encrypt() nới bytearray để padding nên mỗi lần phải đưa bản mới (tính cả copy)
+        return lambda: cipher.encrypt(bytearray(data), key)
+    buf = bytearray(size + 16)
+    if op == "encrypt_inplace":
+        return lambda: cipher.encrypt_inplace(buf, key, size)
+    sealed = bytearray(data)
+    cipher.encrypt(sealed, key)
+    return lambda: cipher.decrypt(bytearray(sealed), key, as_bytes=True)
+
+def _tbaems(op, backend, size, rng):
+    from tbcryptography.tbcomplex.tbaems import TBAEMS
+    try:
+        cipher = TBAEMS(rng.randbytes(32))
+    except OSError as exc:
+        raise Skip(str(exc)) from None
+    nonce = rng.randbytes(16)
+    data = rng.randbytes(size)
+    if op == "encrypt":
+        return lambda: cipher.encrypt(bytearray(data), nonce)
+    sealed = bytearray(data)
+    cipher.encrypt(sealed, nonce)
+    return lambda: cipher.decrypt(bytearray(sealed), nonce)
+
+CASES = {
+    "caesar": (("process",), ("native", "python"), _caesar),
+    "atbash": (("process",), ("native", "python"), _atbash),
+    "vigenere": (("encrypt", "decrypt"), ("native", "python", "pure"), _vigenere),
+    "enigma": (("process_text",), ("python", "pure"), _enigma),
+    "tbc": (("encrypt", "decrypt"), ("native",), _tbc),
+    "tfsc": (("encrypt", "encrypt_inplace", "decrypt"), ("native", "python", "pure"), _tfsc),
+    "tbaems": (("encrypt", "decrypt"), ("native",), _tbaems),
+}
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    # Nearest-rank, đủ dùng và không cần thêm thư viện
+    index = min(len(sorted_values) - 1, max(0, round(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+def peak_rss_kb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS trả về byte, Linux trả về KB
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+def measure(case: str, op: str, backend: str, size: int, min_time: float, max_iters: int) -> dict:
+    """Chạy trong process con: đo một tổ hợp rồi trả về một dòng kết quả."""
+    row = {"case": case, "op": op, "backend": backend, "size": size}
+    if backend == "pure":
+        from tbcryptography import _compat
+        _compat.numpy = lambda: None
+    try:
+        fn = CASES[case][2](op, backend, size, random.Random(SEED + size))
+    except Skip as exc:
+        return row | {"skipped": str(exc)}
+
+    fn()  # warm-up: load DLL, dựng bảng, cache...
+    times = []
+    start = time.perf_counter()
+    while len(times) < max_iters:
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time and len(times) >= 3:
+            break
+        if elapsed >= 10 * min_time:
+            break
+
+    tracemalloc.start()
+    blocks = sys.getallocatedblocks()
+    tracemalloc.reset_peak()
+    result = fn()
+    alloc_peak = tracemalloc.get_traced_memory()[1]
+    del result
+    retained = sys.getallocatedblocks() - blocks
+    tracemalloc.stop()
+
+    times.sort()
+    median = percentile(times, 50)
+    return row | {
+        "iterations": len(times),
+        "throughput_mbps": size / median / 1e6,
+        "latency_us": {
+            "min": times[0] * 1e6,
+            "p50": median * 1e6,
+            "p90": percentile(times, 90) * 1e6,
+            "p99": percentile(times, 99) * 1e6,
+            "mean": sum(times) / len(times) * 1e6,
+        },
+        "peak_rss_kb": peak_rss_kb(),
+        "alloc_peak_bytes": alloc_peak,
+        "alloc_blocks": retained,
+    }
+
+def run_child(args, case: str, op: str, backend: str, size: int) -> dict:
+    cmd = [sys.executable, __file__, "--child", case, op, backend, str(size),
+           "--min-time", str(args.min_time), "--max-iters", str(args.max_iters)]
+    proc = subprocess.run(cmd, capture_output=True, text=True)
+    if proc.returncode != 0:
+        return {"case": case, "op": op, "backend": backend, "size": size,
+                "error": proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"exit {proc.returncode}"}
+    return json.loads(proc.stdout)
+
+def row_key(row: dict) -> tuple:
+    return row["case"], row["op"], row["backend"], row["size"]
+
+def compare(results: list[dict], baseline: dict, threshold: float) -> list[str]:
+    old = {row_key(row): row for row in baseline["results"] if "throughput_mbps" in row}
+    regressions = []
+    for row in results:
+        base = old.get(row_key(row))
+        if base is None or "throughput_mbps" not in row:
+            continue
+        ratio = row["throughput_mbps"] / base["throughput_mbps"]
+        if ratio < 1 - threshold:
+            regressions.append(f"{'/'.join(map(str, row_key(row)))}: "
+                               f"{base['throughput_mbps']:.2f} -> {row['throughput_mbps']:.2f} MB/s ({ratio - 1:+.1%})")
+    return regressions
+
+def print_row(row: dict) -> None:
+    label = f"{row['case']}.{row['op']} [{row['backend']}]"
+    if "throughput_mbps" not in row:
+        print(f"{label:36} {row['size']:>11} B  {row.get('skipped') or row.get('error')}")
+        return
+    lat = row["latency_us"]
+    rss = row["peak_rss_kb"]
+    print(f"{label:36} {row['size']:>11} B {row['throughput_mbps']:10.2f} MB/s "
+          f"p50 {lat['p50']:11.1f} us p99 {lat['p99']:11.1f} us "
+          f"rss {rss if rss is not None else '-':>8} KB alloc {row['alloc_peak_bytes']:>11} B")
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default=DEFAULT_SIZES,
+                        help="danh sách kích thước (byte), ví dụ 16,4096,1073741824")
+    parser.add_argument("--cases", default=",".join(CASES))
+    parser.add_argument("--backends", default="native,python,pure")
+    parser.add_argument("--min-time", type=float, default=0.2, help="thời gian đo tối thiểu mỗi dòng (giây)")
+    parser.add_argument("--max-iters", type=int, default=10000)
+    parser.add_argument("--pure-max-size", type=int, default=PURE_MAX_SIZE)
+    parser.add_argument("--output", help="ghi kết quả ra file JSON")
+    parser.add_argument("--baseline", help="file JSON cũ để so sánh")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="chậm hơn baseline quá tỉ lệ này thì coi là regression")
+    parser.add_argument("--child", nargs=4, metavar=("CASE", "OP", "BACKEND", "SIZE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        case, op, backend, size = args.child
+        print(json.dumps(measure(case, op, backend, int(size), args.min_time, args.max_iters)))
+        return 0
+
+    sizes = [int(s) for s in args.sizes.split(",")]
+    backends = set(args.backends.split(","))
+    results = []
+    for case in args.cases.split(","):
+        ops, case_backends, _ = CASES[case]
+        for op in ops:
+            for backend in case_backends:
+                if backend not in backends:
+                    continue
+                for size in sizes:
+                    if backend == "pure" and size > args.pure_max_size:
+                        continue
+                    row = run_child(args, case, op, backend, size)
+                    print_row(row)
+                    results.append(row)
+
+    try:
+        import numpy
+        numpy_version = numpy.__version__
+    except ImportError:
+        numpy_version = None
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "numpy": numpy_version,
+            "seed": SEED,
+        },
+        "results": results,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression vượt ngưỡng {args.threshold:.0%}:")
+            for line in regressions:
+                print("  " + line)
+            return 1
+        print(f"\nKhông có regression nào vượt ngưỡng {args.threshold:.0%}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -29,6 +29,11 @@ setup(
 
     python_requires=">=3.11",
 
+    # NumPy không bắt buộc, chỉ để tăng tốc các engine dự phòng
+    extras_require={
+        "numpy": ["numpy"],
+    },
+
     data_files=[('', ['LICENSE'])],
     
     classifiers=[
@@ -1,18 +1,64 @@
-from .tbstandard.atbash import AtbashCipher
-from .tbstandard.caesar import CaesarCipher
-from .tbstandard.enigma import EnigmaMachine
-from .tbstandard.vigenere import VigenereCipher
+import codecs
+import threading
+from importlib import import_module
 
-from .tbcomplex.tbc import TripleBlockCipher
-from .tbcomplex.tfsc import TebeeFastStreamCipher
-from .tbcomplex.tbaems import TBAEMS
+from . import _native
 
-atbash = AtbashCipher()
-caesar = CaesarCipher()
-vigenere = VigenereCipher()
+# Mọi thứ đều được import/khởi tạo lười (PEP 562): chỉ khi truy cập lần đầu
+# mới import module và load DLL tương ứng. Thiếu một DLL cũng không làm hỏng
+# `import tbcryptography`, và worker chỉ cần tfsc thì chỉ trả tiền cho tfsc.
+_CLASSES = {
+    "AtbashCipher": ".tbstandard.atbash",
+    "CaesarCipher": ".tbstandard.caesar",
+    "EnigmaMachine": ".tbstandard.enigma",
+    "VigenereCipher": ".tbstandard.vigenere",
+    "TripleBlockCipher": ".tbcomplex.tbc",
+    "TebeeFastStreamCipher": ".tbcomplex.tfsc",
+    "TBAEMS": ".tbcomplex.tbaems",
+    "TBAEMSPool": ".tbcomplex.tbaems",
+    "TBAEMSReader": ".tbcomplex.tbaems_container",
+    "TBAEMSWriter": ".tbcomplex.tbaems_container",
+}
 
-tbc = TripleBlockCipher()
-tfsc = TebeeFastStreamCipher()
+_SINGLETONS = {
+    "atbash": "AtbashCipher",
+    "caesar": "CaesarCipher",
+    "vigenere": "VigenereCipher",
+    "tbc": "TripleBlockCipher",
+    "tfsc": "TebeeFastStreamCipher",
+}
+
+_lock = threading.RLock()
+
+@_native.after_fork
+def _reset_lock() -> None:
+    global _lock
+    _lock = threading.RLock()
+
+def __getattr__(name: str):
+    if name in _CLASSES:
+        value = getattr(import_module(_CLASSES[name], __name__), name)
+    elif name in _SINGLETONS:
+        with _lock:
+            # Thread khác có thể đã tạo xong trong lúc mình chờ lock
+            if name in globals():
+                return globals()[name]
+            value = __getattr__(_SINGLETONS[name])()
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
+def _search_codec(name: str):
+    # Codec tb-* (xem textcodecs): chỉ import module khi có người tra đúng tên đó
+    if not name.startswith("tb_"):
+        return None
+    return import_module(".textcodecs", __name__).search(name)
+
+codecs.register(_search_codec)
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(_CLASSES) | set(_SINGLETONS))
 
 __author__ = "Tebee 9/4"
-__all__ = ["atbash", "caesar", "enigma", "vigenere", "tbc", "tfsc", "tbaems"]
\ No newline at end of file
+__all__ = ["atbash", "caesar", "EnigmaMachine", "vigenere", "tbc", "tfsc", "TBAEMS"]
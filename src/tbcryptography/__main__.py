@@ -0,0 +1,334 @@
+"""CLI không tương tác: stream stdin/stdout hoặc nhiều file qua một cipher.
+
+    python -m tbcryptography tfsc encrypt --key-file k.bin < in > out
+    python -m tbcryptography tfsc encrypt --key-env TFSC_KEY -o backup.enc/ /data/backup
+    python -m tbcryptography tbaems decrypt --key-file k.bin -o restore/ backup.enc/
+    python -m tbcryptography keygen tfsc -o k.bin
+
+Key đọc từ file (byte thô; key vigenere bỏ xuống dòng ở cuối) hoặc biến môi trường (hex). Dữ liệu đi qua từng
+khúc --chunk-size byte nên RAM không phụ thuộc kích thước file. Nhiều file
+thì chạy song song với --workers; thống kê thông lượng in ra stderr.
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from base64 import b85decode, b85encode
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import BinaryIO, Optional
+
+from .tbcomplex.tbaems import TBAEMS
+from .tbcomplex.tbaems_container import TBAEMSReader, TBAEMSWriter
+from .tbcomplex.tfsc import TFSCDecryptor, TFSCEncryptor
+from .tbstandard.atbash import AtbashCipher
+from .tbstandard.caesar import CaesarCipher
+from .tbstandard.enigma import EnigmaMachine
+from .tbstandard.vigenere import VigenereCipher
+
+CHUNK_SIZE = 1 << 20
+KEY_SIZES = {"tfsc": 128, "tbaems": 32}
+KEYED = {"tfsc", "tbaems", "vigenere"}
+# Key dạng chữ: file key thường được tạo bằng echo/editor nên bỏ xuống dòng ở cuối
+TEXT_KEYS = {"vigenere"}
+SUFFIX = ".tb"
+
+class _Stateless:
+    """Caesar/Atbash: không có trạng thái giữa các khúc, mỗi khúc xử lý riêng."""
+    def __init__(self, func) -> None:
+        self._func = func
+
+    def update(self, chunk: bytes) -> bytes:
+        return self._func(chunk)
+
+    def finalize(self) -> bytes:
+        return b""
+
+class _Enigma:
+    """Giống utils.enigma_mc: mã hóa là Base85 rồi qua Enigma, giải mã thì ngược lại.
+
+    Base85 đi theo nhóm 4 byte <-> 5 ký tự nên phần lẻ được giữ lại tới khúc sau.
+    """
+    def __init__(self, seed: int, decrypt: bool) -> None:
+        self._machine = EnigmaMachine(seed)
+        self._decrypt = decrypt
+        self._group = 5 if decrypt else 4
+        self._pending = b""
+
+    def _convert(self, data: bytes) -> bytes:
+        if self._decrypt:
+            return b85decode(self._machine.process(data))
+        return self._machine.process(b85encode(data))
+
+    def update(self, chunk: bytes) -> bytes:
+        data = self._pending + chunk
+        cut = len(data) - len(data) % self._group
+        self._pending = data[cut:]
+        return self._convert(data[:cut])
+
+    def finalize(self) -> bytes:
+        data, self._pending = self._pending, b""
+        return self._convert(data) if data else b""
+
+class Stats:
+    def __init__(self) -> None:
+        self.files = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self._lock = threading.Lock()
+
+    def add(self, bytes_in: int, bytes_out: int) -> None:
+        with self._lock:
+            self.files += 1
+            self.bytes_in += bytes_in
+            self.bytes_out += bytes_out
+
+class _Counter:
+    """Bọc file ghi để đếm số byte (và hex hóa nếu cần)."""
+    def __init__(self, raw: BinaryIO, hex_output: bool) -> None:
+        self._raw = raw
+        self._hex = hex_output
+        self.count = 0
+
+    def write(self, data) -> int:
+        if not data:
+            return 0
+        if self._hex:
+            data = bytes(data).hex().encode("ascii")
+        self._raw.write(data)
+        self.count += len(data)
+        return len(data)
+
+class _HexReader:
+    """Bọc file đọc chứa hex (cho phép xuống dòng/khoảng trắng), trả về byte thô.
+
+    Ký tự hex lẻ ở cuối một lần đọc được giữ lại ghép với lần đọc sau.
+    """
+    def __init__(self, raw: BinaryIO) -> None:
+        self._raw = raw
+        self._pending = b""
+
+    def seekable(self) -> bool:
+        return False
+
+    def read(self, size: int = -1) -> bytes:
+        while True:
+            # 2 ký tự hex cho mỗi byte
+            chunk = self._raw.read(size * 2 if size > 0 else -1)
+            digits = self._pending + b"".join(chunk.split())
+            cut = len(digits) - len(digits) % 2
+            self._pending = digits[cut:]
+            if cut or not chunk:
+                break
+        if not chunk and self._pending:
+            raise SystemExit("Input hex bị lẻ một ký tự ở cuối")
+        try:
+            return bytes.fromhex(digits[:cut].decode("ascii"))
+        except (UnicodeDecodeError, ValueError):
+            raise SystemExit("Input không phải hex hợp lệ") from None
+
+def load_key(args: argparse.Namespace) -> Optional[bytes]:
+    if args.key_file:
+        key = Path(args.key_file).read_bytes()
+        if args.cipher in TEXT_KEYS:
+            # Giống encrypt(text, "KEY") của thư viện, không dính "\n" mà echo thêm vào
+            key = key.rstrip(b"\r\n")
+            if not key:
+                raise SystemExit(f"File key {args.key_file} rỗng")
+    elif args.key_env:
+        value = os.environ.get(args.key_env)
+        if value is None:
+            raise SystemExit(f"Biến môi trường {args.key_env} chưa được đặt")
+        key = bytes.fromhex(value.strip())
+    else:
+        return None
+    need = KEY_SIZES.get(args.cipher)
+    if need is not None and len(key) < need:
+        raise SystemExit(f"Key {args.cipher} cần {need} byte, mới có {len(key)}")
+    return key
+
+def make_context(args: argparse.Namespace, key: Optional[bytes]):
+    decrypt = args.mode == "decrypt"
+    if args.cipher == "tfsc":
+        return TFSCDecryptor(key) if decrypt else TFSCEncryptor(key)
+    if args.cipher == "caesar":
+        shift = -args.shift if decrypt else args.shift
+        return _Stateless(partial(CaesarCipher().process_bytes, shift=shift))
+    if args.cipher == "atbash":
+        return _Stateless(AtbashCipher().process_bytes)
+    if args.cipher == "enigma":
+        return _Enigma(args.seed, decrypt)
+    if args.cipher == "vigenere":
+        # Vị trí khóa được giữ giữa các khúc nên kết quả giống chạy một lần
+        cipher = VigenereCipher()
+        return cipher.decryptor(key) if decrypt else cipher.encryptor(key)
+    raise SystemExit(f"Cipher không hỗ trợ stream: {args.cipher}")
+
+def process_stream(args: argparse.Namespace, key: Optional[bytes], src: BinaryIO, dst: BinaryIO) -> tuple[int, int]:
+    """Chạy một luồng từ src sang dst, trả về (số byte đọc, số byte ghi).
+
+    --hex áp dụng cho phía ciphertext: encrypt ghi hex, decrypt đọc hex.
+    """
+    out = _Counter(dst, args.hex and args.mode == "encrypt")
+    if args.hex and args.mode == "decrypt":
+        src = _HexReader(src)
+    bytes_in = 0
+
+    if args.cipher == "tbaems":
+        cipher = TBAEMS(key)
+        try:
+            if args.mode == "encrypt":
+                with TBAEMSWriter(out, cipher, chunk_size=args.chunk_size, workers=args.chunk_workers) as writer:
+                    while chunk := src.read(args.chunk_size):
+                        bytes_in += len(chunk)
+                        writer.write(chunk)
+            else:
+                if not src.seekable():
+                    # Container cần đọc index ở cuối: stdin thì chép ra file tạm trước
+                    spool = tempfile.TemporaryFile()
+                    shutil.copyfileobj(src, spool, args.chunk_size)
+                    src = spool
+                bytes_in = src.seek(0, os.SEEK_END)
+                with TBAEMSReader(src, cipher, workers=args.chunk_workers) as reader:
+                    for chunk in reader.iter_chunks():
+                        out.write(chunk)
+        finally:
+            cipher.close()
+        return bytes_in, out.count
+
+    ctx = make_context(args, key)
+    while chunk := src.read(args.chunk_size):
+        bytes_in += len(chunk)
+        out.write(ctx.update(chunk))
+    out.write(ctx.finalize())
+    return bytes_in, out.count
+
+def target_path(args: argparse.Namespace, source: Path, root: Path) -> Path:
+    rel = source.relative_to(root) if root.is_dir() else Path(source.name)
+    if args.mode == "encrypt":
+        rel = rel.with_name(rel.name + args.suffix)
+    elif rel.name.endswith(args.suffix):
+        rel = rel.with_name(rel.name[:-len(args.suffix)])
+    return Path(args.output) / rel
+
+def collect(inputs: list[str]) -> list[tuple[Path, Path]]:
+    files = []
+    for name in inputs:
+        root = Path(name)
+        if root.is_dir():
+            files += [(path, root) for path in sorted(root.rglob("*")) if path.is_file()]
+        else:
+            files.append((root, root))
+    return files
+
+def run(args: argparse.Namespace) -> Stats:
+    key = load_key(args)
+    if args.cipher in KEYED and key is None:
+        raise SystemExit("Cần key: --key-file hoặc --key-env")
+    stats = Stats()
+
+    if not args.inputs or args.inputs == ["-"]:
+        dst = open(args.output, "wb") if args.output else sys.stdout.buffer
+        try:
+            stats.add(*process_stream(args, key, sys.stdin.buffer, dst))
+        finally:
+            if args.output:
+                dst.close()
+            else:
+                dst.flush()
+        return stats
+
+    if not args.output:
+        raise SystemExit("Nhiều file thì cần -o/--output là thư mục đích")
+
+    jobs = []
+    sources: dict[Path, Path] = {}
+    for source, root in collect(args.inputs):
+        target = target_path(args, source, root)
+        # File cùng tên ở hai thư mục nguồn khác nhau sẽ ghi đè nhau ở thư mục đích
+        other = sources.setdefault(target.resolve(), source)
+        if other != source:
+            raise SystemExit(f"{other} và {source} cùng ghi ra {target}; chạy riêng từng lần hoặc đổi tên")
+        jobs.append((source, target))
+
+    def one(job: tuple[Path, Path]) -> None:
+        source, target = job
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with open(source, "rb") as src, open(target, "wb") as dst:
+            stats.add(*process_stream(args, key, src, dst))
+
+    with ThreadPoolExecutor(args.workers) as pool:
+        # list() để lỗi của từng file được ném ra ở đây
+        list(pool.map(one, jobs))
+    return stats
+
+def keygen(args: argparse.Namespace) -> None:
+    key = os.urandom(KEY_SIZES[args.cipher])
+    if args.output:
+        # Tạo file với quyền 0600 ngay từ đầu, key không lúc nào nằm trong file
+        # mà người khác đọc được; file đã có thì chỉ ghi đè khi có --force
+        flags = os.O_WRONLY | os.O_CREAT | getattr(os, "O_BINARY", 0)
+        flags |= os.O_TRUNC if args.force else os.O_EXCL
+        try:
+            fd = os.open(args.output, flags, 0o600)
+        except FileExistsError:
+            raise SystemExit(f"{args.output} đã tồn tại, thêm --force để ghi đè") from None
+        with os.fdopen(fd, "wb") as f:
+            if args.force and hasattr(os, "fchmod"):
+                # File cũ giữ quyền cũ khi mở lại: siết lại trước khi ghi key
+                os.fchmod(fd, 0o600)
+            f.write(key)
+    elif args.hex:
+        print(key.hex())
+    else:
+        sys.stdout.buffer.write(key)
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m tbcryptography", description=__doc__.splitlines()[0])
+    parser.add_argument("cipher", choices=["tfsc", "tbaems", "vigenere", "caesar", "atbash", "enigma"])
+    parser.add_argument("mode", choices=["encrypt", "decrypt"])
+    parser.add_argument("inputs", nargs="*", help="file/thư mục nguồn; bỏ trống hoặc '-' là stdin")
+    parser.add_argument("-o", "--output", help="file đích (stdin) hoặc thư mục đích (nhiều file)")
+    parser.add_argument("--key-file", help="đọc key từ file (byte thô)")
+    parser.add_argument("--key-env", help="đọc key (hex) từ biến môi trường")
+    parser.add_argument("--shift", type=int, default=3, help="độ dịch cho caesar")
+    parser.add_argument("--seed", type=int, default=0, help="seed cho enigma")
+    parser.add_argument("--hex", action="store_true",
+                        help="ciphertext dạng hex: encrypt ghi hex, decrypt đọc hex")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="số file chạy song song")
+    parser.add_argument("--chunk-workers", type=int, default=1,
+                        help="số thread mã hóa chunk trong một file (tbaems)")
+    parser.add_argument("--suffix", default=SUFFIX, help="đuôi thêm vào file đã mã hóa")
+    parser.add_argument("-q", "--quiet", action="store_true", help="không in thống kê")
+    return parser
+
+def main(argv: Optional[list[str]] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["keygen"]:
+        parser = argparse.ArgumentParser(prog="python -m tbcryptography keygen")
+        parser.add_argument("cipher", choices=sorted(KEY_SIZES))
+        parser.add_argument("-o", "--output")
+        parser.add_argument("--force", action="store_true", help="ghi đè file key đã có")
+        parser.add_argument("--hex", action="store_true")
+        keygen(parser.parse_args(argv[1:]))
+        return 0
+
+    args = build_parser().parse_intermixed_args(argv)
+    if args.cipher == "tbaems" and args.hex:
+        raise SystemExit("Container tbaems là nhị phân, không dùng dạng hex được")
+    start = time.perf_counter()
+    stats = run(args)
+    seconds = time.perf_counter() - start
+    if not args.quiet:
+        rate = stats.bytes_in / seconds / 1e6 if seconds > 0 else 0.0
+        print(f"{args.cipher} {args.mode}: {stats.files} luồng, {stats.bytes_in} B vào, "
+              f"{stats.bytes_out} B ra trong {seconds:.3f} s ({rate:.2f} MB/s)", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,53 @@
+import os
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Callable, Optional, Sequence
+
+from . import _native
+
+_executor: Optional[ThreadPoolExecutor] = None
+_lock = threading.Lock()
+
+@_native.after_fork
+def _reset_executor() -> None:
+    # Thread của pool không đi theo sang process con: bỏ pool cũ, lần sau tạo lại
+    global _executor, _lock
+    _executor = None
+    _lock = threading.Lock()
+
+def split(data, offsets: Optional[Sequence[int]] = None) -> Sequence:
+    """Trả về danh sách message: `data` nguyên vẹn nếu không có offsets,
+    còn không thì cắt buffer ghép `data` theo biên offsets[i]..offsets[i + 1]
+    (n message cần n + 1 offset). Các phần là memoryview, không copy.
+    """
+    if offsets is None:
+        return data
+    view = memoryview(data).cast("B")
+    return [view[offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1)]
+
+def shared_executor() -> ThreadPoolExecutor:
+    """Thread pool mặc định, tạo một lần cho cả process."""
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(os.cpu_count() or 1, thread_name_prefix="tbcryptography")
+        return _executor
+
+def workers_for(workers: Optional[int]) -> int:
+    return workers or os.cpu_count() or 1
+
+def run(func: Callable, items: Sequence, workers: Optional[int] = None,
+        executor: Optional[Executor] = None) -> list:
+    """Chạy func trên từng item qua thread pool, kết quả giữ đúng thứ tự.
+
+    DLL được gọi qua ctypes nên nhả GIL, các message chạy song song thật.
+    `executor` của caller được ưu tiên; workers=1 thì chạy tuần tự.
+    """
+    if executor is not None:
+        return list(executor.map(func, items))
+    if workers == 1 or len(items) < 2:
+        return [func(item) for item in items]
+    if workers is None:
+        return list(shared_executor().map(func, items))
+    with ThreadPoolExecutor(workers) as pool:
+        return list(pool.map(func, items))
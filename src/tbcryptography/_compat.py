@@ -0,0 +1,14 @@
+from functools import cache
+
+@cache
+def numpy():
+    """Import NumPy lần đầu cần tới, trả về None nếu chưa cài.
+
+    NumPy là tùy chọn và import mất cả trăm ms, nên không import sẵn ở
+    đầu module để giữ `import tbcryptography` nhẹ.
+    """
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
@@ -0,0 +1,82 @@
+import ctypes
+import os
+import threading
+import weakref
+from pathlib import Path
+from typing import Any, Callable, Final, Optional
+
+BIN_DIR: Final = Path(__file__).resolve().parent / "bin"
+
+_libs: dict[str, ctypes.CDLL] = {}
+_errors: dict[str, OSError] = {}
+_lock = threading.Lock()
+_dll_directory = None
+# Gọi sau mỗi lần load DLL mới (metrics dùng để gắn bộ đo vào hàm native)
+load_hooks: list[Callable[[str, ctypes.CDLL], None]] = []
+# Gọi trong process con ngay sau fork(), xem after_fork()
+_fork_hooks: list[Callable[[], None]] = []
+_fork_objects: "weakref.WeakSet[Any]" = weakref.WeakSet()
+
+def load_library(name: str, winmode: Optional[int] = None) -> ctypes.CDLL:
+    """Load bin/<name>.dll đúng một lần cho cả process rồi dùng chung.
+
+    Ném FileNotFoundError nếu thiếu file, OSError nếu không load được
+    (ví dụ DLL Windows trên Linux) để wrapper tự chọn engine dự phòng.
+    """
+    lib = _libs.get(name)
+    if lib is not None:
+        return lib
+
+    global _dll_directory
+    with _lock:
+        lib = _libs.get(name)
+        if lib is not None:
+            return lib
+        # Lần trước đã lỗi thì ném lại luôn, không thử dlopen lần nữa
+        if name in _errors:
+            raise _errors[name]
+
+        dll_path = BIN_DIR / f"{name}.dll"
+        try:
+            if not dll_path.exists():
+                raise FileNotFoundError(f"Không thấy DLL tại: {dll_path}")
+
+            # Thêm thư mục bin vào DLL path cho Windows (chỉ một lần)
+            if _dll_directory is None and hasattr(os, 'add_dll_directory'):
+                _dll_directory = os.add_dll_directory(str(BIN_DIR))
+
+            lib = ctypes.CDLL(str(dll_path), winmode=winmode)
+        except OSError as exc:
+            _errors[name] = exc
+            raise
+        _libs[name] = lib
+    for hook in list(load_hooks):
+        hook(name, lib)
+    return lib
+
+def after_fork(hook: Callable[[], None]) -> Callable[[], None]:
+    """Đăng ký hàm chạy trong process con ngay sau fork() (dùng được như decorator).
+
+    Lock bị fork copy nguyên trạng: thread khác đang giữ lúc fork thì trong
+    process con không ai nhả nữa, nên module có lock hay thread pool phải
+    tạo lại ở đây. Handle DLL và instance C++ thì vẫn dùng được vì process
+    con có bản copy bộ nhớ của riêng nó.
+    """
+    _fork_hooks.append(hook)
+    return hook
+
+def track_fork(obj: Any) -> None:
+    """Gọi obj._after_fork() trong process con sau fork(), nếu obj còn sống."""
+    _fork_objects.add(obj)
+
+def _reinit_after_fork() -> None:
+    global _lock
+    _lock = threading.Lock()
+    for hook in list(_fork_hooks):
+        hook()
+    for obj in list(_fork_objects):
+        obj._after_fork()
+
+if hasattr(os, "register_at_fork"):
+    # Windows không có fork(), process con luôn import lại từ đầu
+    os.register_at_fork(after_in_child=_reinit_after_fork)
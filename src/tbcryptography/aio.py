@@ -0,0 +1,156 @@
+import asyncio
+import inspect
+import os
+import threading
+import weakref
+from concurrent.futures import Executor, ThreadPoolExecutor
+from functools import partial
+from importlib import import_module
+from typing import Any, Final, Optional
+
+from . import _native
+
+# Dưới ngưỡng này chạy luôn trên event loop: đẩy sang thread còn tốn hơn tự làm
+INLINE_LIMIT: Final = 64 * 1024
+STREAM_CHUNK: Final = 64 * 1024
+
+_SINGLETONS = ("atbash", "caesar", "vigenere", "tbc", "tfsc")
+_lock = threading.Lock()
+_executor: Optional[ThreadPoolExecutor] = None
+
+@_native.after_fork
+def _reset_lock() -> None:
+    global _lock, _executor
+    _lock = threading.Lock()
+    _executor = None
+
+def default_executor() -> ThreadPoolExecutor:
+    """Thread pool riêng của aio, tạo một lần cho cả process.
+
+    Không dùng _batch.shared_executor(): các hàm *_many tự chia việc lên pool
+    đó, nếu chính chúng cũng chạy trên pool đó thì đủ nhiều lời gọi cùng lúc
+    sẽ chiếm hết worker để chờ việc con của mình -> deadlock.
+    """
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(os.cpu_count() or 1, thread_name_prefix="tbcryptography-aio")
+        return _executor
+
+def _size(data: Any) -> Optional[int]:
+    """Kích thước payload, None nếu không đo được (list message, đường dẫn file...)."""
+    if isinstance(data, str):
+        return len(data)
+    try:
+        return memoryview(data).nbytes
+    except TypeError:
+        return None
+
+class AsyncCipher:
+    """Bọc một cipher đồng bộ thành awaitable encrypt/decrypt cho asyncio.
+
+    Payload nhỏ hơn `inline_limit` chạy ngay trên loop; payload lớn hoặc
+    không đo được kích thước (list message, đường dẫn file) được đẩy sang
+    executor (mặc định là default_executor()) để không chặn loop. Số việc
+    chạy cùng lúc trên mỗi event loop bị giới hạn bởi `limit`.
+    """
+
+    def __init__(self, cipher: Any, inline_limit: int = INLINE_LIMIT, limit: Optional[int] = None,
+                 executor: Optional[Executor] = None) -> None:
+        self.cipher = cipher
+        self.inline_limit = inline_limit
+        self._executor = executor
+        self.limit = limit or os.cpu_count() or 1
+        # Semaphore gắn với loop đầu tiên phải chờ trên nó: mỗi loop một cái
+        # (asyncio.run() nhiều lần, mỗi test một loop...), loop chết thì tự bỏ
+        self._semaphores: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores.setdefault(loop, asyncio.Semaphore(self.limit))
+        return semaphore
+
+    async def run(self, method: str, data: Any, *args, **kwargs) -> Any:
+        """Gọi `cipher.<method>(data, ...)` theo cách không chặn event loop."""
+        func = getattr(self.cipher, method)
+        size = _size(data)
+        if size is not None and size < self.inline_limit:
+            return func(data, *args, **kwargs)
+        return await self._offload(func, data, *args, **kwargs)
+
+    async def _offload(self, func, *args, **kwargs) -> Any:
+        async with self._semaphore():
+            executor = self._executor or default_executor()
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(executor, partial(func, *args, **kwargs))
+
+    async def encrypt(self, data: Any, *args, **kwargs) -> Any:
+        return await self.run("encrypt", data, *args, **kwargs)
+
+    async def decrypt(self, data: Any, *args, **kwargs) -> Any:
+        return await self.run("decrypt", data, *args, **kwargs)
+
+    async def process(self, data: Any, *args, **kwargs) -> Any:
+        # Caesar/Atbash chỉ có process()
+        return await self.run("process", data, *args, **kwargs)
+
+    async def encrypt_file(self, path, *args, **kwargs) -> Any:
+        # Đường dẫn ngắn nhưng file thì có thể rất lớn: luôn đẩy sang executor
+        return await self._offload(self.cipher.encrypt_file, path, *args, **kwargs)
+
+    async def decrypt_file(self, path, *args, **kwargs) -> Any:
+        return await self._offload(self.cipher.decrypt_file, path, *args, **kwargs)
+
+async def _write(writer: Any, data: bytes) -> None:
+    # asyncio.StreamWriter có write() thường + drain(); aiohttp thì write() là coroutine
+    result = writer.write(data)
+    if inspect.isawaitable(result):
+        await result
+    elif hasattr(writer, "drain"):
+        # drain() chờ khi buffer bên ghi đầy: đây là backpressure
+        await writer.drain()
+
+async def _pipe(ctx: Any, reader: Any, writer: Any, chunk_size: int, inline_limit: int,
+                executor: Optional[Executor]) -> int:
+    loop = asyncio.get_running_loop()
+    total = 0
+    while True:
+        chunk = await reader.read(chunk_size)
+        if not chunk:
+            break
+        if len(chunk) < inline_limit:
+            out = ctx.update(chunk)
+        else:
+            out = await loop.run_in_executor(executor or default_executor(), ctx.update, chunk)
+        if out:
+            await _write(writer, out)
+            total += len(out)
+    out = ctx.finalize()
+    await _write(writer, out)
+    return total + len(out)
+
+async def encrypt_stream(reader: Any, writer: Any, key: bytes, chunk_size: int = STREAM_CHUNK,
+                         inline_limit: int = INLINE_LIMIT, executor: Optional[Executor] = None) -> int:
+    """Đọc từ `reader` (StreamReader hoặc bất cứ gì có `await read(n)`), mã hóa TFSC
+    từng khúc và ghi sang `writer` ngay khi nhận được. Trả về số byte đã ghi.
+    """
+    from .tbcomplex.tfsc import TFSCEncryptor
+    return await _pipe(TFSCEncryptor(key), reader, writer, chunk_size, inline_limit, executor)
+
+async def decrypt_stream(reader: Any, writer: Any, key: bytes, chunk_size: int = STREAM_CHUNK,
+                         inline_limit: int = INLINE_LIMIT, executor: Optional[Executor] = None) -> int:
+    """Ngược lại với encrypt_stream: giải mã TFSC từng khúc, ghi byte thô sang `writer`."""
+    from .tbcomplex.tfsc import TFSCDecryptor
+    return await _pipe(TFSCDecryptor(key), reader, writer, chunk_size, inline_limit, executor)
+
+def __getattr__(name: str) -> AsyncCipher:
+    # aio.tfsc, aio.tbc... bọc singleton tương ứng của package, tạo lười
+    if name not in _SINGLETONS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    with _lock:
+        if name not in globals():
+            package = import_module(__package__)
+            globals()[name] = AsyncCipher(getattr(package, name))
+        return globals()[name]
@@ -0,0 +1,322 @@
+"""Registry engine: mỗi thuật toán có thể có nhiều engine (native = DLL, numpy,
+python...) và engine nhanh nhất được chọn theo từng dải kích thước payload.
+
+Engine của cùng một thuật toán là các hàm cùng tham số, cho ra cùng byte.
+Engine dùng được sẽ chạy thử trên vài kích thước đại diện và được xếp hạng
+theo từng dải. Kết quả được lưu ra đĩa theo máy, phiên bản Python/NumPy và bộ
+engine có mặt, nên các process sau khỏi đo lại. Chưa có cache thì lần dùng
+đầu tiên không phải chờ đo: việc đo chạy trong thread nền, trong lúc đó dùng
+thứ tự đăng ký. Service muốn có bảng xếp hạng ngay từ request đầu thì gọi
+warm_up() lúc khởi động.
+
+    TBCRYPTOGRAPHY_BACKEND=numpy                    # ép mọi thuật toán có engine numpy
+    TBCRYPTOGRAPHY_BACKEND=tfsc=native,enigma=python
+    TBCRYPTOGRAPHY_BACKEND=default                  # không đo, dùng thứ tự đăng ký
+    TBCRYPTOGRAPHY_CACHE_DIR=/path                  # thư mục chứa backends.json
+"""
+import json
+import os
+import platform
+import sys
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+from typing import Any, Callable, Final, Optional, Protocol
+
+from . import _compat, _native
+
+ENV_BACKEND: Final = "TBCRYPTOGRAPHY_BACKEND"
+ENV_CACHE_DIR: Final = "TBCRYPTOGRAPHY_CACHE_DIR"
+# Cận trên (byte) của từng dải; dải cuối là mọi thứ lớn hơn
+BANDS: Final = (256, 4096, 65536)
+# Kích thước chạy thử đại diện cho từng dải
+SAMPLE_SIZES: Final = (64, 1024, 16384, 262144)
+_CACHE_VERSION: Final = 1
+# Mỗi engine ở mỗi dải chạy tối đa _REPEAT lần hoặc _BUDGET giây, lấy lần nhanh nhất
+_REPEAT = 5
+_BUDGET = 0.01
+# Engine thua mà ước tính một lần chạy ở kích thước kế tiếp quá chừng này
+# giây thì không đo tiếp (vòng lặp Python ở 256 KB có thể mất cả giây)
+_GIVE_UP = 0.05
+
+class Engine(Protocol):
+    """Một engine chỉ là một hàm; chữ ký do thuật toán quy định."""
+    def __call__(self, *args: Any) -> Any: ...
+
+class _Algorithm:
+    __slots__ = ("name", "sample", "release", "engines", "ranking", "fallback", "generation", "measuring")
+
+    def __init__(self, name: str, sample: Callable[[int], tuple],
+                 release: Optional[Callable[[tuple], None]] = None) -> None:
+        self.name = name
+        # sample(size) -> tham số để chạy thử mọi engine với payload `size` byte;
+        # release(args) dọn tài nguyên của bộ tham số đó (handle native...) khi đo xong
+        self.sample = sample
+        self.release = release
+        self.engines: dict[str, tuple[Engine, Callable[[], bool]]] = {}
+        # Mỗi dải một list (tên, engine), nhanh nhất trước; None là chưa xếp hạng
+        self.ranking: Optional[list[list[tuple[str, Engine]]]] = None
+        # Thứ tự đăng ký, dùng tạm trong lúc thread nền đang đo
+        self.fallback: Optional[list[list[tuple[str, Engine]]]] = None
+        # Tăng mỗi khi bộ engine hoặc lựa chọn bị xóa: kết quả đo từ trước đó bị bỏ
+        self.generation = 0
+        self.measuring = False
+
+_algorithms: dict[str, _Algorithm] = {}
+_lock = threading.RLock()
+
+@_native.after_fork
+def _reset_lock() -> None:
+    # Bảng xếp hạng đã đo thì process con dùng tiếp, chỉ lock phải tạo lại;
+    # thread đo nền không đi theo nên process con tự đo lại nếu cần
+    global _lock
+    _lock = threading.RLock()
+    for algo in _algorithms.values():
+        algo.measuring = False
+
+def register_algorithm(algorithm: str, sample: Callable[[int], tuple],
+                       release: Optional[Callable[[tuple], None]] = None) -> None:
+    with _lock:
+        if algorithm not in _algorithms:
+            _algorithms[algorithm] = _Algorithm(algorithm, sample, release)
+
+def register(algorithm: str, name: str, func: Engine, available: Callable[[], bool] = lambda: True) -> None:
+    """Thêm engine `name` cho `algorithm`; thứ tự đăng ký là thứ tự ưu tiên khi không đo."""
+    with _lock:
+        algo = _algorithms[algorithm]
+        algo.engines[name] = (func, available)
+        _forget(algo)
+
+def _forget(algo: _Algorithm) -> None:
+    algo.ranking = None
+    algo.fallback = None
+    algo.generation += 1
+
+def _available(algo: _Algorithm) -> list[str]:
+    names = []
+    for name, (_, available) in algo.engines.items():
+        try:
+            ok = available()
+        except Exception:
+            ok = False
+        if ok:
+            names.append(name)
+    return names
+
+def _override(algorithm: str) -> tuple[Optional[str], bool]:
+    """Engine bị ép qua biến môi trường, và có phải ghi rõ cho `algorithm` không."""
+    choice = None
+    for part in os.environ.get(ENV_BACKEND, "").split(","):
+        name, sep, engine = part.strip().partition("=")
+        if sep and name == algorithm:
+            return engine.strip(), True
+        if name and not sep:
+            # Không ghi thuật toán thì áp cho mọi thuật toán có engine đó
+            choice = choice or name
+    return choice, False
+
+def cache_path() -> Path:
+    base = os.environ.get(ENV_CACHE_DIR)
+    if base:
+        return Path(base) / "backends.json"
+    if sys.platform == "win32":
+        root = os.environ.get("LOCALAPPDATA") or Path.home() / "AppData" / "Local"
+    else:
+        root = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(root) / "tbcryptography" / "backends.json"
+
+def _fingerprint(names: list[str]) -> str:
+    np = _compat.numpy()
+    return "|".join((
+        str(_CACHE_VERSION), platform.system(), platform.machine(),
+        "%d.%d" % sys.version_info[:2], np.__version__ if np is not None else "no-numpy", ",".join(names),
+    ))
+
+def _load_cache() -> dict:
+    try:
+        with open(cache_path(), encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+def _save_cache(algorithm: str, fingerprint: str, bands: list[list[str]]) -> None:
+    path = cache_path()
+    data = _load_cache()
+    entry = data.get(algorithm)
+    # Mỗi fingerprint một mục: có/không NumPy, có/không DLL... không ghi đè nhau
+    data[algorithm] = (entry if isinstance(entry, dict) else {}) | {fingerprint: bands}
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp.write_text(json.dumps(data, indent=1), encoding="utf-8")
+        # Ghi file tạm rồi đổi tên: process khác đọc cùng lúc không thấy file dở dang
+        os.replace(tmp, path)
+    except OSError:
+        # Không ghi được (thư mục chỉ đọc...) thì thôi, lần sau đo lại
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+
+def _time(func: Engine, args: tuple) -> float:
+    func(*args)
+    best = float("inf")
+    spent = 0.0
+    for _ in range(_REPEAT):
+        start = time.perf_counter()
+        func(*args)
+        elapsed = time.perf_counter() - start
+        best = min(best, elapsed)
+        spent += elapsed
+        if spent >= _BUDGET:
+            break
+    return best
+
+def _measure(algo: _Algorithm, names: list[str]) -> list[list[str]]:
+    bands: list[list[str]] = []
+    active = list(names)
+    for i, size in enumerate(SAMPLE_SIZES):
+        args = algo.sample(size)
+        results: dict[str, float] = {}
+        try:
+            for name in active:
+                try:
+                    results[name] = _time(algo.engines[name][0], args)
+                except Exception:
+                    # Engine lỗi khi chạy thử thì coi như không dùng được
+                    continue
+        finally:
+            if algo.release is not None:
+                algo.release(args)
+        order = sorted(results, key=results.__getitem__)
+        # Engine đã bị bỏ ở dải trước vẫn giữ làm dự phòng, xếp cuối
+        bands.append(order + [name for name in names if name not in results])
+        if order and i + 1 < len(SAMPLE_SIZES):
+            # Thời gian tăng gần tuyến tính theo kích thước; chi phí cố định
+            # (dựng mảng NumPy...) thì chỉ làm ước tính rộng tay hơn
+            scale = SAMPLE_SIZES[i + 1] / size
+            active = order[:1] + [name for name in order[1:] if results[name] * scale <= _GIVE_UP]
+    return bands
+
+def _rank(algo: _Algorithm, remeasure: bool = False,
+          measure: bool = True) -> Optional[list[list[tuple[str, Engine]]]]:
+    """Bảng xếp hạng từ biến môi trường, cache trên đĩa, hoặc đo mới.
+
+    measure=False thì trả về None thay vì đo khi cache chưa có.
+    """
+    names = _available(algo)
+    forced, explicit = _override(algo.name)
+    if explicit and forced != "default" and forced not in names:
+        raise ValueError(f"Engine {forced!r} của {algo.name} không có hoặc không dùng được ở đây")
+    if forced == "default" or forced in names:
+        first = [forced] if forced in names else []
+        bands = [first + [name for name in names if name != forced]] * len(SAMPLE_SIZES)
+    else:
+        fingerprint = _fingerprint(names)
+        entry = None if remeasure else _load_cache().get(algo.name)
+        bands = entry.get(fingerprint) if isinstance(entry, dict) else None
+        if not (isinstance(bands, list) and len(bands) == len(SAMPLE_SIZES)):
+            if not measure:
+                return None
+            bands = _measure(algo, names)
+            _save_cache(algo.name, fingerprint, bands)
+    return [[(name, algo.engines[name][0]) for name in band if name in names] for band in bands]
+
+def select(algorithm: str, size: int, native: bool = True) -> Engine:
+    """Engine nhanh nhất cho payload `size` byte; `native=False` thì bỏ qua engine DLL."""
+    algo = _algorithms[algorithm]
+    ranking = algo.ranking
+    if ranking is None:
+        ranking = _current(algo)
+    for name, func in ranking[bisect_left(BANDS, size)]:
+        if native or name != "native":
+            return func
+    raise LookupError(f"Không có engine nào dùng được cho {algorithm}")
+
+def _current(algo: _Algorithm) -> list[list[tuple[str, Engine]]]:
+    # Không bao giờ đo trong lúc giữ lock hay trong lời gọi của caller: thiếu
+    # cache thì dùng thứ tự đăng ký và đo trong thread nền
+    with _lock:
+        if algo.ranking is not None:
+            return algo.ranking
+        if algo.measuring and algo.fallback is not None:
+            return algo.fallback
+        ranking = _rank(algo, measure=False)
+        if ranking is not None:
+            algo.ranking = ranking
+            return ranking
+        if algo.fallback is None:
+            names = _available(algo)
+            algo.fallback = [[(name, algo.engines[name][0]) for name in names]] * len(SAMPLE_SIZES)
+        if not algo.measuring:
+            algo.measuring = True
+            threading.Thread(target=_measure_background, args=(algo,),
+                             name=f"tbcryptography-calibrate-{algo.name}", daemon=True).start()
+        return algo.fallback
+
+def _measure_now(algo: _Algorithm, remeasure: bool = False) -> list[list[tuple[str, Engine]]]:
+    # Đo ngoài lock để select() ở thread khác vẫn chạy tiếp với thứ tự tạm
+    with _lock:
+        generation = algo.generation
+    ranking = _rank(algo, remeasure)
+    with _lock:
+        if algo.generation == generation:
+            algo.ranking = ranking
+    return ranking
+
+def _measure_background(algo: _Algorithm) -> None:
+    try:
+        _measure_now(algo)
+    except Exception:
+        # Đo lỗi thì giữ thứ tự đăng ký; lần select() sau sẽ thử lại
+        with _lock:
+            algo.fallback = None
+    finally:
+        with _lock:
+            algo.measuring = False
+
+def warm_up(algorithm: Optional[str] = None, background: bool = False) -> Optional[threading.Thread]:
+    """Xếp hạng ngay (đọc cache, chưa có thì đo) cho một hoặc mọi thuật toán.
+
+    Gọi lúc khởi động service để request đầu tiên đã có engine nhanh nhất.
+    background=True thì chạy trong thread daemon và trả về thread đó.
+    """
+    names = [algorithm] if algorithm is not None else list(_algorithms)
+
+    def run() -> None:
+        for name in names:
+            algo = _algorithms[name]
+            if algo.ranking is None:
+                _measure_now(algo)
+
+    if background:
+        thread = threading.Thread(target=run, name="tbcryptography-warm-up", daemon=True)
+        thread.start()
+        return thread
+    run()
+    return None
+
+def engines(algorithm: str) -> dict[str, Engine]:
+    """Các engine dùng được ở đây của `algorithm`, theo thứ tự đăng ký."""
+    algo = _algorithms[algorithm]
+    return {name: algo.engines[name][0] for name in _available(algo)}
+
+def ranking(algorithm: str) -> list[list[str]]:
+    """Tên engine theo từng dải (nhanh nhất trước), xếp hạng (có thể phải đo) nếu chưa có."""
+    algo = _algorithms[algorithm]
+    ranking = algo.ranking or _measure_now(algo)
+    return [[name for name, _ in band] for band in ranking]
+
+def calibrate(algorithm: Optional[str] = None) -> dict[str, list[list[str]]]:
+    """Đo lại (bỏ qua cache trên đĩa) cho một hoặc mọi thuật toán đã đăng ký."""
+    names = [algorithm] if algorithm is not None else list(_algorithms)
+    return {name: [[engine for engine, _ in band] for band in _measure_now(_algorithms[name], remeasure=True)]
+            for name in names}
+
+def reset() -> None:
+    """Quên lựa chọn trong bộ nhớ, ví dụ sau khi đổi biến môi trường."""
+    with _lock:
+        for algo in _algorithms.values():
+            _forget(algo)
@@ -0,0 +1,179 @@
+"""Pool buffer dùng chung cho mọi cipher: buffer tạm (output của DLL, bản copy
+cho padding, chunk đang mã hóa...) được mượn rồi trả lại, thay vì mỗi lần gọi
+cấp phát một buffer mới rồi bỏ.
+
+    from tbcryptography import buffers
+    with buffers.acquire(len(msg), headroom=16) as buf:
+        buf.view[:len(msg)] = msg
+        n = tfsc.encrypt_inplace(buf.view, key, len(msg))
+        sock.sendall(buf.view[:n])
+    print(buffers.stats())
+
+Buffer chia theo lớp kích thước, mỗi khoảng lũy thừa 2 có 4 lớp (thừa tối đa
+25%, nên chunk 1 MiB + 16 byte padding không phải chiếm cả 2 MiB); mỗi lớp giữ lại tối đa vài
+buffer rảnh, tổng số byte giữ lại có giới hạn. Yêu cầu lớn hơn lớp lớn nhất
+thì cấp phát thẳng và không giữ lại; payload nhỏ hơn MIN_CLASS thì các
+cipher cấp phát thẳng như cũ. Đã release() thì không được dùng
+buffer (hay view cắt từ nó) nữa: lần acquire sau có thể ghi đè lên.
+"""
+import ctypes
+import threading
+from typing import Final, Optional
+
+from . import _native
+
+# Lớp nhỏ nhất và lớn nhất (byte). Dưới MIN_CLASS thì một lần mượn/trả
+# (lock + vài lời gọi Python, cỡ 2 µs) còn đắt hơn malloc của buffer nhỏ,
+# nên các cipher chỉ mượn pool cho payload từ cỡ này trở lên
+MIN_CLASS: Final = 1 << 14
+MAX_CLASS: Final = 1 << 24
+# Số buffer rảnh giữ lại mỗi lớp, và tổng số byte giữ lại của cả pool
+_PER_CLASS: Final = 8
+_MAX_BYTES: Final = 64 << 20
+
+class PooledBuffer:
+    """Buffer mượn từ pool. `view` là memoryview byte ghi được, dài đúng
+    size + headroom; `array` là mảng ctypes char trên cùng vùng nhớ (đủ
+    `capacity` byte), truyền thẳng cho DLL được."""
+    __slots__ = ("_pool", "_raw", "_full", "array", "view", "size", "headroom")
+
+    def __init__(self, pool: "BufferPool", capacity: int) -> None:
+        self._pool = pool
+        self._raw = bytearray(capacity)
+        self._full = memoryview(self._raw)
+        self.array = (ctypes.c_char * capacity).from_buffer(self._raw)
+        self.view: Optional[memoryview] = None
+        self.size = 0
+        self.headroom = 0
+
+    @property
+    def capacity(self) -> int:
+        return len(self._raw)
+
+    @property
+    def released(self) -> bool:
+        return self.view is None
+
+    def release(self) -> None:
+        if self.view is None:
+            raise ValueError("Buffer đã trả lại pool rồi")
+        self.view = None
+        self._pool._put(self)
+
+    def __enter__(self) -> "PooledBuffer":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.release()
+
+class BufferPool:
+    def __init__(self, per_class: int = _PER_CLASS, max_bytes: int = _MAX_BYTES,
+                 min_class: int = MIN_CLASS, max_class: int = MAX_CLASS) -> None:
+        self.per_class = per_class
+        self.max_bytes = max_bytes
+        self.min_class = min_class
+        self.max_class = max_class
+        self._free: dict[int, list[PooledBuffer]] = {}
+        self._lock = threading.Lock()
+        self._retained = 0
+        self._acquires = 0
+        self._releases = 0
+        self._hits = 0
+        self._oversize = 0
+        self._discarded = 0
+        _native.track_fork(self)
+
+    def _after_fork(self) -> None:
+        # Buffer rảnh là bản copy riêng của process con nên giữ lại dùng tiếp
+        self._lock = threading.Lock()
+
+    def __reduce__(self):
+        # Gửi sang process khác chỉ cần cấu hình, buffer rảnh không đi theo
+        return BufferPool, (self.per_class, self.max_bytes, self.min_class, self.max_class)
+
+    def size_class(self, size: int) -> Optional[int]:
+        """Lớp kích thước cho `size` byte, None nếu quá lớn để giữ lại."""
+        if size <= self.min_class:
+            return self.min_class
+        if size > self.max_class:
+            return None
+        # size nằm trong (2^(b-1), 2^b]: làm tròn lên bội số của 2^(b-3)
+        step = 1 << ((size - 1).bit_length() - 3)
+        return -(-size // step) * step
+
+    def acquire(self, size: int, headroom: int = 0) -> PooledBuffer:
+        """Mượn buffer có ít nhất size + headroom byte (headroom để dành cho padding).
+
+        Nội dung buffer mượn lại từ pool là rác của lần dùng trước, không phải 0.
+        """
+        if size < 0 or headroom < 0:
+            raise ValueError("size và headroom không được âm")
+        total = size + headroom
+        cls = self.size_class(total)
+        # Đường nóng: một lần lấy lock, không cấp phát gì ngoài view cắt từ buffer cũ
+        with self._lock:
+            self._acquires += 1
+            free = self._free.get(cls)
+            if free:
+                buf = free.pop()
+                self._retained -= cls
+                self._hits += 1
+            else:
+                buf = None
+                if cls is None:
+                    self._oversize += 1
+        if buf is None:
+            buf = PooledBuffer(self, cls or total)
+        buf.size = size
+        buf.headroom = headroom
+        buf.view = buf._full[:total]
+        return buf
+
+    def _put(self, buf: PooledBuffer) -> None:
+        cls = len(buf._raw)
+        with self._lock:
+            self._releases += 1
+            # Buffer quá lớn được cấp phát thẳng, trả lại thì bỏ luôn
+            if cls > self.max_class:
+                return
+            free = self._free.get(cls)
+            if free is None:
+                free = self._free[cls] = []
+            if len(free) >= self.per_class or self._retained + cls > self.max_bytes:
+                self._discarded += 1
+            else:
+                free.append(buf)
+                self._retained += cls
+
+    def clear(self) -> None:
+        """Bỏ mọi buffer rảnh đang giữ; số liệu thống kê giữ nguyên."""
+        with self._lock:
+            self._free.clear()
+            self._retained = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            misses = self._acquires - self._hits - self._oversize
+            return {
+                "acquires": self._acquires,
+                "hits": self._hits,
+                "misses": misses,
+                "oversize": self._oversize,
+                "discarded": self._discarded,
+                "outstanding": self._acquires - self._releases,
+                "retained_bytes": self._retained,
+                "hit_rate": self._hits / self._acquires if self._acquires else 0.0,
+                "free": {cls: len(free) for cls, free in sorted(self._free.items()) if free},
+            }
+
+# Pool mặc định cho cả process, các cipher wrapper đều mượn từ đây
+pool = BufferPool()
+
+def acquire(size: int, headroom: int = 0) -> PooledBuffer:
+    return pool.acquire(size, headroom)
+
+def stats() -> dict:
+    return pool.stats()
+
+def clear() -> None:
+    pool.clear()
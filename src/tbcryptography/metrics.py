@@ -0,0 +1,304 @@
+"""Đo đạc tùy chọn cho mọi cipher: số lần gọi, số byte, histogram latency,
+thời gian trong wrapper Python so với trong DLL.
+
+    from tbcryptography import metrics
+    metrics.enable()
+    ...
+    print(metrics.stats())
+    print(metrics.prometheus_text())
+
+Mặc định tắt. enable() thay các method công khai bằng bản có đo và bọc các
+hàm native của DLL đã load (và DLL load sau đó); disable() trả lại đúng hàm
+gốc, nên khi tắt không còn chút overhead nào trên đường nóng.
+"""
+import os
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+from importlib import import_module
+from typing import Any, Callable, Final, Optional
+
+from . import _native
+
+# Biên các bucket histogram (giây), kiểu 1-2.5-5 như Prometheus
+BUCKETS: Final = tuple(float(f"{m}e{e}") for e in range(-6, 1) for m in ("1", "2.5", "5")) + (10.0,)
+
+# (module, class, method, tên cipher, tên thao tác; số nguyên = vị trí tham số mode trong args)
+_METHODS: Final = (
+    (".tbstandard.caesar", "CaesarCipher", "process", "caesar", "process"),
+    (".tbstandard.caesar", "CaesarCipher", "process_bytes", "caesar", "process_bytes"),
+    (".tbstandard.atbash", "AtbashCipher", "process", "atbash", "process"),
+    (".tbstandard.atbash", "AtbashCipher", "process_bytes", "atbash", "process_bytes"),
+    (".tbstandard.vigenere", "VigenereCipher", "encrypt", "vigenere", "encrypt"),
+    (".tbstandard.vigenere", "VigenereCipher", "decrypt", "vigenere", "decrypt"),
+    (".tbstandard.vigenere", "VigenereCipher", "encrypt_bytes", "vigenere", "encrypt_bytes"),
+    (".tbstandard.vigenere", "VigenereCipher", "decrypt_bytes", "vigenere", "decrypt_bytes"),
+    (".tbstandard.enigma", "EnigmaMachine", "process_text", "enigma", "process_text"),
+    (".tbstandard.enigma", "EnigmaMachine", "process", "enigma", "process"),
+    (".tbcomplex.tbc", "TBCSession", "process", "tbc", 1),
+    (".tbcomplex.tbc", "TBCSession", "process_into", "tbc", 2),
+    (".tbcomplex.tbc", "TripleBlockCipher", "encrypt_into", "tbc", "encrypt_into"),
+    (".tbcomplex.tbc", "TripleBlockCipher", "decrypt_into", "tbc", "decrypt_into"),
+    (".tbcomplex.tbc", "TripleBlockCipher", "encrypt_many", "tbc", "encrypt_many"),
+    (".tbcomplex.tbc", "TripleBlockCipher", "decrypt_many", "tbc", "decrypt_many"),
+    (".tbcomplex.tfsc", "TebeeFastStreamCipher", "encrypt", "tfsc", "encrypt"),
+    (".tbcomplex.tfsc", "TebeeFastStreamCipher", "decrypt", "tfsc", "decrypt"),
+    (".tbcomplex.tfsc", "TebeeFastStreamCipher", "encrypt_inplace", "tfsc", "encrypt_inplace"),
+    (".tbcomplex.tfsc", "TebeeFastStreamCipher", "decrypt_inplace", "tfsc", "decrypt_inplace"),
+    (".tbcomplex.tfsc", "TebeeFastStreamCipher", "encrypt_file", "tfsc", "encrypt_file"),
+    (".tbcomplex.tfsc", "TebeeFastStreamCipher", "decrypt_file", "tfsc", "decrypt_file"),
+    (".tbcomplex.tfsc", "TebeeFastStreamCipher", "encrypt_many", "tfsc", "encrypt_many"),
+    (".tbcomplex.tfsc", "TebeeFastStreamCipher", "decrypt_many", "tfsc", "decrypt_many"),
+    (".tbcomplex.tfsc", "TFSCEncryptor", "update", "tfsc", "stream_encrypt"),
+    (".tbcomplex.tfsc", "TFSCDecryptor", "update", "tfsc", "stream_decrypt"),
+    (".tbcomplex.tbaems", "TBAEMS", "encrypt", "tbaems", "encrypt"),
+    (".tbcomplex.tbaems", "TBAEMS", "decrypt", "tbaems", "decrypt"),
+    (".tbcomplex.tbaems", "TBAEMS", "encrypt_inplace", "tbaems", "encrypt_inplace"),
+    (".tbcomplex.tbaems", "TBAEMS", "decrypt_inplace", "tbaems", "decrypt_inplace"),
+    (".tbcomplex.tbaems", "TBAEMS", "encrypt_file", "tbaems", "encrypt_file"),
+    (".tbcomplex.tbaems", "TBAEMS", "decrypt_file", "tbaems", "decrypt_file"),
+    (".tbcomplex.tbaems", "TBAEMS", "encrypt_many", "tbaems", "encrypt_many"),
+    (".tbcomplex.tbaems", "TBAEMS", "decrypt_many", "tbaems", "decrypt_many"),
+)
+
+# Hàm native được đo trong từng DLL
+_SYMBOLS: Final = {
+    "caesar": ("process",),
+    "atbash": ("process",),
+    "vigenere": ("vigenere_encrypt", "vigenere_decrypt"),
+    "tbc": ("Cipher_encrypt", "Cipher_decrypt", "EnigmaMachine_process"),
+    "tfsc": ("tfsc_encrypt", "tfsc_decrypt"),
+    "tbaems": ("Encrypt", "Decrypt"),
+}
+
+_lock = threading.Lock()
+_local = threading.local()
+_stats: dict[tuple[str, str], "_Stat"] = {}
+_sinks: list[Callable[[str, str, int, float, float], None]] = []
+_patched_methods: list[tuple[type, str, Any]] = []
+_patched_symbols: list[tuple[Any, str, Any]] = []
+enabled = False
+
+@_native.after_fork
+def _reset_after_fork() -> None:
+    # Số liệu là của từng process: process con bắt đầu từ 0, không đếm lại phần của cha
+    global _lock
+    _lock = threading.Lock()
+    _stats.clear()
+
+class _Stat:
+    __slots__ = ("calls", "errors", "bytes", "seconds", "native_seconds", "buckets")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.errors = 0
+        self.bytes = 0
+        self.seconds = 0.0
+        self.native_seconds = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)
+
+class _NativeTimer:
+    """Bọc một hàm ctypes: cộng thời gian chạy native vào lời gọi đang được đo.
+
+    argtypes/restype... đọc và ghi xuyên qua hàm gốc, nên wrapper có gắn
+    _setup_types sau khi DLL load cũng không sao.
+    """
+    __slots__ = ("_func",)
+
+    def __init__(self, func: Any) -> None:
+        object.__setattr__(self, "_func", func)
+
+    def __call__(self, *args):
+        start = time.perf_counter_ns()
+        try:
+            return self._func(*args)
+        finally:
+            _local.native = getattr(_local, "native", 0) + time.perf_counter_ns() - start
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._func, name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self._func, name, value)
+
+def _size(data: Any) -> int:
+    if isinstance(data, str):
+        return len(data)
+    try:
+        return memoryview(data).nbytes
+    except TypeError:
+        return 0
+
+def _total(items: Any) -> int:
+    # *_many: list message hoặc một buffer ghép
+    if isinstance(items, (list, tuple)):
+        return sum(_size(item) for item in items)
+    return _size(items)
+
+def _file_size(path: Any) -> int:
+    try:
+        return os.stat(path).st_size
+    except (OSError, TypeError, ValueError):
+        return 0
+
+def _sizer(method: str) -> Callable[[Any], int]:
+    if method.endswith("_many"):
+        return _total
+    if method.endswith("_file"):
+        return _file_size
+    return _size
+
+def record(cipher: str, op: str, nbytes: int, seconds: float, native_seconds: float = 0.0,
+           error: bool = False) -> None:
+    """Ghi một lần gọi; có thể gọi tay cho engine ngoài bộ đo sẵn."""
+    with _lock:
+        stat = _stats.get((cipher, op))
+        if stat is None:
+            stat = _stats[cipher, op] = _Stat()
+        stat.calls += 1
+        stat.errors += error
+        stat.bytes += nbytes
+        stat.seconds += seconds
+        stat.native_seconds += native_seconds
+        stat.buckets[bisect_left(BUCKETS, seconds)] += 1
+        sinks = list(_sinks)
+    for sink in sinks:
+        sink(cipher, op, nbytes, seconds, native_seconds)
+
+def _instrument(func: Callable, cipher: str, op: str | int, size: Callable[[Any], int]) -> Callable:
+    @wraps(func)
+    def wrapper(self, *args, **kwargs):
+        if isinstance(op, str):
+            name = op
+        else:
+            name = args[op] if len(args) > op else kwargs.get("mode", "encrypt")
+        key = (cipher, name)
+        active = getattr(_local, "active", None)
+        if active is None:
+            active = _local.active = set()
+        if key in active:
+            # process() -> process_into() cùng một thao tác: chỉ lớp ngoài cùng được đếm
+            return func(self, *args, **kwargs)
+        # Đo kích thước trước khi gọi vì encrypt() còn nới buffer để padding
+        nbytes = size(args[0] if args else next(iter(kwargs.values()), None))
+        # Lời gọi lồng nhau (encrypt_many -> encrypt_inplace...) giữ số native riêng
+        outer = getattr(_local, "native", 0)
+        _local.native = 0
+        active.add(key)
+        start = time.perf_counter_ns()
+        failed = True
+        try:
+            result = func(self, *args, **kwargs)
+            failed = False
+            return result
+        finally:
+            elapsed = time.perf_counter_ns() - start
+            active.discard(key)
+            native = _local.native
+            _local.native = outer + native
+            record(cipher, name, nbytes, elapsed / 1e9, native / 1e9, failed)
+    wrapper.__wrapped_metrics__ = func
+    return wrapper
+
+def _patch_library(name: str, lib: Any) -> None:
+    for symbol in _SYMBOLS.get(name, ()):
+        try:
+            func = getattr(lib, symbol)
+        except AttributeError:
+            continue
+        if isinstance(func, _NativeTimer):
+            continue
+        setattr(lib, symbol, _NativeTimer(func))
+        _patched_symbols.append((lib, symbol, func))
+
+def _on_load(name: str, lib: Any) -> None:
+    with _lock:
+        if enabled:
+            _patch_library(name, lib)
+
+def enable() -> None:
+    """Bật đo đạc cho cả process."""
+    global enabled
+    with _lock:
+        if enabled:
+            return
+        for module, cls_name, method, cipher, op in _METHODS:
+            cls = getattr(import_module(module, __package__), cls_name)
+            func = cls.__dict__[method]
+            setattr(cls, method, _instrument(func, cipher, op, _sizer(method)))
+            _patched_methods.append((cls, method, func))
+        for name, lib in list(_native._libs.items()):
+            _patch_library(name, lib)
+        _native.load_hooks.append(_on_load)
+        enabled = True
+
+def disable() -> None:
+    """Tắt đo đạc, trả lại method và hàm native gốc. Số liệu cũ vẫn giữ."""
+    global enabled
+    with _lock:
+        if not enabled:
+            return
+        _native.load_hooks.remove(_on_load)
+        for cls, method, func in reversed(_patched_methods):
+            setattr(cls, method, func)
+        for lib, symbol, func in reversed(_patched_symbols):
+            setattr(lib, symbol, func)
+        _patched_methods.clear()
+        _patched_symbols.clear()
+        enabled = False
+
+def reset() -> None:
+    with _lock:
+        _stats.clear()
+
+def add_sink(sink: Callable[[str, str, int, float, float], None]) -> None:
+    """Đăng ký callback(cipher, op, nbytes, seconds, native_seconds) cho mỗi lần gọi."""
+    with _lock:
+        _sinks.append(sink)
+
+def remove_sink(sink: Callable[[str, str, int, float, float], None]) -> None:
+    with _lock:
+        _sinks.remove(sink)
+
+def stats() -> dict[str, dict[str, dict]]:
+    """Số liệu hiện tại: {cipher: {op: {...}}}."""
+    with _lock:
+        items = [(key, stat, list(stat.buckets)) for key, stat in _stats.items()]
+    out: dict[str, dict[str, dict]] = {}
+    for (cipher, op), stat, buckets in items:
+        out.setdefault(cipher, {})[op] = {
+            "calls": stat.calls,
+            "errors": stat.errors,
+            "bytes": stat.bytes,
+            "seconds": stat.seconds,
+            "native_seconds": stat.native_seconds,
+            "wrapper_seconds": stat.seconds - stat.native_seconds,
+            "buckets": dict(zip([*BUCKETS, float("inf")], buckets)),
+        }
+    return out
+
+def prometheus_text(prefix: str = "tbcryptography") -> str:
+    """Xuất số liệu theo định dạng text của Prometheus."""
+    lines = [
+        f"# TYPE {prefix}_calls_total counter",
+        f"# TYPE {prefix}_errors_total counter",
+        f"# TYPE {prefix}_bytes_total counter",
+        f"# TYPE {prefix}_native_seconds_total counter",
+        f"# TYPE {prefix}_duration_seconds histogram",
+    ]
+    for cipher, ops in sorted(stats().items()):
+        for op, stat in sorted(ops.items()):
+            labels = f'cipher="{cipher}",op="{op}"'
+            lines.append(f"{prefix}_calls_total{{{labels}}} {stat['calls']}")
+            lines.append(f"{prefix}_errors_total{{{labels}}} {stat['errors']}")
+            lines.append(f"{prefix}_bytes_total{{{labels}}} {stat['bytes']}")
+            lines.append(f"{prefix}_native_seconds_total{{{labels}}} {stat['native_seconds']}")
+            cumulative = 0
+            for bound, count in stat["buckets"].items():
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{prefix}_duration_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+            lines.append(f"{prefix}_duration_seconds_sum{{{labels}}} {stat['seconds']}")
+            lines.append(f"{prefix}_duration_seconds_count{{{labels}}} {stat['calls']}")
+    return "\n".join(lines) + "\n"
@@ -1,57 +1,143 @@
 import ctypes
+import mmap
 import os
-from pathlib import Path
-from typing import Final, Optional
+import threading
+import weakref
+from collections import OrderedDict
+from concurrent.futures import Executor
+from contextlib import contextmanager
+from typing import Final, Iterator, Optional, Sequence
+
+from .. import _batch, _native
+from .._native import load_library
+
+_POOL_SIZE: Final = 256
+
+def _as_writable(data) -> memoryview:
+    view = memoryview(data).cast("B")
+    if view.readonly:
+        raise TypeError("Data phải là buffer ghi được nha!")
+    return view
 
 class TBAEMS:
     _lib: Optional[ctypes.CDLL] = None
+    _lib_lock = threading.Lock()
 
     def __init__(self, key_data: bytes) -> None:
-        __base__ = Path(__file__).resolve().parent.parent
-        dll_path = __base__ / "bin" / "tbaems.dll"
-        
-        # Thêm thư mục bin vào DLL path cho Windows
-        if hasattr(os, 'add_dll_directory'):
-            os.add_dll_directory(str(__base__ / "bin"))
-            
-        self.__lib__ = ctypes.CDLL(str(dll_path), winmode=0)
-        self._setup_types()
+        # DLL load và khai báo kiểu một lần cho cả process, instance chỉ dùng lại
+        self.__lib__ = self._load()
         
         if len(key_data) < 32:
             raise ValueError("Key must be 32 bytes.")
-        
+        # Giữ lại key để pickle: process nhận CreateAEMS lại từ đúng key này
+        self._key = bytes(key_data)
+
         # Truyền Key dưới dạng mảng byte thô
-        self._instance = self.__lib__.CreateAEMS(key_data)
+        self._instance = self.__lib__.CreateAEMS(self._key)
+        # Instance C++ được DeleteAEMS khi close() hoặc khi object bị GC
+        self._finalizer = weakref.finalize(self, self.__lib__.DeleteAEMS, self._instance)
+        # Số lời gọi DLL đang chạy: close() chờ về 0 rồi mới DeleteAEMS
+        self._calls = 0
+        self._closing = False
+        self._cond = threading.Condition()
+        _native.track_fork(self)
+
+    @classmethod
+    def _load(cls) -> ctypes.CDLL:
+        lib = cls._lib
+        if lib is None:
+            with cls._lib_lock:
+                if TBAEMS._lib is None:
+                    # winmode=0 để load đúng các dependency của DLL
+                    lib = load_library("tbaems", winmode=0)
+                    cls._setup_types(lib)
+                    TBAEMS._lib = lib
+                lib = TBAEMS._lib
+        return lib
+
+    @property
+    def closed(self) -> bool:
+        return not self._finalizer.alive
+
+    def close(self) -> None:
+        """Giải phóng instance C++, chờ các lời gọi đang chạy ở thread khác xong trước.
+
+        Sau khi close() bắt đầu thì lời gọi mới bị từ chối.
+        """
+        with self._cond:
+            self._closing = True
+            self._cond.wait_for(lambda: not self._calls)
+            self._finalizer()
+
+    def _after_fork(self) -> None:
+        # Thread đang gọi DLL không đi theo sang process con
+        self._calls = 0
+        self._cond = threading.Condition()
+
+    def __enter__(self) -> "TBAEMS":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
 
-    def _setup_types(self) -> None:
+    def __reduce__(self):
+        # Con trỏ instance C++ chỉ có nghĩa trong process này: gửi key, bên nhận tạo lại
+        self._handle()
+        return TBAEMS, (self._key,)
+
+    def _handle(self) -> int:
+        if self._closing or not self._finalizer.alive:
+            raise ValueError("TBAEMS đã đóng rồi")
+        return self._instance
+
+    @contextmanager
+    def _native_call(self) -> Iterator[int]:
+        """Lấy handle cho một lời gọi DLL; instance không bị DeleteAEMS khi lời gọi chưa xong."""
+        with self._cond:
+            handle = self._handle()
+            self._calls += 1
+        try:
+            yield handle
+        finally:
+            with self._cond:
+                self._calls -= 1
+                if not self._calls:
+                    self._cond.notify_all()
+
+    @staticmethod
+    def _setup_types(lib: ctypes.CDLL) -> None:
         # CreateAEMS: nhận con trỏ dữ liệu thô
-        self.__lib__.CreateAEMS.argtypes = [ctypes.c_void_p]
-        self.__lib__.CreateAEMS.restype = ctypes.c_void_p
+        lib.CreateAEMS.argtypes = [ctypes.c_void_p]
+        lib.CreateAEMS.restype = ctypes.c_void_p
 
         # Encrypt: tham số cuối là con trỏ uint8 (cho Nonce)
-        self.__lib__.Encrypt.argtypes = [
+        lib.Encrypt.argtypes = [
             ctypes.c_void_p, 
             ctypes.POINTER(ctypes.c_uint8), 
             ctypes.c_size_t, 
             ctypes.c_size_t,
             ctypes.c_void_p # Nonce pointer
         ]
-        self.__lib__.Encrypt.restype = ctypes.c_size_t
+        lib.Encrypt.restype = ctypes.c_size_t
         
-        self.__lib__.Decrypt.argtypes = [
+        lib.Decrypt.argtypes = [
             ctypes.c_void_p, 
             ctypes.POINTER(ctypes.c_uint8), 
             ctypes.c_size_t,
             ctypes.c_void_p
         ]
-        self.__lib__.Decrypt.restype = ctypes.c_size_t
+        lib.Decrypt.restype = ctypes.c_size_t
+
+        lib.DeleteAEMS.argtypes = [ctypes.c_void_p]
+        lib.DeleteAEMS.restype = None
+
+        lib.GenerateKey256bit.argtypes = [ctypes.POINTER(ctypes.c_uint8)]
+        lib.GenerateKey256bit.restype = None
 
     @staticmethod
     def generate_key_256() -> bytes:
-        __base__ = Path(__file__).resolve().parent.parent
-        dll = ctypes.CDLL(str(__base__ / "bin" / "tbaems.dll"), winmode=0)
         buffer = (ctypes.c_uint8 * 32)()
-        dll.GenerateKey256bit(buffer)
+        TBAEMS._load().GenerateKey256bit(buffer)
         return bytes(buffer)
 
     def encrypt(self, data: bytearray, nonce: bytes) -> int:
@@ -60,16 +146,171 @@ class TBAEMS:
         padded_length = ((length // 16) + 1) * 16
         if length < padded_length:
             data.extend(b'\x00' * (padded_length - length))
-        
-        new_length = len(data)
-        ptr = (ctypes.c_uint8 * new_length).from_buffer(data)
-        # Gọi DLL mã hóa
-        self.__lib__.Encrypt(self._instance, ptr, length, new_length, nonce)
-        return new_length
+        return self.encrypt_inplace(data, length, nonce)
 
     def decrypt(self, data: bytearray, nonce: bytes) -> int:
-        length = len(data)
-        ptr = (ctypes.c_uint8 * length).from_buffer(data)
+        return self.decrypt_inplace(data, nonce)
+
+    def encrypt_inplace(self, buffer, length: int, nonce: bytes) -> int:
+        """Mã hóa `length` byte đầu của `buffer` tại chỗ, padding ghi luôn vào buffer.
+
+        `buffer` là bất kỳ buffer ghi được nào (PooledBuffer.view, mmap,
+        memoryview...) và phải còn chỗ cho padding (tới bội số 16 kế tiếp).
+        Trả về độ dài sau padding.
+        """
+        view = _as_writable(buffer)
+        padded_length = ((length // 16) + 1) * 16
+        if length < 0 or padded_length > len(view):
+            raise ValueError(f"Buffer không đủ chỗ cho padding: cần {padded_length} byte")
+        ptr = (ctypes.c_uint8 * padded_length).from_buffer(view)
+        # Gọi DLL mã hóa
+        with self._native_call() as handle:
+            self.__lib__.Encrypt(handle, ptr, length, padded_length, nonce)
+        return padded_length
+
+    def decrypt_inplace(self, buffer, nonce: bytes) -> int:
+        """Giải mã cả `buffer` tại chỗ, trả về size thật mà DLL báo."""
+        view = _as_writable(buffer)
+        length = len(view)
+        ptr = (ctypes.c_uint8 * length).from_buffer(view)
         # DLL trả về size thực tế sau khi giải mã
-        actual_size = self.__lib__.Decrypt(self._instance, ptr, length, nonce)
+        with self._native_call() as handle:
+            actual_size = self.__lib__.Decrypt(handle, ptr, length, nonce)
+        return actual_size
+
+    def encrypt_file(self, path: str | os.PathLike, nonce: bytes) -> int:
+        """Mã hóa cả file tại chỗ qua mmap, trả về kích thước file mới.
+
+        Encrypt của DLL mã hóa cả message trong một lần gọi nên file được map
+        một lần, chỉ nới thêm ở cuối đủ chỗ padding; không đọc vào RAM, không
+        tạo bản copy thứ hai. Không nguyên tử: bị ngắt giữa chừng thì file hỏng.
+        """
+        with open(path, "r+b") as f:
+            length = os.fstat(f.fileno()).st_size
+            padded_length = ((length // 16) + 1) * 16
+            f.truncate(padded_length)
+            with mmap.mmap(f.fileno(), padded_length, access=mmap.ACCESS_WRITE) as mm:
+                ptr = (ctypes.c_uint8 * padded_length).from_buffer(mm)
+                try:
+                    with self._native_call() as handle:
+                        new_length = self.__lib__.Encrypt(handle, ptr, length, padded_length, nonce)
+                finally:
+                    # Phải nhả buffer trước khi đóng mmap
+                    del ptr
+            f.truncate(new_length)
+        return new_length
+
+    def decrypt_file(self, path: str | os.PathLike, nonce: bytes) -> int:
+        """Giải mã cả file tại chỗ qua mmap rồi cắt về size thật mà DLL trả về."""
+        with open(path, "r+b") as f:
+            length = os.fstat(f.fileno()).st_size
+            if not length:
+                raise ValueError("File rỗng, không có gì để giải mã")
+            with mmap.mmap(f.fileno(), length, access=mmap.ACCESS_WRITE) as mm:
+                ptr = (ctypes.c_uint8 * length).from_buffer(mm)
+                try:
+                    with self._native_call() as handle:
+                        actual_size = self.__lib__.Decrypt(handle, ptr, length, nonce)
+                finally:
+                    del ptr
+            f.truncate(actual_size)
         return actual_size
+
+    def encrypt_many(self, items: Sequence, nonces: Sequence[bytes], offsets: Optional[Sequence[int]] = None,
+                     workers: Optional[int] = None, executor: Optional[Executor] = None) -> list[bytearray]:
+        """Mã hóa nhiều message song song, mỗi message một nonce; kết quả theo đúng thứ tự.
+
+        `items` là list buffer, hoặc một buffer ghép kèm `offsets` (n + 1 biên).
+        Encrypt của DLL chỉ đọc instance nên các thread dùng chung được.
+        """
+        items = _batch.split(items, offsets)
+        if len(nonces) != len(items):
+            raise ValueError("Số nonce phải bằng số message")
+
+        def _one(job) -> bytearray:
+            item, nonce = job
+            # Cấp phát đủ chỗ padding ngay từ đầu, khỏi nới bytearray rồi copy lại
+            length = memoryview(item).nbytes
+            data = bytearray(((length // 16) + 1) * 16)
+            data[:length] = item
+            self.encrypt_inplace(data, length, nonce)
+            return data
+
+        return _batch.run(_one, list(zip(items, nonces)), workers, executor)
+
+    def decrypt_many(self, items: Sequence, nonces: Sequence[bytes], offsets: Optional[Sequence[int]] = None,
+                     workers: Optional[int] = None, executor: Optional[Executor] = None) -> list[bytearray]:
+        """Giải mã nhiều message song song, trả về dữ liệu đã cắt đúng size thật."""
+        items = _batch.split(items, offsets)
+        if len(nonces) != len(items):
+            raise ValueError("Số nonce phải bằng số message")
+
+        def _one(job) -> bytearray:
+            item, nonce = job
+            data = bytearray(item)
+            del data[self.decrypt(data, nonce):]
+            return data
+
+        return _batch.run(_one, list(zip(items, nonces)), workers, executor)
+
+@_native.after_fork
+def _reset_lib_lock() -> None:
+    # Thread khác có thể đang giữ lock lúc fork
+    TBAEMS._lib_lock = threading.Lock()
+
+class TBAEMSPool:
+    """Cache instance TBAEMS theo key, LRU có giới hạn.
+
+    Dùng cho server nhiều tenant: mỗi key chỉ CreateAEMS một lần, và số
+    instance C++ sống cùng lúc không vượt quá `max_size`.
+    """
+
+    def __init__(self, max_size: int = _POOL_SIZE) -> None:
+        self.max_size = max_size
+        self._instances: OrderedDict[bytes, TBAEMS] = OrderedDict()
+        self._lock = threading.Lock()
+        _native.track_fork(self)
+
+    def _after_fork(self) -> None:
+        # Instance C++ được copy theo process con nên dùng tiếp được, chỉ lock phải tạo lại
+        self._lock = threading.Lock()
+
+    def __reduce__(self):
+        # Chỉ gửi cấu hình; process nhận tạo instance cho từng key khi cần tới
+        return TBAEMSPool, (self.max_size,)
+
+    def __len__(self) -> int:
+        return len(self._instances)
+
+    def get(self, key_data: bytes) -> TBAEMS:
+        key = bytes(key_data)
+        with self._lock:
+            cipher = self._instances.get(key)
+            if cipher is not None:
+                self._instances.move_to_end(key)
+                return cipher
+        cipher = TBAEMS(key)
+        if self.max_size <= 0:
+            return cipher
+        with self._lock:
+            # Thread khác có thể đã tạo trước, dùng chung bản đó
+            cipher = self._instances.setdefault(key, cipher)
+            self._instances.move_to_end(key)
+            while len(self._instances) > self.max_size:
+                # Instance bị đẩy ra được DeleteAEMS khi không còn ai dùng
+                self._instances.popitem(last=False)
+        return cipher
+
+    def close(self) -> None:
+        """Giải phóng mọi instance đang được cache."""
+        with self._lock:
+            ciphers = list(self._instances.values())
+            self._instances.clear()
+        for cipher in ciphers:
+            cipher.close()
+
+    def __enter__(self) -> "TBAEMSPool":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -1,4 +1,13 @@
+"""Terminal TBAEMS tương tác cũ, đã ngừng phát triển.
+
+Dùng CLI không tương tác thay thế:
+
+    python -m tbcryptography keygen tbaems -o k.bin
+    python -m tbcryptography tbaems encrypt --key-file k.bin -o data.tb data
+    python -m tbcryptography tbaems decrypt --key-file k.bin -o data data.tb
+"""
 import sys
+import warnings
 import os
 import ctypes
 from binascii import hexlify, unhexlify
@@ -6,6 +15,9 @@ from binascii import hexlify, unhexlify
 # Thêm đường dẫn tới class AEMS của anh
 from tbcryptography.tbcomplex.tbaems import TBAEMS  # Đảm bảo file tbaems.py nằm cùng thư mục
 
+warnings.warn("tbcryptography.tbcomplex.tbaems_cli đã ngừng phát triển, dùng "
+              "`python -m tbcryptography tbaems ...` thay thế", FutureWarning, stacklevel=2)
+
 class TBAEMS_Terminal(ctypes.Structure):
     def __init__(self):
         self.key = None
@@ -16,6 +28,7 @@ class TBAEMS_Terminal(ctypes.Structure):
         print("="*50)
         print("TBAEMS TERMINAL v1.0 - ENCRYPTION SYSTEM")
         print("Type \\help to see available commands")
+        print("Deprecated: use `python -m tbcryptography tbaems encrypt|decrypt` instead")
         print("="*50)
         
         while True:
@@ -0,0 +1,265 @@
+import os
+import struct
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import BinaryIO, Final, Iterator, Optional
+
+from .. import buffers
+from .tbaems import TBAEMS
+
+# Định dạng file:
+#   header  : magic "TBAC", version, chunk_size, nonce gốc 16 byte
+#   chunks  : từng chunk plaintext (chunk_size byte, chunk cuối có thể ngắn hơn)
+#             được Encrypt riêng với nonce = nonce gốc + số thứ tự chunk
+#   index   : mỗi chunk một dòng (offset, độ dài đã mã hóa, độ dài thật)
+#   trailer : số chunk, tổng số byte thật, magic "TBAI"
+# Nhờ index ở cuối mà đọc một đoạn byte bất kỳ chỉ cần giải mã vài chunk.
+MAGIC: Final = b"TBAC"
+VERSION: Final = 1
+NONCE_SIZE: Final = 16
+DEFAULT_CHUNK_SIZE: Final = 1 << 20
+
+_HEADER = struct.Struct("<4sB3xI16s")
+_ENTRY = struct.Struct("<QII")
+_TRAILER = struct.Struct("<QQ4s")
+_TRAILER_MAGIC: Final = b"TBAI"
+
+def chunk_nonce(nonce: bytes, index: int) -> bytes:
+    """Nonce của chunk thứ `index`: nonce gốc cộng index (số 128-bit little-endian)."""
+    value = (int.from_bytes(nonce, "little") + index) % (1 << 128)
+    return value.to_bytes(NONCE_SIZE, "little")
+
+class _ChunkPool:
+    """Thread pool dùng chung cho reader/writer; workers=1 thì chạy tuần tự."""
+    def __init__(self, workers: Optional[int]) -> None:
+        self.workers = workers or os.cpu_count() or 1
+        self._executor = ThreadPoolExecutor(self.workers) if self.workers > 1 else None
+
+    def map(self, func, *iterables) -> list:
+        # ctypes nhả GIL trong lúc gọi DLL nên các chunk chạy song song thật
+        if self._executor is None:
+            return list(map(func, *iterables))
+        return list(self._executor.map(func, *iterables))
+
+    def run_all(self, func, *iterables) -> list[Future]:
+        """Như map() nhưng trả về Future đã xong của từng phần tử, kể cả khi có
+        phần tử lỗi, để caller dọn được kết quả của các phần tử chạy thành công.
+        Chạy tuần tự thì dừng ở phần tử lỗi đầu tiên."""
+        if self._executor is None:
+            futures = []
+            for args in zip(*iterables):
+                future = Future()
+                futures.append(future)
+                try:
+                    future.set_result(func(*args))
+                except Exception as exc:
+                    future.set_exception(exc)
+                    break
+            return futures
+        futures = [self._executor.submit(func, *args) for args in zip(*iterables)]
+        wait(futures)
+        return futures
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+
+class TBAEMSWriter:
+    """Ghi dữ liệu thành file container TBAEMS, mã hóa nhiều chunk song song.
+
+    Chỉ giữ trong RAM tối đa `workers * 2` chunk; close() ghi phần còn lại
+    cùng index và trailer.
+    """
+
+    def __init__(self, fileobj: BinaryIO, cipher: TBAEMS, nonce: Optional[bytes] = None,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE, workers: Optional[int] = None) -> None:
+        if chunk_size <= 0 or chunk_size % 16 != 0:
+            raise ValueError("chunk_size phải là bội số dương của 16")
+        if nonce is None:
+            nonce = os.urandom(NONCE_SIZE)
+        if len(nonce) != NONCE_SIZE:
+            raise ValueError(f"Nonce phải đúng {NONCE_SIZE} byte")
+
+        self._file = fileobj
+        self._cipher = cipher
+        self.nonce = bytes(nonce)
+        self.chunk_size = chunk_size
+        self._pool = _ChunkPool(workers)
+        self._batch = self._pool.workers * 2
+
+        # Chunk đang điền dở và các chunk đầy chờ mã hóa, đều nằm sẵn trong
+        # buffer mượn từ pool (kèm 16 byte cho padding): dữ liệu chỉ copy một lần
+        self._current: Optional[buffers.PooledBuffer] = None
+        self._filled = 0
+        self._chunks: list[tuple[buffers.PooledBuffer, int]] = []
+        self._index: list[tuple[int, int, int]] = []
+        self._offset = _HEADER.size
+        self._size = 0
+        self.closed = False
+
+        self._file.write(_HEADER.pack(MAGIC, VERSION, chunk_size, self.nonce))
+
+    def _seal(self, index: int, chunk: tuple[buffers.PooledBuffer, int]) -> int:
+        # Mã hóa tại chỗ trong buffer của chunk, padding ghi vào phần headroom
+        buf, length = chunk
+        return self._cipher.encrypt_inplace(buf.view, length, chunk_nonce(self.nonce, index))
+
+    def _flush(self) -> None:
+        first = len(self._index)
+        chunks, self._chunks = self._chunks, []
+        try:
+            # run_all chờ mọi chunk xong rồi mới trả về, nên không buffer nào
+            # bị trả lại pool khi thread khác còn đang ghi lên nó
+            futures = self._pool.run_all(self._seal, range(first, first + len(chunks)), chunks)
+            for (buf, length), future in zip(chunks, futures):
+                # Chunk lỗi thì ném lỗi ra ở đây, các chunk sau không được ghi
+                sealed = future.result()
+                self._file.write(buf.view[:sealed])
+                self._index.append((self._offset, sealed, length))
+                self._offset += sealed
+        finally:
+            for buf, _ in chunks:
+                buf.release()
+
+    def write(self, data) -> int:
+        if self.closed:
+            raise ValueError("write() trên container đã đóng")
+        view = memoryview(data).cast("B")
+        size = self.chunk_size
+        pos = 0
+        # Chép thẳng vào buffer của chunk đang điền, không qua buffer trung gian
+        while pos < len(view):
+            if self._current is None:
+                self._current = buffers.acquire(size, headroom=16)
+                self._filled = 0
+            n = min(size - self._filled, len(view) - pos)
+            self._current.view[self._filled:self._filled + n] = view[pos:pos + n]
+            self._filled += n
+            pos += n
+            if self._filled == size:
+                self._chunks.append((self._current, size))
+                self._current = None
+                if len(self._chunks) >= self._batch:
+                    self._flush()
+        self._size += len(view)
+        return len(view)
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        if self._current is not None:
+            # Chunk cuối có thể ngắn hơn chunk_size; rỗng thì chỉ trả lại buffer
+            if self._filled:
+                self._chunks.append((self._current, self._filled))
+            else:
+                self._current.release()
+            self._current = None
+        self._flush()
+        for entry in self._index:
+            self._file.write(_ENTRY.pack(*entry))
+        self._file.write(_TRAILER.pack(len(self._index), self._size, _TRAILER_MAGIC))
+        self._pool.shutdown()
+        self.closed = True
+
+    def __enter__(self) -> "TBAEMSWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+class TBAEMSReader:
+    """Đọc file container TBAEMS; file phải seek được.
+
+    read(offset, length) chỉ đọc và giải mã các chunk chứa đoạn byte cần lấy.
+    """
+
+    def __init__(self, fileobj: BinaryIO, cipher: TBAEMS, workers: Optional[int] = None) -> None:
+        self._file = fileobj
+        self._cipher = cipher
+
+        file_size = fileobj.seek(0, os.SEEK_END)
+        if file_size < _HEADER.size + _TRAILER.size:
+            raise ValueError("Không phải file container TBAEMS")
+        fileobj.seek(0)
+        magic, version, self.chunk_size, self.nonce = _HEADER.unpack(fileobj.read(_HEADER.size))
+        if magic != MAGIC:
+            raise ValueError("Không phải file container TBAEMS")
+        if version != VERSION:
+            raise ValueError(f"Không hỗ trợ container TBAEMS version {version}")
+        if self.chunk_size <= 0 or self.chunk_size % 16 != 0:
+            raise ValueError(f"Header hỏng: chunk_size {self.chunk_size} không phải bội số dương của 16")
+
+        fileobj.seek(file_size - _TRAILER.size)
+        count, self.size, tail = _TRAILER.unpack(fileobj.read(_TRAILER.size))
+        if tail != _TRAILER_MAGIC:
+            raise ValueError("Container TBAEMS bị cắt cụt hoặc hỏng trailer")
+        index_start = file_size - _TRAILER.size - count * _ENTRY.size
+        if index_start < _HEADER.size:
+            raise ValueError(f"Trailer hỏng: {count} chunk không vừa trong file {file_size} byte")
+        fileobj.seek(index_start)
+        self._index = list(_ENTRY.iter_unpack(fileobj.read(count * _ENTRY.size)))
+        self._check_index(index_start)
+        self._pool = _ChunkPool(workers)
+
+    def _check_index(self, index_start: int) -> None:
+        # read() tính chunk theo offset // chunk_size: index phải khớp đúng như
+        # writer ghi ra, không thì trả về sai đoạn mà không báo lỗi
+        total = 0
+        last = len(self._index) - 1
+        for i, (offset, sealed, length) in enumerate(self._index):
+            if offset < _HEADER.size or offset + sealed > index_start:
+                raise ValueError(f"Index hỏng: chunk {i} nằm ngoài vùng dữ liệu của file")
+            if not 0 < length <= self.chunk_size or (i < last and length != self.chunk_size) or sealed < length:
+                raise ValueError(f"Index hỏng: độ dài chunk {i} không khớp chunk_size")
+            total += length
+        if total != self.size:
+            raise ValueError(f"Index hỏng: tổng độ dài các chunk {total} khác kích thước {self.size}")
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _open(self, index: int, raw: memoryview) -> bytes:
+        length = self._index[index][2]
+        # Giải mã trong buffer mượn từ pool, chỉ phần bytes trả về là cấp phát mới
+        with buffers.acquire(len(raw)) as buf:
+            buf.view[:] = raw
+            if self._cipher.decrypt_inplace(buf.view, chunk_nonce(self.nonce, index)) != length:
+                raise ValueError(f"Chunk {index} giải mã sai độ dài, sai key hoặc file hỏng")
+            return bytes(buf.view[:length])
+
+    def _chunks(self, first: int, last: int) -> list[bytes]:
+        # Các chunk nằm liền nhau nên đọc một lần rồi cắt ra (view, không copy)
+        start = self._index[first][0]
+        end = self._index[last - 1][0] + self._index[last - 1][1]
+        self._file.seek(start)
+        raw = memoryview(self._file.read(end - start))
+        parts = [raw[offset - start:offset - start + sealed] for offset, sealed, _ in self._index[first:last]]
+        return self._pool.map(self._open, range(first, last), parts)
+
+    def read(self, offset: int = 0, length: Optional[int] = None) -> bytes:
+        """Giải mã `length` byte bắt đầu từ `offset` (mặc định tới hết file)."""
+        if offset < 0:
+            raise ValueError("offset phải >= 0")
+        end = self.size if length is None else min(self.size, offset + length)
+        if offset >= end:
+            return b""
+        first = offset // self.chunk_size
+        last = (end - 1) // self.chunk_size + 1
+        data = b"".join(self._chunks(first, last))
+        base = first * self.chunk_size
+        return data[offset - base:end - base]
+
+    def iter_chunks(self) -> Iterator[bytes]:
+        """Giải mã tuần tự cả file, mỗi lần một loạt chunk để RAM không phình."""
+        batch = self._pool.workers * 2
+        for first in range(0, len(self._index), batch):
+            last = min(first + batch, len(self._index))
+            yield from self._chunks(first, last)
+
+    def close(self) -> None:
+        self._pool.shutdown()
+
+    def __enter__(self) -> "TBAEMSReader":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
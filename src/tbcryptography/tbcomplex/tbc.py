@@ -1,20 +1,279 @@
 import ctypes
-from pathlib import Path
-from typing import Final # Python 3.14 thích sự rõ ràng!
+import queue
+import threading
+import weakref
+from collections import OrderedDict
+from concurrent.futures import Executor
+from typing import Final, Optional, Sequence # Python 3.14 thích sự rõ ràng!
+
+from .. import _batch, _compat, _native, backends, buffers
+from .._native import load_library
+
+# Layout của EnigmaMachine bên tbc.dll (đọc từ EnigmaMachine_process):
+# 10 rotor liền nhau, mỗi rotor là forward[256] + backward[256] + 1 byte vị trí,
+# sau cùng là reflector[256]. Vị trí các rotor là một bộ đếm cơ số 256.
+_ENIGMA_ROTORS: Final = 10
+_ENIGMA_STRIDE: Final = 0x201
+_ENIGMA_REFLECTOR: Final = _ENIGMA_ROTORS * _ENIGMA_STRIDE
+_ENIGMA_SIZE: Final = _ENIGMA_REFLECTOR + 256
+# Số session (cặp khóa) giữ sẵn handle C++ trong mỗi TripleBlockCipher
+_MAX_SESSIONS: Final = 32
+
+class _EnigmaTier:
+    """Bản chụp EnigmaMachine vừa tạo bên C++ để chạy Tầng 3 cho cả buffer một lượt."""
+
+    def __init__(self, raw: bytes) -> None:
+        if len(raw) != _ENIGMA_SIZE:
+            raise ValueError(f"Snapshot EnigmaMachine phải đúng {_ENIGMA_SIZE} byte")
+        offsets = [i * _ENIGMA_STRIDE for i in range(_ENIGMA_ROTORS)]
+        self.forward = [raw[o:o + 256] for o in offsets]
+        self.backward = [raw[o + 256:o + 512] for o in offsets]
+        self.reflector = raw[_ENIGMA_REFLECTOR:_ENIGMA_SIZE]
+        # Rotor 0 là chữ số thấp nhất của bộ đếm
+        self.start = int.from_bytes(bytes(raw[o + 512] for o in offsets), "little")
+        self._arrays = None
+
+    @classmethod
+    def from_handle(cls, handle: int) -> "_EnigmaTier":
+        return cls(ctypes.string_at(handle, _ENIGMA_SIZE))
+
+    def process(self, np, data) -> None:
+        """Chạy Tầng 3 tại chỗ trên `data`, y hệt gọi EnigmaMachine_process từng byte."""
+        buf = np.frombuffer(data, dtype=np.uint8)
+        if self._arrays is None:
+            self._arrays = (
+                [np.frombuffer(t, dtype=np.uint8) for t in self.forward],
+                [np.frombuffer(t, dtype=np.uint8) for t in self.backward],
+                np.frombuffer(self.reflector, dtype=np.uint8),
+                np.arange(256, dtype=np.uint8),
+            )
+        forward, backward, reflector, identity = self._arrays
+
+        counter = self.start
+        done = 0
+        while done < buf.size:
+            # Byte thứ k dùng vị trí counter + k (rotor xoay trước rồi mới mã hóa)
+            first = (counter + 1) % (1 << (8 * _ENIGMA_ROTORS))
+            lo = first & 0xFFFF
+            # Trong một đoạn, rotor 2..9 đứng yên cho tới khi rotor 1 tràn
+            count = min(buf.size - done, (1 << 16) - lo)
+            high = (first >> 16).to_bytes(_ENIGMA_ROTORS - 2, "little")
+
+            # Rotor 2..9 + reflector ở vị trí cố định gộp lại thành một bảng 256
+            middle = identity
+            for i in range(2, _ENIGMA_ROTORS):
+                p = np.uint8(high[i - 2])
+                middle = forward[i][middle + p] - p
+            middle = reflector[middle]
+            for i in range(_ENIGMA_ROTORS - 1, 1, -1):
+                p = np.uint8(high[i - 2])
+                middle = backward[i][middle + p] - p
+
+            seg = buf[done:done + count]
+            low = np.arange(lo, lo + count, dtype=np.uint16)
+            p0 = low.astype(np.uint8)
+            p1 = (low >> 8).astype(np.uint8)
+            # Cộng/trừ uint8 tự quay vòng mod 256 như bên C++
+            x = forward[0][seg + p0] - p0
+            x = forward[1][x + p1] - p1
+            x = middle[x]
+            x = backward[1][x + p1] - p1
+            seg[:] = backward[0][x + p0] - p0
+
+            counter = first + count - 1
+            done += count
+
+def _native_enigma(session: "TBCSession", e_ptr: int, buffer) -> None:
+    # Duyệt từng byte qua DLL, trả máy về trạng thái ban đầu trước đã
+    ctypes.memmove(e_ptr, session._snapshot, _ENIGMA_SIZE)
+    process = session._lib.EnigmaMachine_process
+    for i in range(len(buffer)):
+        buffer[i] = process(e_ptr, buffer[i])
+
+def _numpy_enigma(session: "TBCSession", e_ptr: int, buffer) -> None:
+    # Chạy cả buffer bằng NumPy trên bản chụp, không qua ctypes từng byte
+    session._tier.process(_compat.numpy(), buffer)
+
+def _enigma_sample(size: int) -> tuple:
+    session = TripleBlockCipher(max_sessions=0).session(7, 1.5)
+    return session, session._handles[1], (ctypes.c_uint8 * size)()
+
+def _release(lib: ctypes.CDLL, handles: list) -> None:
+    # Giải phóng memory bên phía C++ (gọi qua close() hoặc khi session bị GC)
+    c_ptr, e_ptr = handles
+    handles[:] = [None, None]
+    if c_ptr is not None:
+        lib.Cipher_delete(c_ptr)
+    if e_ptr is not None:
+        lib.EnigmaMachine_delete(e_ptr)
+
+class TBCSession:
+    """Giữ sẵn handle C++ của một cặp (block_key, enigma_key) cho nhiều message.
+
+    EnigmaMachine chỉ được tạo một lần; trạng thái ban đầu được chụp lại và
+    khôi phục trước mỗi message. Cipher handle chỉ lưu kích thước tối đa nên
+    được tái sử dụng, chỉ cấp lại khi gặp message dài hơn.
+    """
+
+    def __init__(self, lib: ctypes.CDLL, block_key: int, enigma_key: float) -> None:
+        self._lib = lib
+        self.block_key = block_key
+        self.enigma_key = enigma_key
+        self._capacity = 0
+        self._lock = threading.Lock()
+
+        e_ptr = lib.EnigmaMachine_new(ctypes.c_float(enigma_key))
+        self._handles = [None, e_ptr]
+        self._finalizer = weakref.finalize(self, _release, lib, self._handles)
+        self._snapshot = ctypes.string_at(e_ptr, _ENIGMA_SIZE)
+        self._tier = _EnigmaTier(self._snapshot)
+        _native.track_fork(self)
+
+    def _after_fork(self) -> None:
+        # Handle C++ được copy theo process con; Enigma được khôi phục từ bản
+        # chụp trước mỗi message nên dù fork giữa chừng vẫn dùng tiếp được
+        self._lock = threading.Lock()
+
+    def __reduce__(self):
+        # Con trỏ C++ không đi qua pickle được: gửi cặp khóa, bên nhận tạo session mới
+        if self.closed:
+            raise ValueError("TBCSession đã đóng rồi")
+        return _restore_session, (self.block_key, self.enigma_key)
+
+    @property
+    def closed(self) -> bool:
+        return not self._finalizer.alive
+
+    def close(self) -> None:
+        """Giải phóng handle C++ ngay, không chờ GC."""
+        with self._lock:
+            self._finalizer()
+
+    def __enter__(self) -> "TBCSession":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __cipher_handle__(self, data_len: int) -> int:
+        c_ptr = self._handles[0]
+        if c_ptr is None or data_len > self._capacity:
+            if c_ptr is not None:
+                self._lib.Cipher_delete(c_ptr)
+                self._handles[0] = None
+            # Cipher::encrypt/decrypt chỉ cần size <= kích thước lúc tạo
+            c_ptr = self._lib.Cipher_new(ctypes.c_size_t(max(data_len, 1)))
+            self._handles[0] = c_ptr
+            self._capacity = max(data_len, 1)
+        return c_ptr
+
+    def __enigma_layer__(self, e_ptr: int, buffer) -> None:
+        """Tầng 3: chạy EnigmaMachine tại chỗ trên cả buffer.
+
+        Buffer ngắn thì gọi từng byte qua DLL cũng chẳng tốn bao nhiêu; ngưỡng
+        chuyển sang NumPy do registry đo trên máy đang chạy.
+        """
+        backends.select("tbc_enigma", len(buffer))(self, e_ptr, buffer)
+
+    def process_into(self, data, out, mode: str = "encrypt") -> int:
+        """Mã hóa/giải mã byte thô từ `data` sang `out`, trả về số byte đã ghi.
+
+        `data` và `out` là bất kỳ buffer nào (bytes, bytearray, memoryview,
+        mmap, ndarray uint8...); `out` phải ghi được và đủ chỗ, có thể chính
+        là `data` để chạy tại chỗ. Không hex, không decode, không copy thêm.
+        """
+        src = memoryview(data).cast("B")
+        data_len = src.nbytes
+        dst = memoryview(out).cast("B")
+        if dst.readonly:
+            raise TypeError("out phải là buffer ghi được nha!")
+        if len(dst) < data_len:
+            raise ValueError(f"out không đủ chỗ: cần {data_len} byte")
+        dst = dst[:data_len]
+        dst[:] = src
+
+        # Mảng ctypes trỏ thẳng vào `out`, C++ ghi đè trực tiếp lên đó
+        mutable_data = (ctypes.c_uint8 * data_len).from_buffer(dst)
+
+        with self._lock:
+            if self.closed:
+                raise ValueError("TBCSession đã đóng rồi")
+            c_ptr = self.__cipher_handle__(data_len)
+            e_ptr = self._handles[1]
+            block_key = ctypes.c_float(self.block_key)
+            if mode == "encrypt":
+                # 1. Chạy Block Cipher (Tầng 1 & 2)
+                self._lib.Cipher_encrypt(c_ptr, mutable_data, ctypes.c_size_t(data_len), block_key)
+                # 2. Chạy Enigma (Tầng 3) cho cả buffer
+                self.__enigma_layer__(e_ptr, mutable_data)
+            else:
+                # 1. Chạy ngược lại: Enigma trước
+                self.__enigma_layer__(e_ptr, mutable_data)
+                # 2. Block Cipher sau
+                self._lib.Cipher_decrypt(c_ptr, mutable_data, ctypes.c_size_t(data_len), block_key)
+
+        return data_len
+
+    def process(self, data: str | bytes, mode: str = "encrypt") -> bytes:
+        # Xử lý input đầu vào
+        if mode == "encrypt":
+            input_bytes = data.encode() if isinstance(data, str) else data
+        else:
+            # Nếu là decrypt, chuyển từ hex string sang bytes
+            input_bytes = bytes.fromhex(data) if isinstance(data, str) else data
+
+        size = memoryview(input_bytes).nbytes
+        if size < buffers.MIN_CLASS:
+            out = bytearray(size)
+            self.process_into(input_bytes, out, mode)
+            return bytes(out)
+        # Message lớn: buffer làm việc mượn từ pool, chỉ bản bytes trả về là cấp phát mới
+        with buffers.acquire(size) as buf:
+            self.process_into(input_bytes, buf.view, mode)
+            return bytes(buf.view)
+
+    def encrypt(self, data: str | bytes, as_bytes: bool = False) -> str | bytes:
+        encrypted = self.process(data, "encrypt")
+        # Hex chỉ là lớp chuyển đổi cho ai cần text; as_bytes=True lấy byte thô
+        return encrypted if as_bytes else encrypted.hex()
+
+    def decrypt(self, data: str | bytes, as_bytes: bool = False) -> str | bytes:
+        decrypted: bytes = self.process(data, "decrypt")
+        if as_bytes:
+            return decrypted
+        try:
+            return decrypted.decode('utf-8')
+        except (ValueError, UnicodeDecodeError):
+            # Nếu không decode được sang string thì trả về bytes gốc
+            return decrypted
+
+def _restore_session(block_key: int, enigma_key: float) -> TBCSession:
+    return TripleBlockCipher(max_sessions=0).session(block_key, enigma_key)
+
+backends.register_algorithm("tbc_enigma", _enigma_sample, lambda args: args[0].close())
+backends.register("tbc_enigma", "native", _native_enigma)
+backends.register("tbc_enigma", "numpy", _numpy_enigma, lambda: _compat.numpy() is not None)
 
 class TripleBlockCipher:
-    def __init__(self) -> None:
-        # Đường dẫn phải chuẩn, không là Hare dỗi đấy!
-        base_dir: Final = Path(__file__).parent.parent
-        dll_path: Final = base_dir / "bin" / "tbc.dll"
-        
-        if not dll_path.exists():
-            raise FileNotFoundError(f"DLL bị lạc ở đâu rồi: {dll_path} 💢")
-            
+    def __init__(self, max_sessions: int = _MAX_SESSIONS) -> None:
         # winmode=0 để đảm bảo load đúng các dependency nhé Tebee
-        self._lib = ctypes.CDLL(str(dll_path), winmode=0)
+        # DLL chỉ load một lần cho cả process, các instance dùng chung
+        self._lib = load_library("tbc", winmode=0)
         self.__initial_args__()
 
+        # LRU các session theo cặp khóa, giới hạn để memory C++ không phình mãi
+        self.max_sessions = max_sessions
+        self._sessions: OrderedDict[tuple[int, float], TBCSession] = OrderedDict()
+        self._sessions_lock = threading.Lock()
+        _native.track_fork(self)
+
+    def _after_fork(self) -> None:
+        self._sessions_lock = threading.Lock()
+
+    def __reduce__(self):
+        # Chỉ gửi cấu hình; session được tạo lại ở process nhận khi gặp cặp khóa
+        return TripleBlockCipher, (self.max_sessions,)
+
     def __initial_args__(self) -> None:
         """Thiết lập các kiểu dữ liệu cho interface C++"""
         # --- Cấu trúc cho Cipher (Tầng 1 & 2) ---
@@ -35,54 +294,121 @@ class TripleBlockCipher:
         
         self._lib.EnigmaMachine_delete.argtypes = [ctypes.c_void_p]
 
+    def session(self, b_key: int, e_key: float) -> TBCSession:
+        """Tạo session riêng cho một cặp khóa; người gọi tự close() (hoặc dùng with)."""
+        return TBCSession(self._lib, b_key, e_key)
+
+    def __session__(self, block_key: int, enigma_key: float) -> TBCSession:
+        key = (block_key, enigma_key)
+        with self._sessions_lock:
+            session = self._sessions.get(key)
+            if session is not None:
+                self._sessions.move_to_end(key)
+                return session
+        session = TBCSession(self._lib, block_key, enigma_key)
+        if self.max_sessions <= 0:
+            return session
+        with self._sessions_lock:
+            # Thread khác có thể đã tạo trước, dùng chung bản đó
+            session = self._sessions.setdefault(key, session)
+            self._sessions.move_to_end(key)
+            while len(self._sessions) > self.max_sessions:
+                # Session bị đẩy ra sẽ được giải phóng khi không còn ai dùng
+                self._sessions.popitem(last=False)
+        return session
+
+    def close(self) -> None:
+        """Giải phóng mọi session đang được cache."""
+        with self._sessions_lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
+
+    def __enter__(self) -> "TripleBlockCipher":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
     def __process__(self, data: str | bytes, block_key: int, enigma_key: float, mode: str = "encrypt") -> bytes:
-        data_len: int = len(data)
-        
-        # Xử lý input đầu vào
-        if mode == "encrypt":
-            input_bytes = data.encode() if isinstance(data, str) else data
-        else:
-            # Nếu là decrypt, chuyển từ hex string sang bytes
-            input_bytes = bytes.fromhex(data) if isinstance(data, str) else data
-            data_len = len(input_bytes)
+        return self.__session__(block_key, enigma_key).process(data, mode)
+
+    def __many__(self, items: Sequence, block_key: int, enigma_key: float, mode: str,
+                 offsets: Optional[Sequence[int]], workers: Optional[int],
+                 executor: Optional[Executor]) -> list[bytes]:
+        # Session giữ lock trong lúc chạy, nên mỗi thread mượn một session riêng;
+        # số session tự tăng theo số thread thực sự chạy cùng lúc
+        idle: queue.SimpleQueue[TBCSession] = queue.SimpleQueue()
+        idle.put(self.__session__(block_key, enigma_key))
+        extra: list[TBCSession] = []
+
+        def _one(item) -> bytes:
+            try:
+                session = idle.get_nowait()
+            except queue.Empty:
+                session = self.session(block_key, enigma_key)
+                extra.append(session)
+            try:
+                return session.process(item, mode)
+            finally:
+                idle.put(session)
 
-        # Tạo buffer để C++ có thể ghi đè trực tiếp (tránh copy nhiều lần)
-        mutable_data = (ctypes.c_uint8 * data_len).from_buffer_copy(input_bytes)
-        
-        # Khởi tạo instance từ C++ (Nhớ dọn dẹp sau khi dùng nhé!)
-        c_ptr = self._lib.Cipher_new(ctypes.c_size_t(data_len))
-        e_ptr = self._lib.EnigmaMachine_new(ctypes.c_float(enigma_key))
-        
         try:
-            if mode == "encrypt":
-                # 1. Chạy Block Cipher (Tầng 1 & 2)
-                self._lib.Cipher_encrypt(c_ptr, mutable_data, ctypes.c_size_t(data_len), ctypes.c_float(block_key))
-                # 2. Chạy Enigma (Tầng 3) - Duyệt từng byte
-                for i in range(data_len):
-                    mutable_data[i] = self._lib.EnigmaMachine_process(e_ptr, mutable_data[i])
-            else:
-                # 1. Chạy ngược lại: Enigma trước
-                for i in range(data_len):
-                    mutable_data[i] = self._lib.EnigmaMachine_process(e_ptr, mutable_data[i])
-                # 2. Block Cipher sau
-                self._lib.Cipher_decrypt(c_ptr, mutable_data, ctypes.c_size_t(data_len), ctypes.c_float(block_key))
-            
-            return bytes(mutable_data)
-        
+            return _batch.run(_one, _batch.split(items, offsets), workers, executor)
         finally:
-            # QUAN TRỌNG: Giải phóng memory bên phía C++ để tránh Memory Leak!
-            # Hare sẽ không tha thứ nếu anh làm tràn RAM của máy tính đâu!
-            self._lib.Cipher_delete(c_ptr)
-            self._lib.EnigmaMachine_delete(e_ptr)
+            for session in extra:
+                session.close()
+
+    def encrypt_many(self, items: Sequence, b_key: int, e_key: float, offsets: Optional[Sequence[int]] = None,
+                     workers: Optional[int] = None, executor: Optional[Executor] = None,
+                     as_bytes: bool = False) -> list[str] | list[bytes]:
+        """Mã hóa nhiều message song song, trả về list hex theo đúng thứ tự như encrypt().
+
+        `items` là list str/bytes, hoặc một buffer ghép kèm `offsets` (n + 1 biên).
+        `as_bytes=True` thì trả về byte thô, bỏ qua bước hex.
+        """
+        results = self.__many__(items, b_key, e_key, "encrypt", offsets, workers, executor)
+        return results if as_bytes else [out.hex() for out in results]
+
+    def decrypt_many(self, items: Sequence, b_key: int, e_key: float, offsets: Optional[Sequence[int]] = None,
+                     workers: Optional[int] = None, executor: Optional[Executor] = None,
+                     as_bytes: bool = False) -> list[str | bytes]:
+        """Giải mã nhiều message song song; mỗi kết quả giống decrypt() (str nếu decode được)."""
+        results = self.__many__(items, b_key, e_key, "decrypt", offsets, workers, executor)
+        if as_bytes:
+            return results
+        decoded: list[str | bytes] = []
+        for decrypted in results:
+            try:
+                decoded.append(decrypted.decode('utf-8'))
+            except (ValueError, UnicodeDecodeError):
+                decoded.append(decrypted)
+        return decoded
+
+    def encrypt_into(self, data, out, b_key: int, e_key: float) -> int:
+        """Mã hóa byte thô từ `data` vào `out` (có thể là chính `data`), trả về số byte.
+
+        Ciphertext dài đúng bằng plaintext nên `out` chỉ cần len(data) byte.
+        """
+        return self.__session__(b_key, e_key).process_into(data, out, "encrypt")
+
+    def decrypt_into(self, data, out, b_key: int, e_key: float) -> int:
+        """Giải mã byte thô từ `data` vào `out`, trả về số byte."""
+        return self.__session__(b_key, e_key).process_into(data, out, "decrypt")
 
-    def encrypt(self, data: str | bytes, b_key: int, e_key: float) -> str:
-        return self.__process__(data, b_key, e_key, "encrypt").hex()
+    def encrypt(self, data: str | bytes, b_key: int, e_key: float, as_bytes: bool = False) -> str | bytes:
+        encrypted = self.__process__(data, b_key, e_key, "encrypt")
+        # Mặc định vẫn trả hex như trước; as_bytes=True bỏ qua bước hex
+        return encrypted if as_bytes else encrypted.hex()
 
-    def decrypt(self, data: str | bytes, b_key: int, e_key: float) -> str | bytes:
+    def decrypt(self, data: str | bytes, b_key: int, e_key: float, as_bytes: bool = False) -> str | bytes:
         decrypted: bytes = self.__process__(data, b_key, e_key, "decrypt")
+        if as_bytes:
+            return decrypted
         try:
             # Ở đây nè Tebee! Phải dùng tuple (ValueError, UnicodeDecodeError) nhé!
             return decrypted.decode('utf-8')
         except (ValueError, UnicodeDecodeError):
             # Nếu không decode được sang string thì trả về bytes gốc
-            return decrypted
\ No newline at end of file
+            return decrypted
@@ -1,19 +1,245 @@
 import ctypes
+import io
+import mmap
 import os
-from pathlib import Path
-from typing import Final
+import struct
+from concurrent.futures import Executor
+from typing import BinaryIO, Final, Optional, Sequence
+
+from .. import _batch, _compat, backends
+from .._native import BIN_DIR, load_library
+
+_BLOCK_SIZE = 16
+_KEY_SIZE = 128
+_MASK64 = (1 << 64) - 1
+_CHUNK_BLOCKS = 1 << 16
+_STREAM_CHUNK = 1 << 20
+# Cửa sổ mmap khi mã hóa file tại chỗ: bội số của ALLOCATIONGRANULARITY và 16
+_MMAP_WINDOW = 1 << 26
+
+class TFSCKey:
+    """Key TFSC đã chuẩn bị sẵn để dùng lại cho nhiều lần gọi.
+
+    Giữ sẵn mảng ctypes 128 byte truyền thẳng cho DLL và 16 word 64-bit cho
+    keystream Python, nên mỗi lần gọi không phải copy/cast key nữa.
+    """
+    __slots__ = ("array", "words")
+
+    def __init__(self, key) -> None:
+        raw = memoryview(key).cast("B")
+        if raw.nbytes < _KEY_SIZE:
+            raise ValueError(f"Key TFSC phải đủ {_KEY_SIZE} byte")
+        raw = raw[:_KEY_SIZE]
+        self.array = (ctypes.c_uint8 * _KEY_SIZE).from_buffer_copy(raw)
+        self.words: tuple[int, ...] = struct.unpack("<16Q", raw)
+
+    def __reduce__(self):
+        # Chỉ gửi 128 byte key, mảng ctypes dựng lại ở process nhận
+        return TFSCKey, (bytes(self.array),)
+
+def _prepare_key(key) -> TFSCKey:
+    return key if isinstance(key, TFSCKey) else TFSCKey(key)
+
+def _as_writable(data) -> memoryview:
+    """View byte phẳng trên bất kỳ buffer ghi được nào (bytearray, mmap, ndarray uint8...)."""
+    view = memoryview(data).cast("B")
+    if view.readonly:
+        raise TypeError("Data phải là buffer ghi được nha!")
+    return view
+
+def _numpy_engine(data, key: TFSCKey, first_block: int, decrypt: bool = False) -> None:
+    np = _compat.numpy()
+    keys = np.array(key.words, dtype=np.uint64).reshape(8, 2)
+    blocks = np.frombuffer(data, dtype=np.uint8).view("<u8").reshape(-1, 2)
+    for start in range(0, len(blocks), _CHUNK_BLOCKS):
+        rows = blocks[start:start + _CHUNK_BLOCKS]
+        b = np.arange(first_block + start, first_block + start + len(rows), dtype=np.uint64)
+        rows ^= (keys[b & np.uint64(7)] ^ b[:, None]) + b[:, None]
+
+def _python_engine(data, key: TFSCKey, first_block: int, decrypt: bool = False) -> None:
+    words = key.words
+    for i, (lo, hi) in enumerate(struct.iter_unpack("<2Q", data)):
+        b = (first_block + i) & _MASK64
+        k = (b & 7) * 2
+        struct.pack_into(
+            "<2Q", data, i * _BLOCK_SIZE,
+            lo ^ (((words[k] ^ b) + b) & _MASK64),
+            hi ^ (((words[k + 1] ^ b) + b) & _MASK64),
+        )
+
+def _native_engine(data, key: TFSCKey, first_block: int, decrypt: bool = False) -> None:
+    # DLL luôn đếm block từ 0 nên chỉ dùng được khi first_block == 0
+    lib = load_library("tfsc")
+    func = lib.tfsc_decrypt if decrypt else lib.tfsc_encrypt
+    # Mảng ctypes trỏ thẳng vào buffer của caller, không copy
+    func((ctypes.c_uint8 * len(data)).from_buffer(data), len(data), key.array)
+
+def _xor_keystream(data, key: TFSCKey, first_block: int) -> None:
+    """XOR keystream TFSC vào `data` tại chỗ, bắt đầu từ block `first_block`.
+
+    Ra đúng byte như tfsc_encrypt: block thứ b dùng (K[b & 7] ^ b) + b cho cả
+    hai nửa 64-bit. DLL luôn đếm block từ 0 nên muốn mã hóa nối tiếp từng phần
+    thì phải tự sinh keystream ở đây (NumPy hoặc Python, registry chọn).
+    """
+    backends.select("tfsc", len(data), native=False)(data, key, first_block)
+
+def _sample(size: int) -> tuple:
+    return memoryview(bytearray(size - size % _BLOCK_SIZE)), TFSCKey(bytes(range(_KEY_SIZE))), 0, False
+
+backends.register_algorithm("tfsc", _sample)
+backends.register("tfsc", "native", _native_engine, lambda: TebeeFastStreamCipher().__lib__ is not None)
+backends.register("tfsc", "numpy", _numpy_engine, lambda: _compat.numpy() is not None)
+backends.register("tfsc", "python", _python_engine)
+
+def _unpad(data: bytearray) -> bytearray:
+    pad_val = data[-1]
+    # Giống decrypt một lần: byte cuối hợp lệ thì cắt, không thì giữ nguyên
+    if 0 < pad_val <= 16:
+        del data[-pad_val:]
+    return data
+
+class TFSCEncryptor:
+    """Mã hóa TFSC từng phần: gọi update() bao nhiêu lần cũng được, cuối cùng finalize().
+
+    Ghép các kết quả lại sẽ đúng bằng TebeeFastStreamCipher.encrypt trên toàn
+    bộ dữ liệu. Chỉ giữ lại tối đa một block chưa đủ 16 byte, nên bộ nhớ
+    không phụ thuộc kích thước luồng.
+    """
+    def __init__(self, key: bytes) -> None:
+        self._key = _prepare_key(key)
+        self._block = 0
+        self._pending = bytearray()
+        self._finalized = False
+
+    def _take(self, data) -> bytearray:
+        if self._finalized:
+            raise ValueError("Đã finalize() rồi, không update() được nữa")
+        buf = self._pending
+        buf += data
+        return buf
+
+    def _emit(self, buf: bytearray, keep: int) -> bytearray:
+        # Phần `keep` byte cuối để dành cho lần sau, còn lại XOR luôn
+        cut = len(buf) - keep
+        self._pending = buf[cut:]
+        del buf[cut:]
+        _xor_keystream(buf, self._key, self._block)
+        self._block += len(buf) // _BLOCK_SIZE
+        return buf
+
+    def update(self, data) -> bytearray:
+        buf = self._take(data)
+        return self._emit(buf, len(buf) % _BLOCK_SIZE)
+
+    def finalize(self) -> bytearray:
+        buf = self._take(b"")
+        # PKCS#7 chỉ thêm ở block cuối cùng
+        pad_needed = _BLOCK_SIZE - len(buf)
+        buf.extend([pad_needed] * pad_needed)
+        self._finalized = True
+        return self._emit(buf, 0)
+
+class TFSCDecryptor(TFSCEncryptor):
+    """Giải mã TFSC từng phần, trả về bytes thô (không decode).
+
+    Luôn giữ lại block cuối cùng đã nhận vì chưa biết nó có phải block chứa
+    padding hay không; finalize() mới bỏ padding.
+    """
+    def update(self, data) -> bytearray:
+        buf = self._take(data)
+        keep = len(buf) % _BLOCK_SIZE or min(len(buf), _BLOCK_SIZE)
+        return self._emit(buf, keep)
+
+    def finalize(self) -> bytearray:
+        buf = self._take(b"")
+        if len(buf) != _BLOCK_SIZE:
+            raise ValueError("Ciphertext TFSC phải là bội số (khác 0) của 16 byte")
+        self._finalized = True
+        return _unpad(self._emit(buf, 0))
+
+class TFSCReader(io.RawIOBase):
+    """Đọc từ `raw` từng khúc `chunk_size` byte, trả ra dữ liệu đã mã hóa (hoặc giải mã)."""
+    def __init__(self, raw: BinaryIO, key: bytes, decrypt: bool = False,
+                 chunk_size: int = _STREAM_CHUNK) -> None:
+        super().__init__()
+        self._raw = raw
+        self._ctx = TFSCDecryptor(key) if decrypt else TFSCEncryptor(key)
+        self._chunk_size = chunk_size
+        self._out = bytearray()
+        self._pos = 0
+        self._eof = False
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        while self._pos == len(self._out):
+            if self._eof:
+                return 0
+            chunk = self._raw.read(self._chunk_size)
+            if chunk:
+                self._out = self._ctx.update(chunk)
+            else:
+                self._out = self._ctx.finalize()
+                self._eof = True
+            self._pos = 0
+        n = min(len(b), len(self._out) - self._pos)
+        memoryview(b).cast("B")[:n] = self._out[self._pos:self._pos + n]
+        self._pos += n
+        return n
+
+class TFSCWriter(io.RawIOBase):
+    """Nhận dữ liệu qua write(), ghi kết quả đã mã hóa (hoặc giải mã) xuống `raw`.
+
+    close() mới ghi block cuối (padding); `raw` không bị đóng theo.
+    """
+    def __init__(self, raw: BinaryIO, key: bytes, decrypt: bool = False) -> None:
+        super().__init__()
+        self._raw = raw
+        self._ctx = TFSCDecryptor(key) if decrypt else TFSCEncryptor(key)
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        if self.closed:
+            raise ValueError("write() trên stream đã đóng")
+        n = memoryview(b).nbytes
+        out = self._ctx.update(b)
+        if out:
+            self._raw.write(out)
+        return n
+
+    def close(self) -> None:
+        if not self.closed:
+            try:
+                self._raw.write(self._ctx.finalize())
+            finally:
+                super().close()
+
+def _windows(size: int, window: int) -> list[tuple[int, int]]:
+    if window <= 0 or window % mmap.ALLOCATIONGRANULARITY or window % _BLOCK_SIZE:
+        raise ValueError(f"window phải là bội số dương của {mmap.ALLOCATIONGRANULARITY} và 16")
+    return [(offset, min(window, size - offset)) for offset in range(0, size, window)]
 
 class TebeeFastStreamCipher:
     def __init__(self) -> None:
-        self.__BASE_DIR__: Final = Path(__file__).parent.parent
+        self.__BASE_DIR__: Final = BIN_DIR.parent
         # Chỉnh lại đường dẫn chuẩn theo cấu trúc của anh
-        self.__DLL_PATH__: Final = self.__BASE_DIR__ / "bin" / "tfsc.dll"
+        self.__DLL_PATH__: Final = BIN_DIR / "tfsc.dll"
         
-        if not self.__DLL_PATH__.exists():
-            raise FileNotFoundError(f"Không thấy DLL tại: {self.__DLL_PATH__}")
-            
-        self.__lib__ = ctypes.CDLL(str(self.__DLL_PATH__))
-        self.__initial_args__()
+        # DLL chỉ load một lần cho cả process
+        try:
+            self.__lib__ = load_library("tfsc")
+        except OSError:
+            # Không có DLL (hoặc không chạy Windows): dùng keystream Python/NumPy
+            self.__lib__ = None
+        else:
+            self.__initial_args__()
+
+    def __reduce__(self):
+        # Không giữ key hay trạng thái: process nhận tự load DLL (hoặc dùng keystream) lại
+        return TebeeFastStreamCipher, ()
 
     def __initial_args__(self) -> None:
         # Cấu trúc: void tfsc_encrypt(uint8_t* data, size_t len, uint8_t* key)
@@ -29,47 +255,143 @@ class TebeeFastStreamCipher:
         self.__lib__.tfsc_decrypt.argtypes = common_args
         self.__lib__.tfsc_decrypt.restype = None
 
+    def __process__(self, view: memoryview, key: TFSCKey, decrypt: bool) -> None:
+        # view đã là byte phẳng, độ dài chia hết cho 16; sửa thẳng trên đó.
+        # DLL hay keystream NumPy/Python là do registry chọn theo kích thước
+        engine = backends.select("tfsc", len(view), native=self.__lib__ is not None)
+        engine(view, key, 0, decrypt)
+
     def to_byte(self, data: str) -> bytearray:
         return bytearray(data.encode('utf-8'))
 
+    def prepare_key(self, key: bytes) -> TFSCKey:
+        return TFSCKey(key)
+
+    def encryptor(self, key: bytes) -> TFSCEncryptor:
+        return TFSCEncryptor(key)
+
+    def decryptor(self, key: bytes) -> TFSCDecryptor:
+        return TFSCDecryptor(key)
+
     def encrypt(self, data: bytearray, key: bytes) -> None:
         if not isinstance(data, bytearray):
-            raise TypeError("Data phải là bytearray nha!")
+            raise TypeError("Data phải là bytearray nha! Buffer khác thì dùng encrypt_inplace")
         
         # 1. Padding PKCS#7
         orig_len = len(data)
         pad_needed = 16 - (orig_len % 16)
         data.extend([pad_needed] * pad_needed)
 
-        # 2. Gọi C++ thông qua hàm con để giải phóng pointer ngay
-        def _execute():
-            # Tạo pointer cho data
-            data_ptr = (ctypes.c_uint8 * len(data)).from_buffer(data)
-            # Tạo pointer cho key (chỉ đọc)
-            key_ptr = (ctypes.c_uint8 * 128).from_buffer_copy(key)
-            
-            self.__lib__.tfsc_encrypt(
-                ctypes.cast(data_ptr, ctypes.POINTER(ctypes.c_uint8)),
-                ctypes.c_size_t(len(data)),
-                ctypes.cast(key_ptr, ctypes.POINTER(ctypes.c_uint8))
-            )
-        
-        _execute()
+        # 2. Gọi C++ trực tiếp trên buffer
+        self.__process__(memoryview(data), _prepare_key(key), decrypt=False)
+
+    def encrypt_inplace(self, buffer, key: bytes, length: int) -> int:
+        """Mã hóa `length` byte đầu của `buffer` tại chỗ, padding ghi luôn vào buffer.
+
+        `buffer` là bất kỳ buffer ghi được nào (memoryview, mmap, ndarray uint8,
+        shared memory...) và phải còn chỗ cho padding. Trả về độ dài sau padding.
+        """
+        view = _as_writable(buffer)
+        pad_needed = 16 - (length % 16)
+        total = length + pad_needed
+        if length < 0 or total > len(view):
+            raise ValueError(f"Buffer không đủ chỗ cho padding: cần {total} byte")
+        view[length:total] = bytes([pad_needed]) * pad_needed
+        self.__process__(view[:total], _prepare_key(key), decrypt=False)
+        return total
 
-    def decrypt(self, data: bytearray, key: bytes) -> None:
+    def decrypt_inplace(self, buffer, key: bytes) -> int:
+        """Giải mã cả `buffer` tại chỗ, trả về độ dài dữ liệu thật (đã bỏ padding)."""
+        view = _as_writable(buffer)
+        if not view or len(view) % 16 != 0:
+            raise ValueError("Ciphertext TFSC phải là bội số (khác 0) của 16 byte")
+        self.__process__(view, _prepare_key(key), decrypt=True)
+        pad_val = view[-1]
+        return len(view) - pad_val if 0 < pad_val <= 16 else len(view)
+
+    def _process_file(self, fileno: int, size: int, key: TFSCKey, decrypt: bool, window: int) -> int:
+        # Map từng cửa sổ, XOR tại chỗ rồi bỏ map: không đọc gì vào bytearray.
+        # Trả về byte cuối cùng (giải mã cần để bỏ padding)
+        last = 0
+        for offset, length in _windows(size, window):
+            with mmap.mmap(fileno, length, offset=offset, access=mmap.ACCESS_WRITE) as mm:
+                with memoryview(mm) as view:
+                    if offset == 0:
+                        self.__process__(view, key, decrypt)
+                    else:
+                        # DLL luôn đếm block từ 0, cửa sổ sau phải tự sinh keystream
+                        _xor_keystream(view, key, offset // _BLOCK_SIZE)
+                    last = view[-1]
+        return last
+
+    def encrypt_file(self, path: str | os.PathLike, key: bytes, window: int = _MMAP_WINDOW) -> int:
+        """Mã hóa cả file tại chỗ qua mmap, từng cửa sổ `window` byte.
+
+        Không đọc file vào RAM, không tạo bản copy thứ hai trên đĩa; file chỉ
+        dài thêm ở cuối (block cuối + padding). Không nguyên tử: bị ngắt giữa
+        chừng thì file hỏng, cần bản sao lưu nếu dữ liệu quan trọng.
+        Trả về kích thước file mới.
+        """
+        prepared = _prepare_key(key)
+        with open(path, "r+b") as f:
+            size = os.fstat(f.fileno()).st_size
+            body = size - size % _BLOCK_SIZE
+            self._process_file(f.fileno(), body, prepared, False, window)
+            # Phần lẻ cuối + padding PKCS#7 thành block cuối, ghi đè và nới file một lần
+            f.seek(body)
+            block = bytearray(f.read())
+            pad_needed = _BLOCK_SIZE - len(block)
+            block.extend([pad_needed] * pad_needed)
+            _xor_keystream(block, prepared, body // _BLOCK_SIZE)
+            f.seek(body)
+            f.write(block)
+        return body + _BLOCK_SIZE
+
+    def decrypt_file(self, path: str | os.PathLike, key: bytes, window: int = _MMAP_WINDOW) -> int:
+        """Giải mã cả file tại chỗ qua mmap rồi cắt padding; trả về kích thước thật."""
+        with open(path, "r+b") as f:
+            size = os.fstat(f.fileno()).st_size
+            if not size or size % _BLOCK_SIZE:
+                raise ValueError("Ciphertext TFSC phải là bội số (khác 0) của 16 byte")
+            pad_val = self._process_file(f.fileno(), size, _prepare_key(key), True, window)
+            if 0 < pad_val <= 16:
+                size -= pad_val
+                f.truncate(size)
+        return size
+
+    def encrypt_many(self, items: Sequence, key: bytes, offsets: Optional[Sequence[int]] = None,
+                     workers: Optional[int] = None, executor: Optional[Executor] = None) -> list[bytearray]:
+        """Mã hóa nhiều message độc lập song song, trả về ciphertext theo đúng thứ tự.
+
+        `items` là list buffer, hoặc một buffer ghép kèm `offsets` (n + 1 biên).
+        """
+        prepared = _prepare_key(key)
+
+        def _one(item) -> bytearray:
+            length = memoryview(item).nbytes
+            buf = bytearray(length + 16 - length % 16)
+            buf[:length] = item
+            self.encrypt_inplace(buf, prepared, length)
+            return buf
+
+        return _batch.run(_one, _batch.split(items, offsets), workers, executor)
+
+    def decrypt_many(self, items: Sequence, key: bytes, offsets: Optional[Sequence[int]] = None,
+                     workers: Optional[int] = None, executor: Optional[Executor] = None) -> list[bytearray]:
+        """Giải mã nhiều message song song, trả về byte thô (đã bỏ padding) theo thứ tự."""
+        prepared = _prepare_key(key)
+
+        def _one(item) -> bytearray:
+            buf = bytearray(item)
+            del buf[self.decrypt_inplace(buf, prepared):]
+            return buf
+
+        return _batch.run(_one, _batch.split(items, offsets), workers, executor)
+
+    def decrypt(self, data: bytearray, key: bytes, as_bytes: bool = False) -> None:
         if not data or len(data) % 16 != 0: return
 
-        def _execute():
-            data_ptr = (ctypes.c_uint8 * len(data)).from_buffer(data)
-            key_ptr = (ctypes.c_uint8 * 128).from_buffer_copy(key)
-            
-            self.__lib__.tfsc_decrypt(
-                ctypes.cast(data_ptr, ctypes.POINTER(ctypes.c_uint8)),
-                ctypes.c_size_t(len(data)),
-                ctypes.cast(key_ptr, ctypes.POINTER(ctypes.c_uint8))
-            )
-        
-        _execute()
+        self.__process__(_as_writable(data), _prepare_key(key), decrypt=True)
 
         pad_val = data[-1]
         # Unpadding
@@ -79,5 +401,9 @@ class TebeeFastStreamCipher:
         else:
             clean_data = data
 
+        # Dữ liệu nhị phân thì lấy nguyên byte, không qua decode làm mất byte
+        if as_bytes:
+            return bytes(clean_data)
+
         # Trả về chuỗi string đã decode
-        return clean_data.decode('utf-8', errors='ignore')
\ No newline at end of file
+        return clean_data.decode('utf-8', errors='ignore')
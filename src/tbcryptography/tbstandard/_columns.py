@@ -0,0 +1,143 @@
+"""Xử lý cả cột chuỗi ngắn một lượt: gói thành một buffer liền + offsets
+(kiểu Arrow: n dòng thì n + 1 offset), biến đổi cả buffer rồi trả lại đúng
+bố cục ban đầu. Không còn mỗi dòng một lần encode/ctypes/decode.
+"""
+import operator
+from itertools import accumulate
+from typing import Optional, Sequence
+
+from .. import _compat
+
+# Số byte mỗi nhóm dòng, để mảng tạm của NumPy không phình theo cả cột
+_GROUP_BYTES = 1 << 20
+
+def pack(values: Sequence[str]) -> tuple[bytes, list[int]]:
+    joined = "".join(values)
+    data = joined.encode("utf-8")
+    if len(data) == len(joined):
+        # Toàn ASCII: một lần encode, offset byte trùng offset ký tự
+        return data, [0, *accumulate(map(len, values))]
+    encoded = [value.encode("utf-8") for value in values]
+    return b"".join(encoded), [0, *accumulate(map(len, encoded))]
+
+def unpack(data: bytes, offsets: Sequence[int]) -> list[str]:
+    text = data.decode("utf-8")
+    if len(text) != len(data):
+        return [data[a:b].decode("utf-8") for a, b in zip(offsets[:-1], offsets[1:])]
+    return [text[a:b] for a, b in zip(offsets[:-1], offsets[1:])]
+
+def scalar_int(value) -> Optional[int]:
+    """Số nguyên nếu `value` là một số nguyên đơn (int, numpy.int64...), còn không thì None."""
+    try:
+        return operator.index(value)
+    except TypeError:
+        return None
+
+def per_row(values, count: int) -> list:
+    """Tham số chung (một giá trị) hay riêng từng dòng (một dãy) đều thành list."""
+    if isinstance(values, (str, bytes)):
+        return [values] * count
+    value = scalar_int(values)
+    if value is not None:
+        return [value] * count
+    values = list(values)
+    if len(values) != count:
+        raise ValueError(f"Cần {count} giá trị cho {count} dòng, nhận {len(values)}")
+    return values
+
+def apply(values, offsets, transform):
+    """Chạy `transform(data, offsets)` trên cả cột và trả về đúng bố cục đã nhận.
+
+    offsets None: `values` là dãy str, trả về list str. Còn lại: `values` là
+    buffer đã gói (bytes, bytearray, memoryview...), trả về bytes cùng offsets.
+    """
+    if offsets is None:
+        data, offsets = pack(values)
+        return unpack(transform(data, offsets), offsets)
+    data = bytes(values)
+    offsets = list(offsets)
+    if not offsets or offsets[0] != 0 or offsets[-1] != len(data) \
+            or any(a > b for a, b in zip(offsets, offsets[1:])):
+        raise ValueError("Offsets phải tăng dần, bắt đầu từ 0 và kết thúc ở len(data)")
+    return transform(data, offsets)
+
+def _groups(np, offsets, total: int):
+    # Chia các dòng thành nhóm khoảng _GROUP_BYTES byte, không cắt ngang dòng
+    rows = len(offsets) - 1
+    marks = np.searchsorted(offsets, np.arange(_GROUP_BYTES, total, _GROUP_BYTES), side="right") - 1
+    bounds = np.unique(np.concatenate(([0], np.clip(marks, 0, rows), [rows])))
+    return zip(bounds[:-1].tolist(), bounds[1:].tolist())
+
+def caesar(data: bytes, offsets: Sequence[int], shifts: list[int], tables: Sequence[bytes]) -> bytes:
+    """Caesar với độ dịch riêng từng dòng, trên buffer đã gói."""
+    np = _compat.numpy()
+    if np is None:
+        return b"".join(data[a:b].translate(tables[s % 26])
+                        for a, b, s in zip(offsets[:-1], offsets[1:], shifts))
+
+    flat = np.frombuffer(b"".join(tables), dtype=np.uint8)
+    buf = np.frombuffer(data, dtype=np.uint8)
+    offsets = np.asarray(offsets, dtype=np.intp)
+    # Vị trí bảng của từng byte, rồi tra bảng phẳng 26 x 256 một lần cho cả nhóm
+    # (uint16 là đủ: 25 * 256 + 255 < 65536, mảng tạm nhỏ hơn int64 bốn lần)
+    row_base = (np.asarray(shifts, dtype=np.int64) % 26 * 256).astype(np.uint16)
+    index = np.repeat(row_base, np.diff(offsets))
+    out = np.empty_like(buf)
+    for r0, r1 in _groups(np, offsets, buf.size):
+        a, b = offsets[r0], offsets[r1]
+        out[a:b] = flat[index[a:b] + buf[a:b]]
+    return out.tobytes()
+
+def vigenere(data: bytes, offsets: Sequence[int], keys: bytes | list[bytes], decrypt: bool, fallback) -> bytes:
+    """Vigenere với một khóa chung hoặc khóa riêng từng dòng; vị trí khóa bắt
+    đầu lại ở mỗi dòng."""
+    rows = len(offsets) - 1
+    if isinstance(keys, bytes):
+        if not keys:
+            return data
+        unique, keys = [keys], None
+    np = _compat.numpy()
+    if np is None:
+        keys = keys or unique * rows
+        # Dòng có khóa rỗng giữ nguyên, như encrypt() trả lại text
+        return b"".join(fallback(data[a:b], key, decrypt) if key else data[a:b]
+                        for a, b, key in zip(offsets[:-1], offsets[1:], keys))
+
+    if keys is None:
+        key_id = np.zeros(rows, dtype=np.intp)
+    else:
+        # Mỗi khóa khác nhau lưu một lần: dãy shift phẳng + vị trí bắt đầu + độ dài
+        ids: dict[bytes, int] = {}
+        key_id = np.fromiter((ids.setdefault(key, len(ids)) for key in keys), dtype=np.intp, count=rows)
+        unique = list(ids)
+    lengths = np.array([len(key) for key in unique], dtype=np.intp)
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1])).astype(np.intp)
+    # Import trễ: vigenere.py import module này
+    from .vigenere import _key_shift
+    shift_flat = np.array([_key_shift(k) for key in unique for k in key] or [0], dtype=np.int32)
+
+    buf = np.frombuffer(data, dtype=np.uint8)
+    offsets = np.asarray(offsets, dtype=np.intp)
+    out = buf.copy()
+    for r0, r1 in _groups(np, offsets, buf.size):
+        a = offsets[r0]
+        block = buf[a:offsets[r1]]
+        letter = (block | 0x20) - np.uint8(97) < 26
+        pos = np.flatnonzero(letter)
+        row = np.repeat(np.arange(r0, r1, dtype=np.intp), np.diff(offsets[r0:r1 + 1]))[pos]
+        # Thứ tự của chữ cái trong dòng = chỉ số chung - số chữ cái trước đầu dòng
+        before = np.concatenate(([0], np.cumsum(letter, dtype=np.intp)))[offsets[r0:r1] - a]
+        rank = np.arange(pos.size, dtype=np.intp) - before[row - r0]
+        kid = key_id[row]
+        klen = lengths[kid]
+        # Dòng có khóa rỗng giữ nguyên
+        keep = klen > 0
+        if not keep.all():
+            pos, rank, kid, klen = pos[keep], rank[keep], kid[keep], klen[keep]
+        shift = shift_flat[starts[kid] + rank % klen]
+        c = block[pos].astype(np.int32)
+        base = np.where(c < 97, 65, 97)
+        v = c - base - shift + 26 if decrypt else c - base + shift
+        # np.fmod cắt về 0 như % của C
+        out[a + pos] = (np.fmod(v, 26) + base).astype(np.uint8)
+    return out.tobytes()
@@ -0,0 +1,221 @@
+"""Phá khóa các cipher cổ điển, để kiểm tra dữ liệu cũ còn mã hóa bằng chúng.
+
+    from tbcryptography.tbstandard import analysis
+    shift = analysis.crack_caesar(ciphertext)          # caesar.process(ciphertext, -shift)
+    key = analysis.crack_vigenere(ciphertext)          # vigenere.decrypt(ciphertext, key)
+    seed = analysis.find_enigma_seed(ciphertext, known_plaintext, range(10**6), workers=8)
+
+Có NumPy thì cả histogram lẫn điểm của mọi độ dịch được tính bằng một phép
+toán ma trận, nên ciphertext vài MB cũng chỉ mất vài giây; thiếu NumPy thì
+chạy bằng vòng lặp Python, kết quả như nhau.
+"""
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Final, Iterable, Optional, Sequence
+
+from .. import _compat
+from .enigma import EnigmaMachine
+
+# Tần suất chữ cái tiếng Anh (A..Z), tổng bằng 1
+ENGLISH_FREQ: Final = (
+    0.08167, 0.01492, 0.02782, 0.04253, 0.12702, 0.02228, 0.02015, 0.06094, 0.06966,
+    0.00153, 0.00772, 0.04025, 0.02406, 0.06749, 0.07507, 0.01929, 0.00095, 0.05987,
+    0.06327, 0.09056, 0.02758, 0.00978, 0.02360, 0.00150, 0.01974, 0.00074,
+)
+_LETTERS = b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+_NON_LETTERS = bytes(b for b in range(256) if b not in _LETTERS)
+# Độ dài khóa có IoC trong khoảng này so với tốt nhất thì chọn cái ngắn nhất
+# (bội số của độ dài đúng cũng có IoC cao)
+_IOC_TOLERANCE = 0.9
+# Số ký tự known plaintext thử trước với mỗi seed, đủ để loại gần hết seed sai
+_PROBE = 32
+_SEED_CHUNK = 2000
+
+def _as_bytes(text: str | bytes) -> bytes:
+    return text.encode("utf-8") if isinstance(text, str) else bytes(text)
+
+def _letters(text: str | bytes):
+    """Các chữ cái ASCII (không phân biệt hoa thường) thành số 0..25.
+
+    Chỉ chữ cái làm khóa Vigenere tiến lên nên các byte khác bị bỏ qua.
+    """
+    data = _as_bytes(text)
+    np = _compat.numpy()
+    if np is None:
+        return [c - 97 for c in data.translate(None, _NON_LETTERS).lower()]
+    buf = np.frombuffer(data, dtype=np.uint8)
+    folded = (buf | 0x20) - np.uint8(97)
+    return folded[folded < 26]
+
+def _histogram(np, letters, columns: int = 1):
+    # Hàng j là histogram của cột j (chữ cái thứ j, j + columns, ...)
+    column = np.arange(letters.size, dtype=np.intp) % columns
+    counts = np.bincount(column * 26 + letters, minlength=columns * 26)
+    return counts.reshape(columns, 26)
+
+def _chi_squared_matrix(np, counts, freq: Sequence[float]):
+    """Điểm chi bình phương của cả 26 độ dịch cho từng hàng histogram.
+
+    Giải mã với độ dịch s biến chữ c thành c - s, nên histogram bản rõ là
+    counts[(i + s) % 26]: gom cả 26 cách xoay thành một mảng (hàng, s, i).
+    """
+    shift = np.arange(26)
+    rolled = counts[:, (shift[:, None] + shift[None, :]) % 26]
+    expected = counts.sum(axis=1)[:, None, None] * np.asarray(freq, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scores = ((rolled - expected) ** 2 / expected).sum(axis=2)
+    return np.nan_to_num(scores, nan=0.0)
+
+def _chi_squared(counts: Sequence[int], freq: Sequence[float]) -> list[float]:
+    total = sum(counts)
+    if not total:
+        return [0.0] * 26
+    return [sum((counts[(i + s) % 26] - total * f) ** 2 / (total * f) for i, f in enumerate(freq))
+            for s in range(26)]
+
+def caesar_scores(text: str | bytes, freq: Sequence[float] = ENGLISH_FREQ) -> list[float]:
+    """Điểm chi bình phương của cả 26 độ dịch; nhỏ hơn là giống ngôn ngữ hơn."""
+    letters = _letters(text)
+    np = _compat.numpy()
+    if np is None:
+        counts = Counter(letters)
+        return _chi_squared([counts[i] for i in range(26)], freq)
+    return _chi_squared_matrix(np, _histogram(np, letters), freq)[0].tolist()
+
+def crack_caesar(text: str | bytes, freq: Sequence[float] = ENGLISH_FREQ) -> int:
+    """Độ dịch đã dùng để mã hóa: `caesar.process(text, -shift)` ra bản rõ."""
+    scores = caesar_scores(text, freq)
+    return min(range(26), key=scores.__getitem__)
+
+def index_of_coincidence(text: str | bytes) -> float:
+    letters = _letters(text)
+    np = _compat.numpy()
+    counts = Counter(letters).values() if np is None else np.bincount(letters, minlength=26).tolist()
+    n = sum(counts)
+    return sum(c * (c - 1) for c in counts) / (n * (n - 1)) if n > 1 else 0.0
+
+def vigenere_key_lengths(text: str | bytes, max_length: int = 20) -> list[tuple[int, float]]:
+    """IoC trung bình theo cột cho từng độ dài khóa 1..max_length, cao nhất trước.
+
+    Đúng độ dài thì mỗi cột là một Caesar nên IoC gần của ngôn ngữ (~0.066
+    với tiếng Anh), sai thì gần ngẫu nhiên (~0.038).
+    """
+    letters = _letters(text)
+    np = _compat.numpy()
+    results = []
+    for length in range(1, max_length + 1):
+        if np is None:
+            columns = [Counter(letters[j::length]).values() for j in range(length)]
+            sizes = [sum(c) for c in columns]
+            pairs = [sum(n * (n - 1) for n in c) for c in columns]
+        else:
+            counts = _histogram(np, letters, length)
+            sizes = counts.sum(axis=1).tolist()
+            pairs = (counts * (counts - 1)).sum(axis=1).tolist()
+        iocs = [p / (n * (n - 1)) for p, n in zip(pairs, sizes) if n > 1]
+        results.append((length, sum(iocs) / len(iocs) if iocs else 0.0))
+    return sorted(results, key=lambda item: -item[1])
+
+def kasiski(text: str | bytes, max_length: int = 20, ngram: int = 3) -> list[tuple[int, int]]:
+    """Phép thử Kasiski: khoảng cách giữa các n-gram lặp lại thường là bội của
+    độ dài khóa. Trả về (độ dài, số khoảng cách chia hết), nhiều nhất trước."""
+    letters = _letters(text)
+    np = _compat.numpy()
+    if np is None:
+        last: dict[tuple, int] = {}
+        distances = []
+        for i in range(len(letters) - ngram + 1):
+            gram = tuple(letters[i:i + ngram])
+            if gram in last:
+                distances.append(i - last[gram])
+            last[gram] = i
+        votes = [(k, sum(d % k == 0 for d in distances)) for k in range(2, max_length + 1)]
+    else:
+        n = letters.size - ngram + 1
+        if n <= 0:
+            return [(k, 0) for k in range(2, max_length + 1)]
+        codes = np.zeros(n, dtype=np.int64)
+        for i in range(ngram):
+            codes = codes * 26 + letters[i:i + n]
+        # Sắp ổn định theo mã: các lần xuất hiện của cùng n-gram nằm liền nhau
+        order = np.argsort(codes, kind="stable")
+        same = codes[order[1:]] == codes[order[:-1]]
+        distances = (order[1:] - order[:-1])[same]
+        votes = [(k, int(np.count_nonzero(distances % k == 0))) for k in range(2, max_length + 1)]
+    return sorted(votes, key=lambda item: -item[1])
+
+def solve_vigenere_key(text: str | bytes, length: int, freq: Sequence[float] = ENGLISH_FREQ) -> str:
+    """Với độ dài khóa đã biết, mỗi cột là một Caesar: chọn độ dịch tốt nhất từng cột."""
+    letters = _letters(text)
+    np = _compat.numpy()
+    if np is None:
+        shifts = []
+        for j in range(length):
+            counts = Counter(letters[j::length])
+            scores = _chi_squared([counts[i] for i in range(26)], freq)
+            shifts.append(min(range(26), key=scores.__getitem__))
+    else:
+        scores = _chi_squared_matrix(np, _histogram(np, letters, length), freq)
+        shifts = scores.argmin(axis=1).tolist()
+    return "".join(chr(65 + s) for s in shifts)
+
+def crack_vigenere(text: str | bytes, max_length: int = 20, freq: Sequence[float] = ENGLISH_FREQ) -> str:
+    """Đoán độ dài khóa bằng IoC rồi giải từng cột; `vigenere.decrypt(text, key)` ra bản rõ."""
+    ranked = vigenere_key_lengths(text, max_length)
+    best = ranked[0][1]
+    length = min(k for k, ioc in ranked if ioc >= best * _IOC_TOLERANCE)
+    return solve_vigenere_key(text, length, freq)
+
+def _try_seeds(seeds: Sequence[int], cipher: bytes, plain: bytes, offset: int) -> Optional[int]:
+    # Chạy trong process con. Enigma đối xứng nên mã hóa bản rõ phải ra đúng
+    # ciphertext; thử _PROBE ký tự đầu trước, khớp mới chạy tiếp phần còn lại.
+    # Mỗi seed chỉ dùng một lần nên không đưa vào cache của EnigmaMachine, và
+    # chạy thẳng vòng lặp Python: dựng bảng NumPy cho từng seed còn đắt hơn
+    for seed in seeds:
+        machine = EnigmaMachine(seed, cache=False)
+        if offset:
+            machine.seek(offset)
+        if machine._process_python(plain[:_PROBE]) != cipher[:_PROBE]:
+            continue
+        if machine._process_bytes(plain[_PROBE:]) == cipher[_PROBE:]:
+            return seed
+    return None
+
+def find_enigma_seed(ciphertext: str | bytes, plaintext: str | bytes, seeds: Iterable[int],
+                     offset: int = 0, workers: Optional[int] = None,
+                     chunk_size: int = _SEED_CHUNK) -> Optional[int]:
+    """Tìm seed EnigmaMachine khớp known plaintext (cùng độ dài, cùng vị trí).
+
+    `offset` là số ký tự Base85 máy đã xử lý trước đoạn này (xem seek()).
+    `workers` > 1 thì chia dãy seed thành từng phần `chunk_size` cho process
+    pool. Trả về seed đầu tiên theo thứ tự của `seeds` khớp, hoặc None.
+    """
+    cipher, plain = _as_bytes(ciphertext), _as_bytes(plaintext)
+    if len(cipher) != len(plain):
+        raise ValueError("Ciphertext và plaintext phải dài bằng nhau")
+
+    seeds = iter(seeds)
+    chunks = iter(lambda: [s for _, s in zip(range(chunk_size), seeds)], [])
+    if workers is None or workers <= 1:
+        for chunk in chunks:
+            if (found := _try_seeds(chunk, cipher, plain, offset)) is not None:
+                return found
+        return None
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending: deque = deque()
+        try:
+            for chunk in chunks:
+                pending.append(pool.submit(_try_seeds, chunk, cipher, plain, offset))
+                # Giữ vài phần chờ cho mỗi worker; đọc kết quả theo thứ tự để
+                # seed đứng trước thắng, và dãy seed vô hạn cũng không sao
+                while len(pending) >= 2 * workers:
+                    if (found := pending.popleft().result()) is not None:
+                        return found
+            while pending:
+                if (found := pending.popleft().result()) is not None:
+                    return found
+            return None
+        finally:
+            for future in pending:
+                future.cancel()
@@ -1,14 +1,53 @@
 ﻿import ctypes
-from pathlib import Path
+
+from .. import backends, buffers
+from .._native import load_library
+from . import _columns
+
+_UPPER = b"ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+_LOWER = b"abcdefghijklmnopqrstuvwxyz"
+
+# Bảng dịch 256 byte: A<->Z, a<->z, các byte khác giữ nguyên
+_ATBASH_TABLE = bytes.maketrans(_UPPER + _LOWER, _UPPER[::-1] + _LOWER[::-1])
+
+def _native_engine(data: bytes) -> bytes:
+    if b'\0' in data:
+        # DLL dừng ở NUL (strlen): chạy từng đoạn giữa các NUL rồi ghép lại,
+        # để ra đúng byte như _table_engine với mọi input
+        return b'\0'.join(_native_engine(part) if part else part for part in data.split(b'\0'))
+    lib = load_library('atbash')
+    n = len(data)
+    if n < buffers.MIN_CLASS:
+        # Buffer nhỏ thì cấp phát thẳng còn rẻ hơn mượn/trả pool
+        output_buffer = ctypes.create_string_buffer(n + 1)
+        lib.process(ctypes.c_char_p(data), output_buffer)
+        return output_buffer.raw[:n]
+    # Output mượn từ pool, thêm 1 byte cho NUL cuối chuỗi mà DLL ghi
+    with buffers.acquire(n, headroom=1) as output_buffer:
+        lib.process(ctypes.c_char_p(data), output_buffer.array)
+        return bytes(output_buffer.view[:n])
+
+def _table_engine(data: bytes) -> bytes:
+    return data.translate(_ATBASH_TABLE)
+
+backends.register_algorithm('atbash', lambda size: (b'Tebee, xin chao! ' * (size // 17 + 1),))
+backends.register('atbash', 'native', _native_engine, lambda: AtbashCipher()._lib is not None)
+backends.register('atbash', 'table', _table_engine)
 
 class AtbashCipher:
     def __init__(self):
-        # Lấy thư mục hiện tại của tệp này
-        base_dir = Path(__file__).parent.parent
-        # Xây dựng đường dẫn đến thư viện DLL tại tbcryptography/bin/atbash.dll
-        dll_path = base_dir / 'bin' / 'atbash.dll'
-        self._lib = ctypes.CDLL(dll_path)
-        self.initial_args()
+        # Thư viện DLL tại tbcryptography/bin/atbash.dll, dùng chung cả process
+        try:
+            self._lib = load_library('atbash')
+        except OSError:
+            # Không load được DLL thì dùng bảng dịch thuần Python
+            self._lib = None
+        else:
+            self.initial_args()
+    def __reduce__(self):
+        # Handle DLL không pickle được; process nhận tự load lại
+        return AtbashCipher, ()
+
     def initial_args(self):
         # Khởi tạo các đối số nếu cần thiết
         self._lib.process.argtypes = [ctypes.c_char_p]
@@ -17,9 +56,19 @@ class AtbashCipher:
     def process(self, input_text: str) -> str:
         # Chuyển đổi chuỗi đầu vào thành bytes
         input_bytes = input_text.encode('utf-8')
-        # Tạo một buffer để lưu trữ kết quả
-        output_buffer = ctypes.create_string_buffer(len(input_bytes) + 1)
-        # Gọi hàm từ DLL
-        self._lib.process(ctypes.c_char_p(input_bytes), output_buffer)
+        # Registry chọn DLL hay bảng dịch tùy kích thước
+        engine = backends.select('atbash', len(input_bytes), native=self._lib is not None)
         # Chuyển đổi kết quả từ bytes trở lại chuỗi
-        return output_buffer.raw[:len(input_bytes)].decode('utf-8')
\ No newline at end of file
+        return engine(input_bytes).decode('utf-8')
+
+    def process_bytes(self, data) -> bytes:
+        """Atbash trên byte thô: chỉ chữ cái ASCII bị đổi, mọi byte khác giữ nguyên.
+        Không có trạng thái nên gọi từng khúc cũng ra như gọi một lần."""
+        data = bytes(data)
+        engine = backends.select('atbash', len(data), native=self._lib is not None)
+        return engine(data)
+
+    def process_batch(self, values, offsets=None):
+        """Atbash cho cả cột: gói lại, một lần translate, rồi trả về đúng bố cục
+        (list str, hoặc bytes theo `offsets` nếu input là buffer đã gói)."""
+        return _columns.apply(values, offsets, lambda data, _: data.translate(_ATBASH_TABLE))
@@ -1,15 +1,58 @@
 import ctypes
-from pathlib import Path
+
+from .. import backends, buffers
+from .._native import load_library
+from . import _columns
+
+_UPPER = b"ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+_LOWER = b"abcdefghijklmnopqrstuvwxyz"
+
+# Bảng dịch 256 byte cho cả 26 độ dịch, dựng sẵn một lần khi import.
+# Giống DLL: chỉ chữ cái ASCII bị dịch, các byte khác giữ nguyên.
+_SHIFT_TABLES = tuple(
+    bytes.maketrans(_UPPER + _LOWER, _UPPER[s:] + _UPPER[:s] + _LOWER[s:] + _LOWER[:s])
+    for s in range(26)
+)
+
+def _native_engine(data: bytes, shift: int) -> bytes:
+    if b"\0" in data:
+        # DLL dừng ở byte NUL (strlen): chạy từng đoạn giữa các NUL rồi ghép lại,
+        # để ra đúng byte như _table_engine với mọi input
+        return b"\0".join(_native_engine(part, shift) if part else part for part in data.split(b"\0"))
+    lib = load_library("caesar")
+    n = len(data)
+    if n < buffers.MIN_CLASS:
+        # Buffer nhỏ thì cấp phát thẳng còn rẻ hơn mượn/trả pool
+        output_buffer = ctypes.create_string_buffer(n + 1)
+        lib.process(data, ctypes.c_int(shift), output_buffer)
+        return output_buffer.raw[:n]
+    # Thêm 1 byte cho NUL cuối chuỗi mà DLL có thể ghi
+    with buffers.acquire(n, headroom=1) as output_buffer:
+        lib.process(data, ctypes.c_int(shift), output_buffer.array)
+        return bytes(output_buffer.view[:n])
+
+def _table_engine(data: bytes, shift: int) -> bytes:
+    return data.translate(_SHIFT_TABLES[shift % 26])
+
+backends.register_algorithm("caesar", lambda size: (b"Tebee, xin chao! " * (size // 17 + 1), 7))
+# CaesarCipher() tự khai báo kiểu cho DLL nên dựng thử một cái là biết dùng được không
+backends.register("caesar", "native", _native_engine, lambda: CaesarCipher()._lib is not None)
+backends.register("caesar", "table", _table_engine)
 
 class CaesarCipher:
     def __init__(self):
-        # Lùi ra 1 cấp từ tbcryptography/ để vào bin/
-        base_dir = Path(__file__).parent.parent
-        dll_path = base_dir / "bin" / "caesar.dll"
-        
-        # Dùng CDLL nếu anh không chắc về __stdcall, hoặc WinDLL nếu có dùng nó
-        self._lib = ctypes.CDLL(str(dll_path)) 
-        self.initial_args()
+        # DLL nằm ở tbcryptography/bin/, load một lần rồi dùng chung cả process
+        try:
+            self._lib = load_library("caesar")
+        except OSError:
+            # Không load được DLL (Linux, macOS...) thì chạy bằng bảng dịch
+            self._lib = None
+        else:
+            self.initial_args()
+
+    def __reduce__(self):
+        # Không có trạng thái: process nhận tự load DLL (hoặc dùng bảng dịch) lại
+        return CaesarCipher, ()
 
     def initial_args(self):
         # 3 tham số: input (bytes), shift (int), output (buffer)
@@ -18,16 +61,30 @@ class CaesarCipher:
 
     def process(self, input_text: str, shift: int) -> str:
         input_bytes = input_text.encode("utf-8")
-        data_len = len(input_bytes)
-        
-        # Tạo buffer lưu kết quả
-        output_buffer = ctypes.create_string_buffer(data_len)
-        
-        # Truyền đủ 3 món cho em!
-        self._lib.process(
-            input_bytes, 
-            ctypes.c_int(shift), 
-            output_buffer
-        )
-        
-        return output_buffer.raw[:data_len].decode("utf-8")
\ No newline at end of file
+        # Engine (DLL hay bảng dịch) do registry chọn theo kích thước input
+        engine = backends.select("caesar", len(input_bytes), native=self._lib is not None)
+        return engine(input_bytes, shift).decode("utf-8")
+
+    def process_bytes(self, data, shift: int) -> bytes:
+        """Caesar trên byte thô: chỉ chữ cái ASCII bị dịch, mọi byte khác (kể cả
+        NUL và byte của ký tự UTF-8 nhiều byte) giữ nguyên. Không có trạng thái
+        nên gọi từng khúc cũng ra như gọi một lần."""
+        data = bytes(data)
+        engine = backends.select("caesar", len(data), native=self._lib is not None)
+        return engine(data, shift)
+
+    def process_batch(self, values, shift, offsets=None):
+        """Caesar cho cả cột một lượt thay vì gọi process() từng dòng.
+
+        `values` là list str, hoặc buffer đã gói kèm `offsets` (n + 1 mốc).
+        `shift` là một số chung hoặc dãy độ dịch riêng cho từng dòng.
+        Trả về cùng bố cục với input: list str, hoặc bytes theo đúng offsets.
+        """
+        def transform(data, offsets):
+            # Số nguyên đơn (kể cả numpy.int64) là độ dịch chung cho cả cột
+            common = _columns.scalar_int(shift)
+            if common is not None:
+                return data.translate(_SHIFT_TABLES[common % 26])
+            shifts = _columns.per_row(shift, len(offsets) - 1)
+            return _columns.caesar(data, offsets, shifts, _SHIFT_TABLES)
+        return _columns.apply(values, offsets, transform)
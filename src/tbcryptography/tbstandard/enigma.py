@@ -1,6 +1,11 @@
 from base64 import b85encode, b85decode
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+import operator
 import random
 
+from .. import _compat, backends
+
 # Tebee-kun nhìn nè, đây là bảng chữ cái Base85 (RFC 1924)
 # Em định nghĩa nó như một hằng số để tránh "Magic Strings" nhé!
 BASE85_CHARS = (
@@ -8,16 +13,42 @@ BASE85_CHARS = (
     "!#$%&()*+-;<=>?@^_`{|}~"
 )
 
+_B85_BYTES = BASE85_CHARS.encode("ascii")
+# Tra byte -> index trong bảng Base85, 255 nếu không thuộc bảng
+_B85_INDEX = bytes(
+    BASE85_CHARS.find(chr(b)) if chr(b) in BASE85_CHARS else 255
+    for b in range(256)
+)
+# Số trạng thái của bộ 3 rotor (cơ chế đồng hồ 85 x 85 x 85)
+_CYCLE = 85 ** 3
+# Xử lý theo block để bộ nhớ tạm không phình theo kích thước input
+_BLOCK = 1 << 18
+# Kích thước mỗi phần gửi sang process con khi chạy song song
+_CHUNK = 1 << 22
+# Số seed giữ bảng rotor/reflector đã dựng trong cache LRU
+_CACHE_SIZE = 256
+
 class EnigmaRotor:
     def __init__(self, mapping: str, ring_setting: int = 0):
         # Type Hinting đầy đủ nha Tebee! 
         self.forward_map = mapping
-        # Tạo map ngược để quay về cho nhanh, tối ưu hiệu năng đó!
-        self.backward_map = "".join(
-            BASE85_CHARS[mapping.find(c)] for c in BASE85_CHARS
-        )
+        # Bảng index nguyên, khỏi phải .find() trên chuỗi mỗi lần đi qua rotor
+        self.forward_table = tuple(_B85_INDEX[ord(c)] for c in mapping)
+        # Map ngược: đảo hoán vị trong một lượt thay vì .find() cho từng ký tự
+        backward = [0] * 85
+        for i, j in enumerate(self.forward_table):
+            backward[j] = i
+        self.backward_table = tuple(backward)
+        self.backward_map = "".join(BASE85_CHARS[i] for i in backward)
         self.position = ring_setting
 
+    def copy(self, position: int = 0) -> "EnigmaRotor":
+        """Rotor mới dùng chung bảng (chỉ đọc) với rotor này, khác mỗi vị trí."""
+        rotor = object.__new__(EnigmaRotor)
+        rotor.__dict__.update(self.__dict__)
+        rotor.position = position
+        return rotor
+
     def rotate(self) -> bool:
         """Xoay rotor và trả về True nếu hoàn thành một vòng."""
         self.position = (self.position + 1) % 85
@@ -25,62 +56,251 @@ class EnigmaRotor:
 
     def encode(self, char_idx: int, reverse: bool = False) -> int:
         """Mã hóa một ký tự dựa trên vị trí hiện tại."""
-        shift_map = self.backward_map if reverse else self.forward_map
+        table = self.backward_table if reverse else self.forward_table
         
         # Tính toán index sau khi cộng offset của rotor
         entering = (char_idx + self.position) % 85
-        out_char = shift_map[entering]
-        exit_idx = (BASE85_CHARS.find(out_char) - self.position) % 85
+        exit_idx = (table[entering] - self.position) % 85
         return exit_idx
 
-class EnigmaMachine:
-    def __init__(self, seed: int):
+class _Compiled:
+    """Rotor và reflector của một seed, dựng một lần rồi các máy cùng seed dùng chung."""
+    __slots__ = ("rotors", "reflector", "np_tables")
+
+    def __init__(self, seed: int) -> None:
         # Chúng ta dùng seed để tạo các Rotor ngẫu nhiên nhưng có thể tái tạo được
         rng = random.Random(seed)
-        
+
         # Tạo 3 rotor hoán vị ngẫu nhiên từ bảng Base85
         shuffled = list(BASE85_CHARS)
-        
-        self.rotors = []
+        rotors = []
         for _ in range(3):
             rng.shuffle(shuffled)
-            self.rotors.append(EnigmaRotor("".join(shuffled)))
-            
+            rotors.append(EnigmaRotor("".join(shuffled)))
+        self.rotors = tuple(rotors)
+
         # Reflector: Phải là các cặp hoán vị đối xứng (A->B thì B->A)
         reflector_list = list(range(85))
         rng.shuffle(reflector_list)
-        self.reflector = {}
+        reflector = [0] * 85
         # Em tạo cặp cho reflector nè, Tebee thấy em thông minh chưa?
         for i in range(0, 84, 2):
-            self.reflector[reflector_list[i]] = reflector_list[i+1]
-            self.reflector[reflector_list[i+1]] = reflector_list[i]
-        # Ký tự cuối cùng tự trỏ vào chính nó nếu lẻ (85 là số lẻ mà)
-        if 84 not in self.reflector: self.reflector[84] = 84
-
-    def process_text(self, text: str) -> str:
-        result = []
-        for char in text:
-            if char not in BASE85_CHARS:
-                result.append(char) # Giữ nguyên nếu không nằm trong bảng mã
+            reflector[reflector_list[i]] = reflector_list[i+1]
+            reflector[reflector_list[i+1]] = reflector_list[i]
+        # Phần tử cuối cùng không có cặp thì tự trỏ vào chính nó (85 là số lẻ mà)
+        reflector[reflector_list[84]] = reflector_list[84]
+        self.reflector = tuple(reflector)
+        self.np_tables = None
+
+_compile = lru_cache(maxsize=_CACHE_SIZE, typed=True)(_Compiled)
+
+class EnigmaMachine:
+    # Bộ 3 rotor quay hết một vòng sau PERIOD ký tự Base85: seek(n) và
+    # seek(n % PERIOD) đưa máy về cùng một trạng thái
+    PERIOD = _CYCLE
+
+    def __init__(self, seed: int, cache: bool = True):
+        """`cache=False` thì không đưa seed vào cache LRU (vd. khi dò hàng loạt seed)."""
+        self.seed = seed
+        self._compiled = _compile(seed) if cache else _Compiled(seed)
+        self.rotors = [rotor.copy() for rotor in self._compiled.rotors]
+        self._reflector_table = self._compiled.reflector
+        # Số ký tự Base85 đã đi qua máy kể từ khi khởi tạo (hoặc lần seek cuối)
+        self._offset = 0
+
+    @property
+    def reflector(self) -> dict[int, int]:
+        # Giữ dạng dict như trước cho ai còn đọc; máy chỉ dùng _reflector_table
+        return dict(enumerate(self._reflector_table))
+
+    def reset(self) -> None:
+        """Quay lại trạng thái vừa khởi tạo, không dựng lại rotor."""
+        self.seek(0)
+
+    def clone(self) -> "EnigmaMachine":
+        """Máy mới cùng seed và cùng vị trí rotor hiện tại, dùng chung bảng đã dựng."""
+        machine = object.__new__(EnigmaMachine)
+        machine.seed = self.seed
+        machine._compiled = self._compiled
+        machine.rotors = [rotor.copy(rotor.position) for rotor in self.rotors]
+        machine._reflector_table = self._reflector_table
+        machine._offset = self._offset
+        return machine
+
+    def __reduce__(self):
+        # Chỉ gửi seed, vị trí rotor và offset; bảng rotor (và bảng NumPy) được
+        # dựng lại qua cache ở process nhận, không pickle theo
+        return _restore, (self.seed, tuple(rotor.position for rotor in self.rotors), self._offset)
+
+    def seek(self, offset: int) -> None:
+        """Đưa máy về trạng thái sau đúng `offset` ký tự Base85 kể từ lúc khởi tạo.
+
+        Ký tự ngoài bảng Base85 không làm rotor quay nên không được tính.
+        """
+        offset = operator.index(offset)
+        r0, r1, r2 = self.rotors
+        r0.position = r1.position = r2.position = 0
+        self._offset = 0
+        self._step_positions(offset)
+
+    def tell(self) -> int:
+        """Số ký tự Base85 đã xử lý, dùng lại được với seek() để chạy tiếp."""
+        return self._offset
+
+    def process_text(self, text: str, workers: int | None = None, chunk_size: int = _CHUNK) -> str:
+        """Mã hóa/giải mã `text`; `workers` > 1 thì chia phần cho process pool.
+
+        Mỗi process con seek tới offset đầu phần của nó nên kết quả ghép lại
+        giống hệt khi chạy tuần tự.
+        """
+        # Ký tự Base85 đều là ASCII nên làm trên UTF-8: byte không thuộc bảng
+        # (kể cả byte của ký tự nhiều byte) được giữ nguyên như trước
+        data = text.encode("utf-8", "surrogatepass")
+        if workers is not None and workers > 1 and len(data) > chunk_size:
+            out = self._process_parallel(data, workers, chunk_size)
+        else:
+            out = self._process_bytes(data)
+        return out.decode("utf-8", "surrogatepass")
+
+    def process(self, data) -> bytes:
+        """Mã hóa/giải mã byte thô, rotor tiếp tục quay từ vị trí hiện tại.
+
+        Chỉ byte thuộc bảng Base85 bị đổi (và làm rotor quay); gọi nối tiếp
+        từng khúc cho ra đúng như gọi một lần trên cả dữ liệu.
+        """
+        return self._process_bytes(bytes(data))
+
+    def _process_bytes(self, data: bytes) -> bytes:
+        # Input ngắn thì vòng lặp Python thường nhanh hơn chi phí dựng mảng
+        # NumPy; ngưỡng thật do registry đo trên máy đang chạy
+        return backends.select("enigma", len(data))(self, data)
+
+    def _process_parallel(self, data: bytes, workers: int, chunk_size: int) -> bytes:
+        r0, r1, r2 = self.rotors
+        state = r0.position + 85 * r1.position + 7225 * r2.position
+        offsets, chunks = [], []
+        total = 0
+        for start in range(0, len(data), chunk_size):
+            chunk = data[start:start + chunk_size]
+            offsets.append(state + total)
+            chunks.append(chunk)
+            # Chỉ ký tự Base85 làm rotor quay
+            total += len(chunk) - len(chunk.translate(None, _B85_BYTES))
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            out = b"".join(pool.map(_process_chunk, [self.seed] * len(chunks), offsets, chunks))
+        self._step_positions(total)
+        return out
+
+    def _step_positions(self, count: int) -> None:
+        # Bộ 3 rotor là một bộ đếm cơ số 85 nên nhảy thẳng tới trạng thái mới
+        r0, r1, r2 = self.rotors
+        state = (r0.position + 85 * r1.position + 7225 * r2.position + count) % _CYCLE
+        r2.position, rest = divmod(state, 7225)
+        r1.position, r0.position = divmod(rest, 85)
+        self._offset += count
+
+    def _process_python(self, data: bytes) -> bytes:
+        """Vòng lặp thuần Python trên bảng index, cho input ngắn hoặc khi thiếu NumPy."""
+        r0, r1, r2 = self.rotors
+        f0, f1, f2 = r0.forward_table, r1.forward_table, r2.forward_table
+        b0, b1, b2 = r0.backward_table, r1.backward_table, r2.backward_table
+        reflector = self._reflector_table
+        p0, p1, p2 = r0.position, r1.position, r2.position
+
+        out = bytearray(data)
+        for i, byte in enumerate(data):
+            idx = _B85_INDEX[byte]
+            if idx == 255:
                 continue
-                
             # 1. Xoay các Rotor (Cơ chế giống đồng hồ)
-            if self.rotors[0].rotate():
-                if self.rotors[1].rotate():
-                    self.rotors[2].rotate()
-            
-            # 2. Đi qua 3 rotor (Chiều đi)
-            idx = BASE85_CHARS.find(char)
-            for r in self.rotors:
-                idx = r.encode(idx)
-                
-            # 3. Phản xạ (Reflector)
-            idx = self.reflector[idx]
-            
-            # 4. Đi ngược lại qua 3 rotor (Chiều về)
-            for r in reversed(self.rotors):
-                idx = r.encode(idx, reverse=True)
-                
-            result.append(BASE85_CHARS[idx])
-            
-        return "".join(result)
\ No newline at end of file
+            p0 += 1
+            if p0 == 85:
+                p0 = 0
+                p1 += 1
+                if p1 == 85:
+                    p1 = 0
+                    p2 = (p2 + 1) % 85
+            # 2. Chiều đi, 3. Phản xạ, 4. Chiều về
+            idx = (f0[(idx + p0) % 85] - p0) % 85
+            idx = (f1[(idx + p1) % 85] - p1) % 85
+            idx = (f2[(idx + p2) % 85] - p2) % 85
+            idx = reflector[idx]
+            idx = (b2[(idx + p2) % 85] - p2) % 85
+            idx = (b1[(idx + p1) % 85] - p1) % 85
+            idx = (b0[(idx + p0) % 85] - p0) % 85
+            out[i] = _B85_BYTES[idx]
+
+        r0.position, r1.position, r2.position = p0, p1, p2
+        self._offset += len(data) - len(data.translate(None, _B85_BYTES))
+        return bytes(out)
+
+    def _numpy_tables(self, np):
+        """Bảng (vị trí, index) -> index cho từng rotor, dựng một lần mỗi seed."""
+        compiled = self._compiled
+        if compiled.np_tables is None:
+            pos = np.arange(85)[:, None]
+            idx = np.arange(85)[None, :]
+            forward, backward = [], []
+            for rotor in self.rotors:
+                for table, out in ((rotor.forward_table, forward), (rotor.backward_table, backward)):
+                    table = np.array(table, dtype=np.intp)
+                    # Hàng p là cả rotor ở vị trí p: (table[(i + p) % 85] - p) % 85
+                    out.append(((table[(idx + pos) % 85] - pos) % 85).ravel())
+            reflector = np.array(self._reflector_table, dtype=np.intp)
+            compiled.np_tables = (forward, backward, reflector)
+        return compiled.np_tables
+
+    def _process_numpy(self, np, data: bytes) -> bytes:
+        """Gather cả message qua bảng, theo dãy vị trí rotor tính sẵn."""
+        forward, backward, reflector = self._numpy_tables(np)
+        index = np.frombuffer(_B85_INDEX, dtype=np.uint8)
+        chars = np.frombuffer(_B85_BYTES, dtype=np.uint8)
+
+        buf = np.frombuffer(data, dtype=np.uint8)
+        out = buf.copy()
+        for start in range(0, buf.size, _BLOCK):
+            block = index[buf[start:start + _BLOCK]]
+            pos = np.flatnonzero(block != 255)
+            n = pos.size
+            if not n:
+                continue
+
+            r0, r1, r2 = self.rotors
+            state = r0.position + 85 * r1.position + 7225 * r2.position
+            # Vị trí rotor của ký tự thứ k là các chữ số cơ số 85 của state + k
+            counter = np.arange(state + 1, state + n + 1, dtype=np.intp) % _CYCLE
+            high, low = np.divmod(counter, 7225)
+            mid, low = np.divmod(low, 85)
+            rows = (low * 85, mid * 85, high * 85)
+
+            idx = block[pos].astype(np.intp)
+            for table, row in zip(forward, rows):
+                idx = table[row + idx]
+            idx = reflector[idx]
+            for table, row in zip(reversed(backward), reversed(rows)):
+                idx = table[row + idx]
+            out[start + pos] = chars[idx]
+            self._step_positions(n)
+
+        return out.tobytes()
+
+def _restore(seed: int, positions: tuple[int, ...], offset: int) -> EnigmaMachine:
+    machine = EnigmaMachine(seed)
+    for rotor, position in zip(machine.rotors, positions):
+        rotor.position = position
+    machine._offset = offset
+    return machine
+
+def _process_chunk(seed: int, offset: int, chunk: bytes) -> bytes:
+    # Chạy trong process con: dựng lại máy từ seed rồi nhảy tới offset của phần này
+    machine = EnigmaMachine(seed)
+    machine.seek(offset)
+    return machine._process_bytes(chunk)
+
+def _numpy_engine(machine: EnigmaMachine, data: bytes) -> bytes:
+    return machine._process_numpy(_compat.numpy(), data)
+
+backends.register_algorithm("enigma", lambda size: (EnigmaMachine(0), b"Tebee xin chao " * (size // 15 + 1)))
+backends.register("enigma", "numpy", _numpy_engine, lambda: _compat.numpy() is not None)
+backends.register("enigma", "python", EnigmaMachine._process_python)
@@ -1,17 +1,179 @@
 import ctypes
-from pathlib import Path
+from functools import lru_cache
+
+from .. import _compat, backends, buffers
+from .._native import load_library
+from . import _columns
+
+_BLOCK = 1 << 16
+_LETTERS = b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+
+def _key_shift(k: int) -> int:
+    """Độ dịch của một byte khóa, giống DLL: toupper(k) - 'A', k là char có dấu
+    nên byte >= 0x80 thành số âm."""
+    k = k - 32 if 97 <= k <= 122 else k if k < 128 else k - 256
+    return k - 65
+
+@lru_cache(maxsize=2)
+def _byte_tables(decrypt: bool) -> bytes:
+    """Bảng dịch 256 byte cho từng giá trị byte khóa 0..255, ghép liền nhau.
+
+    Bảng chỉ phụ thuộc vào giá trị byte khóa chứ không phụ thuộc cả khóa,
+    nên cache có kích thước cố định (64 KiB mỗi chiều) dù khóa dài bao nhiêu.
+    """
+    tables = []
+    for k in range(256):
+        shift = _key_shift(k)
+        table = bytearray(range(256))
+        for base in (65, 97):
+            for c in range(base, base + 26):
+                v = c - base - shift + 26 if decrypt else c - base + shift
+                # % của C cắt về 0, khác với % của Python khi v âm
+                r = v % 26 if v >= 0 else -(-v % 26)
+                table[c] = (r + base) & 0xFF
+        tables.append(bytes(table))
+    return b"".join(tables)
+
+def _letter_count(data: bytes) -> int:
+    return len(data) - len(data.translate(None, _LETTERS))
+
+def _numpy_engine(data: bytes, key_bytes: bytes, decrypt: bool, offset: int = 0) -> bytes:
+    np = _compat.numpy()
+    flat = np.frombuffer(_byte_tables(decrypt), dtype=np.uint8)
+    klen = len(key_bytes)
+    j = offset % klen
+    buf = np.frombuffer(data, dtype=np.uint8)
+    out = buf.copy()
+    # Vị trí bảng của từng ký tự khóa, trải (tile) đủ dài cho một block
+    # (uint16 là đủ: 255 * 256 + 255 < 65536); mảng tạm, không cache theo khóa
+    span = min(buf.size, _BLOCK)
+    rows = np.tile(np.frombuffer(key_bytes, dtype=np.uint8).astype(np.uint16) << 8, span // klen + 2)
+    for start in range(0, buf.size, _BLOCK):
+        block = buf[start:start + _BLOCK]
+        # Khóa chỉ tiến trên chữ cái nên gom các chữ cái lại rồi tra bảng
+        pos = np.flatnonzero((block | 0x20) - np.uint8(97) < 26)
+        n = pos.size
+        if n:
+            out[start + pos] = flat[rows[j:j + n] + block[pos]]
+            j = (j + n) % klen
+    return out.tobytes()
+
+def _python_engine(data: bytes, key_bytes: bytes, decrypt: bool, offset: int = 0) -> bytes:
+    tables = _byte_tables(decrypt)
+    klen = len(key_bytes)
+    j = offset % klen
+    out = bytearray(data)
+    for i, c in enumerate(out):
+        if 65 <= c <= 90 or 97 <= c <= 122:
+            out[i] = tables[(key_bytes[j] << 8) + c]
+            j = (j + 1) % klen
+    return bytes(out)
+
+def _native_engine(data: bytes, key_bytes: bytes, decrypt: bool, offset: int = 0) -> bytes:
+    # Chỉ đúng khi data và khóa không có byte NUL (DLL dùng strlen)
+    lib = load_library("vigenere")
+    func = lib.vigenere_decrypt if decrypt else lib.vigenere_encrypt
+    j = offset % len(key_bytes)
+    key = key_bytes[j:] + key_bytes[:j]
+    n = len(data)
+    if n < buffers.MIN_CLASS:
+        # Buffer nhỏ thì cấp phát thẳng còn rẻ hơn mượn/trả pool
+        buffer = ctypes.create_string_buffer(data)
+        func(buffer, key)
+        return buffer.raw[:n]
+    # DLL sửa tại chỗ trên chuỗi kết thúc bằng NUL: chép vào buffer mượn từ pool
+    with buffers.acquire(n, headroom=1) as buffer:
+        buffer.view[:n] = data
+        buffer.view[n] = 0
+        func(buffer.array, key)
+        return bytes(buffer.view[:n])
+
+def _vigenere_bytes(data: bytes, key_bytes: bytes, decrypt: bool, offset: int = 0) -> bytes:
+    """Engine dự phòng, cho ra đúng byte như vigenere_encrypt/decrypt của DLL.
+
+    `offset` là vị trí khóa lúc bắt đầu (số chữ cái đã xử lý trước đó), để
+    chạy nối tiếp từng khúc ra đúng như chạy một lần. An toàn với byte NUL
+    nên không bao giờ chọn engine DLL.
+    """
+    return backends.select("vigenere", len(data), native=False)(data, key_bytes, decrypt, offset)
+
+backends.register_algorithm("vigenere", lambda size: (b"Tebee, xin chao! " * (size // 17 + 1), b"TebeeKey", False))
+backends.register("vigenere", "native", _native_engine, lambda: VigenereCipher()._lib is not None)
+# NumPy là tùy chọn, thiếu thì chỉ còn vòng lặp Python
+backends.register("vigenere", "numpy", _numpy_engine, lambda: _compat.numpy() is not None)
+backends.register("vigenere", "python", _python_engine)
+
+class VigenereStream:
+    """Vigenere trên bytes, an toàn với byte NUL và giữ vị trí khóa giữa các lần update().
+
+    Ghép kết quả các lần update() lại sẽ giống hệt chạy một lần trên toàn bộ
+    dữ liệu, nên file lớn xử lý được theo từng khúc.
+    """
+    def __init__(self, key: str | bytes, decrypt: bool = False, offset: int = 0, lib=None) -> None:
+        self.key = key.encode('utf-8') if isinstance(key, str) else bytes(key)
+        self.decrypt = decrypt
+        # Số chữ cái đã xử lý, quyết định ký tự khóa tiếp theo
+        self.offset = offset
+        self._lib = lib
+
+    def __getstate__(self) -> dict:
+        # Handle DLL không pickle được: chỉ ghi lại là có dùng DLL hay không
+        state = self.__dict__.copy()
+        state["_lib"] = self._lib is not None
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        if self._lib:
+            # Process nhận load lại DLL; không có thì dùng engine bảng dịch
+            self._lib = VigenereCipher()._lib
+        else:
+            self._lib = None
+
+    def _native(self, data: bytes) -> bytes:
+        # DLL dừng ở byte NUL: chia data theo NUL, engine native xoay khóa cho
+        # khớp offset là ra đúng kết quả
+        parts = []
+        for segment in data.split(b'\0'):
+            if segment:
+                out = _native_engine(segment, self.key, self.decrypt, self.offset)
+                # Đếm chữ cái trên input: khóa lạ có thể biến chữ cái thành byte khác
+                self.offset += _letter_count(segment)
+                segment = out
+            parts.append(segment)
+        return b'\0'.join(parts)
+
+    def update(self, data) -> bytes:
+        data = bytes(data)
+        if not self.key:
+            return data
+        # Khóa có NUL thì DLL sẽ cắt mất, khi đó chỉ dùng engine bảng dịch
+        native = self._lib is not None and b'\0' not in self.key
+        engine = backends.select("vigenere", len(data), native=native)
+        if engine is _native_engine:
+            return self._native(data)
+        out = engine(data, self.key, self.decrypt, self.offset)
+        self.offset += _letter_count(data)
+        return out
+
+    def finalize(self) -> bytes:
+        # Vigenere không có padding; có hàm này để dùng chung với stream của TFSC
+        return b""
 
 class VigenereCipher:
     def __init__(self):
-        # Đường dẫn: lùi 1 cấp từ tbstandard/ rồi vào bin/
-        base_dir = Path(__file__).parent.parent
-        dll_path = base_dir / "bin" / "vigenere.dll"
-        
-        if not dll_path.exists():
-            raise FileNotFoundError(f"Tebee ơi, quên build DLL rồi nè: {dll_path}")
-            
-        self._lib = ctypes.CDLL(str(dll_path))
-        self._initial_args()
+        # DLL ở tbcryptography/bin/, load một lần rồi dùng chung cả process
+        try:
+            self._lib = load_library("vigenere")
+        except OSError:
+            # Quên build DLL hoặc không chạy Windows: dùng engine dự phòng
+            self._lib = None
+        else:
+            self._initial_args()
+
+    def __reduce__(self):
+        # Không có trạng thái: process nhận tự load DLL (hoặc dùng engine dự phòng) lại
+        return VigenereCipher, ()
 
     def _initial_args(self):
         # Cả encrypt và decrypt đều nhận (char*, char*)
@@ -21,22 +183,61 @@ class VigenereCipher:
         self._lib.vigenere_decrypt.argtypes = [ctypes.c_char_p, ctypes.c_char_p]
         self._lib.vigenere_decrypt.restype = None
 
+    def _process(self, text: str, key: str, decrypt: bool) -> str:
+        # DLL dùng strlen nên mọi thứ sau byte NUL đầu tiên bị cắt; cắt sẵn ở
+        # đây thì engine nào cũng ra cùng kết quả
+        data = text.encode('utf-8').split(b'\0', 1)[0]
+        key_bytes = key.encode('utf-8').split(b'\0', 1)[0]
+        if not key_bytes:
+            return data.decode('utf-8')
+        engine = backends.select("vigenere", len(data), native=self._lib is not None)
+        return engine(data, key_bytes, decrypt).decode('utf-8')
+
+    def encryptor(self, key: str | bytes, offset: int = 0) -> VigenereStream:
+        return VigenereStream(key, decrypt=False, offset=offset, lib=self._lib)
+
+    def decryptor(self, key: str | bytes, offset: int = 0) -> VigenereStream:
+        return VigenereStream(key, decrypt=True, offset=offset, lib=self._lib)
+
+    def encrypt_bytes(self, data, key: str | bytes, offset: int = 0) -> bytes:
+        """Mã hóa mọi buffer (bytes, bytearray, memoryview...) theo đúng độ dài của nó,
+        kể cả khi có byte NUL; `offset` là vị trí khóa bắt đầu."""
+        return self.encryptor(key, offset).update(data)
+
+    def decrypt_bytes(self, data, key: str | bytes, offset: int = 0) -> bytes:
+        return self.decryptor(key, offset).update(data)
+
+    def _batch(self, values, key, offsets, decrypt: bool):
+        def normalize(k) -> bytes:
+            k = k.encode('utf-8') if isinstance(k, str) else bytes(k)
+            # Khóa bị cắt ở NUL giống encrypt()
+            return k.split(b'\0', 1)[0]
+
+        def transform(data, offsets):
+            if isinstance(key, (str, bytes)):
+                keys = normalize(key)
+            else:
+                keys = [normalize(k) for k in _columns.per_row(key, len(offsets) - 1)]
+            return _columns.vigenere(data, offsets, keys, decrypt, _vigenere_bytes)
+        return _columns.apply(values, offsets, transform)
+
+    def encrypt_batch(self, values, key, offsets=None):
+        """Mã hóa cả cột một lượt, không gọi DLL cho từng dòng.
+
+        `values` là list str, hoặc buffer đã gói kèm `offsets` (n + 1 mốc).
+        `key` là khóa chung hoặc dãy khóa riêng từng dòng; vị trí khóa bắt
+        đầu lại ở mỗi dòng nên kết quả giống encrypt() từng dòng (dữ liệu thì
+        không bị cắt ở byte NUL). Trả về cùng bố cục với input.
+        """
+        return self._batch(values, key, offsets, decrypt=False)
+
+    def decrypt_batch(self, values, key, offsets=None):
+        return self._batch(values, key, offsets, decrypt=True)
+
     def encrypt(self, text: str, key: str) -> str:
         if not key: return text
-        
-        # Vì chúng ta sửa trực tiếp trên buffer (In-place)
-        # nên cần tạo một buffer chứa bản sao của text
-        buffer = ctypes.create_string_buffer(text.encode('utf-8'))
-        key_bytes = key.encode('utf-8')
-        
-        self._lib.vigenere_encrypt(buffer, key_bytes)
-        return buffer.value.decode('utf-8')
+        return self._process(text, key, decrypt=False)
 
     def decrypt(self, text: str, key: str) -> str:
         if not key: return text
-        
-        buffer = ctypes.create_string_buffer(text.encode('utf-8'))
-        key_bytes = key.encode('utf-8')
-        
-        self._lib.vigenere_decrypt(buffer, key_bytes)
-        return buffer.value.decode('utf-8')
\ No newline at end of file
+        return self._process(text, key, decrypt=True)
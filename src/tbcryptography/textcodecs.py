@@ -0,0 +1,203 @@
+"""Codec văn bản cho các cipher cổ điển, đăng ký với module codecs của Python.
+
+    import tbcryptography                      # đăng ký tìm codec tb-*
+    with open("thu.txt", "w", encoding="tb-enigma:42") as f:
+        f.write(text)                          # ghi ciphertext từng khúc
+    with open("thu.txt", encoding="tb-enigma:42") as f:
+        for line in f: ...                     # đọc ra bản rõ từng khúc
+
+Tên codec: tb-caesar:<shift>, tb-atbash, tb-vigenere:<key>, tb-enigma:<seed>.
+Encode là mã hóa (str -> byte UTF-8 của ciphertext), decode là giải mã.
+Vị trí rotor / vị trí khóa được giữ giữa các khúc nên đọc ghi qua
+io.TextIOWrapper, codecs.open... cho ra đúng như xử lý cả chuỗi một lần, mà
+RAM không phụ thuộc kích thước file.
+
+codecs chuẩn hóa tên thành chữ thường và đổi ký tự ngoài chữ/số thành "_",
+nên shift chỉ viết được số không âm (-3 thì viết 23) và khóa Vigenere chỉ
+nên gồm chữ cái/chữ số; khóa khác thì dùng thẳng IncrementalEncoder/Decoder.
+"""
+import codecs
+from functools import partial
+from typing import Callable, Optional
+
+from .tbstandard.atbash import AtbashCipher
+from .tbstandard.caesar import CaesarCipher
+from .tbstandard.enigma import EnigmaMachine
+from .tbstandard.vigenere import VigenereCipher
+
+PREFIX = "tb_"
+
+# Cả ba cipher chỉ đổi byte ASCII và chỉ byte ASCII làm khóa/rotor tiến lên,
+# nên làm trên UTF-8 là đủ: byte của ký tự nhiều byte đi qua nguyên vẹn.
+
+class _Stateless:
+    """Caesar/Atbash: không có trạng thái giữa các khúc."""
+    def __init__(self, func: Callable[[bytes], bytes]) -> None:
+        self._func = func
+
+    def update(self, data: bytes) -> bytes:
+        return self._func(data)
+
+    def tell(self) -> int:
+        return 0
+
+    def seek(self, position: int) -> None:
+        pass
+
+class _Enigma:
+    def __init__(self, seed: int) -> None:
+        self._machine = EnigmaMachine(seed)
+
+    def update(self, data: bytes) -> bytes:
+        return self._machine.process(data)
+
+    def tell(self) -> int:
+        # Trạng thái rotor lặp lại sau PERIOD ký tự; số nhỏ thì vừa cookie của TextIOWrapper
+        return self._machine.tell() % EnigmaMachine.PERIOD
+
+    def seek(self, position: int) -> None:
+        self._machine.seek(position)
+
+class _Vigenere:
+    def __init__(self, key: str | bytes, decrypt: bool) -> None:
+        cipher = VigenereCipher()
+        self._stream = cipher.decryptor(key) if decrypt else cipher.encryptor(key)
+
+    def update(self, data: bytes) -> bytes:
+        return self._stream.update(data)
+
+    def tell(self) -> int:
+        return self._stream.offset % len(self._stream.key) if self._stream.key else 0
+
+    def seek(self, position: int) -> None:
+        self._stream.offset = position
+
+# make(decrypt) -> bộ biến đổi byte có update/tell/seek
+Factory = Callable[[bool], object]
+
+class IncrementalEncoder(codecs.IncrementalEncoder):
+    """Mã hóa từng khúc str; `make(decrypt)` tạo bộ biến đổi byte của cipher."""
+    def __init__(self, make: Factory, errors: str = "strict") -> None:
+        super().__init__(errors)
+        self._cipher = make(False)
+
+    def encode(self, input: str, final: bool = False) -> bytes:
+        return self._cipher.update(input.encode("utf-8", self.errors))
+
+    def reset(self) -> None:
+        self._cipher.seek(0)
+
+    def getstate(self) -> int:
+        return self._cipher.tell()
+
+    def setstate(self, state: int) -> None:
+        self._cipher.seek(state)
+
+class IncrementalDecoder(codecs.IncrementalDecoder):
+    """Giải mã từng khúc byte; ký tự UTF-8 bị cắt ngang giữa hai khúc được giữ lại."""
+    def __init__(self, make: Factory, errors: str = "strict") -> None:
+        super().__init__(errors)
+        self._cipher = make(True)
+        self._utf8 = codecs.getincrementaldecoder("utf-8")(errors)
+
+    def decode(self, input, final: bool = False) -> str:
+        return self._utf8.decode(self._cipher.update(bytes(input)), final)
+
+    def reset(self) -> None:
+        self._utf8.reset()
+        self._cipher.seek(0)
+
+    def getstate(self) -> tuple[bytes, int]:
+        # Phần UTF-8 còn dở toàn là byte >= 0x80: cipher không đổi chúng và
+        # chúng không làm khóa tiến lên, nên bản rõ hay bản mã của nó là một.
+        # TextIOWrapper dựa vào state này để tell()/seek() khi đọc
+        pending, _ = self._utf8.getstate()
+        return pending, self._cipher.tell()
+
+    def setstate(self, state: tuple[bytes, int]) -> None:
+        pending, position = state
+        self._utf8.setstate((pending, 0))
+        self._cipher.seek(position)
+
+class StreamWriter(codecs.StreamWriter):
+    def __init__(self, make: Factory, stream, errors: str = "strict") -> None:
+        super().__init__(stream, errors)
+        self._encoder = IncrementalEncoder(make, errors)
+
+    def encode(self, input: str, errors: str = "strict") -> tuple[bytes, int]:
+        return self._encoder.encode(input), len(input)
+
+    def reset(self) -> None:
+        super().reset()
+        self._encoder.reset()
+
+class StreamReader(codecs.StreamReader):
+    def __init__(self, make: Factory, stream, errors: str = "strict") -> None:
+        super().__init__(stream, errors)
+        self._decoder = IncrementalDecoder(make, errors)
+
+    def decode(self, input, errors: str = "strict") -> tuple[str, int]:
+        return self._decoder.decode(input), len(input)
+
+    def reset(self) -> None:
+        super().reset()
+        self._decoder.reset()
+
+def _caesar(param: str) -> Factory:
+    shift = int(param)
+    cipher = CaesarCipher()
+    return lambda decrypt: _Stateless(partial(cipher.process_bytes, shift=-shift if decrypt else shift))
+
+def _atbash(param: str) -> Factory:
+    if param:
+        raise ValueError("atbash không nhận tham số")
+    cipher = AtbashCipher()
+    return lambda decrypt: _Stateless(cipher.process_bytes)
+
+def _vigenere(param: str) -> Factory:
+    if not param:
+        raise ValueError("thiếu khóa")
+    return partial(_Vigenere, param)
+
+def _enigma(param: str) -> Factory:
+    seed = int(param)
+    # Enigma đối xứng: mã hóa hay giải mã đều là một máy mới từ seed
+    return lambda decrypt: _Enigma(seed)
+
+_CIPHERS: dict[str, Callable[[str], Factory]] = {
+    "caesar": _caesar,
+    "atbash": _atbash,
+    "vigenere": _vigenere,
+    "enigma": _enigma,
+}
+
+def codec_info(cipher: str, param: str = "") -> codecs.CodecInfo:
+    """CodecInfo cho `cipher` với tham số `param` (shift, khóa hoặc seed, dạng chuỗi)."""
+    try:
+        make = _CIPHERS[cipher](param)
+    except KeyError:
+        raise LookupError(f"Không có codec tb-{cipher}") from None
+    except ValueError as exc:
+        raise LookupError(f"Tham số codec tb-{cipher} không hợp lệ ({param!r}): {exc}") from None
+
+    def encode(input: str, errors: str = "strict") -> tuple[bytes, int]:
+        return IncrementalEncoder(make, errors).encode(input, True), len(input)
+
+    def decode(input, errors: str = "strict") -> tuple[str, int]:
+        return IncrementalDecoder(make, errors).decode(input, True), len(input)
+
+    return codecs.CodecInfo(
+        encode, decode,
+        incrementalencoder=partial(IncrementalEncoder, make),
+        incrementaldecoder=partial(IncrementalDecoder, make),
+        streamwriter=partial(StreamWriter, make),
+        streamreader=partial(StreamReader, make),
+        name=f"tb-{cipher}" + (f":{param}" if param else ""),
+    )
+
+def search(name: str) -> Optional[codecs.CodecInfo]:
+    """Hàm tìm codec cho codecs.register(); tên đã được chuẩn hóa thành tb_<cipher>_<tham số>."""
+    if not name.startswith(PREFIX):
+        return None
+    cipher, _, param = name[len(PREFIX):].partition("_")
+    return codec_info(cipher, param)
@@ -1,3 +1,15 @@
+"""Menu tương tác cũ qua input(), đã ngừng phát triển.
+
+Dùng CLI không tương tác thay thế, đọc stdin/file và ghi stdout/file:
+
+    python -m tbcryptography caesar encrypt --shift 3 < in.txt
+    python -m tbcryptography vigenere decrypt --key-file key.txt -o out.txt in.txt
+"""
+import warnings
+
+warnings.warn("tbcryptography.utils đã ngừng phát triển, dùng `python -m tbcryptography` thay thế",
+              FutureWarning, stacklevel=2)
+
 from tbcryptography import atbash, caesar, EnigmaMachine, vigenere, tbc, tfsc
 from base64 import b85encode, b85decode
 import os
@@ -80,24 +92,30 @@ def tfsc_mc() -> None:
             continue
         else:
             return None
-while True:
-    machine = input("Nhập hệ thống bạn muốn dùng: ")
-    if machine == "atbash":
-        atbash_mc()
-        continue
-    if machine == "caesar":
-        caesar_mc()
-        continue
-    if machine == "enigma":
-        enigma_mc()
-        continue
-    if machine == "vigenere":
-        vigenere_mc()
-        continue
-    if machine == "tbc":
-        tbc_mc()
-        continue
-    if machine == "tfsc":
-        tfsc_mc()
-        continue
-    break
\ No newline at end of file
+
+def main() -> None:
+    """Menu chọn hệ thống; chỉ chạy khi gọi trực tiếp, import không còn bị chặn ở input()."""
+    while True:
+        machine = input("Nhập hệ thống bạn muốn dùng: ")
+        if machine == "atbash":
+            atbash_mc()
+            continue
+        if machine == "caesar":
+            caesar_mc()
+            continue
+        if machine == "enigma":
+            enigma_mc()
+            continue
+        if machine == "vigenere":
+            vigenere_mc()
+            continue
+        if machine == "tbc":
+            tbc_mc()
+            continue
+        if machine == "tfsc":
+            tfsc_mc()
+            continue
+        break
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+import asyncio
+import os
+
+from tbcryptography import aio
+from tbcryptography.tbcomplex.tfsc import TebeeFastStreamCipher
+from tbcryptography.tbstandard.caesar import CaesarCipher
+
+KEY = bytes(range(128))
+
+def test_same_cipher_on_several_loops():
+    # inline_limit=0 buộc mọi lời gọi đi qua semaphore và executor
+    cipher = aio.AsyncCipher(CaesarCipher(), inline_limit=0, limit=1)
+
+    async def run():
+        return await asyncio.gather(*[cipher.process("Hello world", 3) for _ in range(5)])
+
+    for _ in range(3):
+        assert asyncio.run(run()) == ["Khoor zruog"] * 5
+
+def test_many_concurrent_many_calls():
+    cipher = aio.AsyncCipher(TebeeFastStreamCipher(), limit=8)
+    msgs = [os.urandom(1000)] * 4
+
+    async def run():
+        return await asyncio.wait_for(
+            asyncio.gather(*[cipher.run("encrypt_many", msgs, KEY) for _ in range(32)]), 30)
+
+    results = asyncio.run(run())
+    assert all(result == results[0] for result in results)
+
+class _Reader:
+    def __init__(self, data: bytes) -> None:
+        self._data = data
+
+    async def read(self, n: int) -> bytes:
+        chunk, self._data = self._data[:n], self._data[n:]
+        return chunk
+
+class _Writer:
+    def __init__(self) -> None:
+        self.data = bytearray()
+
+    def write(self, data) -> None:
+        self.data += data
+
+    async def drain(self) -> None:
+        pass
+
+def test_stream_round_trip():
+    data = os.urandom(100000)
+    expected = bytearray(data)
+    TebeeFastStreamCipher().encrypt(expected, KEY)
+
+    async def run():
+        enc, dec = _Writer(), _Writer()
+        await aio.encrypt_stream(_Reader(data), enc, KEY, chunk_size=4096, inline_limit=1000)
+        await aio.decrypt_stream(_Reader(bytes(enc.data)), dec, KEY, chunk_size=1000)
+        return enc.data, dec.data
+
+    enc, dec = asyncio.run(run())
+    assert enc == expected
+    assert dec == data
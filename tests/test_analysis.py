@@ -0,0 +1,32 @@
+import argparse
+import collections
+import json
+import textwrap
+
+import pytest
+
+from tbcryptography.tbstandard import analysis
+from tbcryptography.tbstandard.caesar import CaesarCipher
+from tbcryptography.tbstandard.enigma import EnigmaMachine
+from tbcryptography.tbstandard.vigenere import VigenereCipher
+
+# Văn bản tiếng Anh đủ dài để thống kê tần suất có nghĩa
+PLAIN = "".join(module.__doc__ for module in (argparse, collections, json, textwrap)) * 5
+
+@pytest.mark.parametrize("shift", [0, 3, 17, 25])
+def test_crack_caesar(shift):
+    assert analysis.crack_caesar(CaesarCipher().process(PLAIN, shift)) == shift
+
+def test_crack_vigenere():
+    ciphertext = VigenereCipher().encrypt(PLAIN, "Lemonade")
+    assert analysis.vigenere_key_lengths(ciphertext, 20)[0][0] % 8 == 0
+    key = analysis.crack_vigenere(ciphertext)
+    assert VigenereCipher().decrypt(ciphertext, key) == PLAIN
+
+def test_find_enigma_seed():
+    sample = "Hello Enigma known plaintext! abcdefghij0123456789xyz"
+    machine = EnigmaMachine(4321)
+    machine.seek(1000)
+    ciphertext = machine.process_text(sample)
+    assert analysis.find_enigma_seed(ciphertext, sample, range(4000, 4500), offset=1000) == 4321
+    assert analysis.find_enigma_seed(ciphertext, sample, range(0, 100), offset=1000) is None
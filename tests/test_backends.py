@@ -0,0 +1,78 @@
+import json
+import threading
+
+import pytest
+
+from tbcryptography import backends
+from tbcryptography.tbstandard import atbash, caesar, enigma, vigenere
+
+# Byte NUL ở đầu, giữa, cuối và liền nhau: DLL dừng ở NUL nên đây là chỗ các engine dễ lệch nhau
+DATA = b"\0Hello, World!\0\0xin chao \xc3\xa0 Zz\0" * 700
+
+def _same(algorithm, make_args):
+    engines = backends.engines(algorithm)
+    assert engines
+    outputs = {name: engine(*make_args()) for name, engine in engines.items()}
+    assert len(set(outputs.values())) == 1, list(outputs)
+
+@pytest.mark.parametrize("size", [0, 1, 100, len(DATA)])
+def test_engines_identical_with_nul(size):
+    data = DATA[:size]
+    _same("caesar", lambda: (data, 7))
+    _same("atbash", lambda: (data,))
+    _same("vigenere", lambda: (data, b"LeMon", False, 3))
+    _same("vigenere", lambda: (data, b"LeMon", True, 0))
+    _same("enigma", lambda: (enigma.EnigmaMachine(42), data))
+
+def test_select_returns_registered_engine():
+    assert backends.select("caesar", 10) in backends.engines("caesar").values()
+    assert backends.select("vigenere", 10, native=False) is not vigenere._native_engine
+    assert caesar.CaesarCipher().process("Hello", 3) == "Khoor"
+    assert atbash.AtbashCipher().process("abc") == "zyx"
+
+@pytest.fixture
+def clean(monkeypatch, tmp_path):
+    # Cache riêng cho từng test, không đụng cache thật của máy
+    monkeypatch.setenv(backends.ENV_CACHE_DIR, str(tmp_path))
+    monkeypatch.delenv(backends.ENV_BACKEND, raising=False)
+    backends.reset()
+    yield monkeypatch
+    backends.reset()
+
+def test_env_override(clean):
+    clean.setenv(backends.ENV_BACKEND, "caesar=table")
+    backends.reset()
+    assert all(band[0] == "table" for band in backends.ranking("caesar"))
+    assert backends.select("caesar", 1 << 20) is backends.engines("caesar")["table"]
+    clean.setenv(backends.ENV_BACKEND, "default")
+    backends.reset()
+    assert backends.ranking("vigenere") == [list(backends.engines("vigenere"))] * len(backends.SAMPLE_SIZES)
+    clean.setenv(backends.ENV_BACKEND, "caesar=khong-co")
+    backends.reset()
+    with pytest.raises(ValueError):
+        backends.ranking("caesar")
+
+def test_cache_reused(clean):
+    measured = backends.calibrate("caesar")["caesar"]
+    assert json.loads(backends.cache_path().read_text(encoding="utf-8"))["caesar"]
+    backends.reset()
+    clean.setattr(backends, "_measure", lambda *args: pytest.fail("đã có cache mà vẫn đo lại"))
+    assert backends.ranking("caesar") == measured
+
+def test_select_does_not_wait_for_measurement(clean):
+    started, release = threading.Event(), threading.Event()
+
+    def slow(algo, names):
+        started.set()
+        release.wait(5)
+        return [list(reversed(names))] * len(backends.SAMPLE_SIZES)
+
+    clean.setattr(backends, "_measure", slow)
+    # Chưa có cache: dùng ngay engine đăng ký đầu tiên, việc đo chạy trong thread nền
+    assert backends.select("atbash", 10) is next(iter(backends.engines("atbash").values()))
+    assert started.wait(5)
+    release.set()
+    for thread in threading.enumerate():
+        if thread.name == "tbcryptography-calibrate-atbash":
+            thread.join(5)
+    assert backends.ranking("atbash")[0] == list(reversed(backends.engines("atbash")))
@@ -0,0 +1,20 @@
+import pytest
+
+from tbcryptography.tbstandard.caesar import CaesarCipher
+
+np = pytest.importorskip("numpy")
+
+VALUES = ["Hello", "world", "Xin chào", ""]
+
+def test_process_batch_numpy_scalar_shift():
+    cipher = CaesarCipher()
+    expected = cipher.process_batch(VALUES, 3)
+    assert cipher.process_batch(VALUES, np.int64(3)) == expected
+    assert cipher.process_batch(VALUES, [np.int32(3)] * len(VALUES)) == expected
+    assert cipher.process_batch(VALUES, np.full(len(VALUES), 3)) == expected
+
+def test_process_batch_numpy_scalar_shift_packed():
+    cipher = CaesarCipher()
+    data = "".join(VALUES).encode("utf-8")
+    offsets = [0, 5, 10, 10 + len("Xin chào".encode("utf-8")), len(data)]
+    assert cipher.process_batch(data, np.int64(29), offsets) == cipher.process_batch(data, 3, offsets)
@@ -0,0 +1,39 @@
+import pytest
+
+from tbcryptography import buffers
+
+def test_acquire_release_reuses_buffer():
+    pool = buffers.BufferPool(per_class=2, max_bytes=1 << 20)
+    with pool.acquire(20000, headroom=16) as buf:
+        assert len(buf.view) == 20016
+        assert buf.capacity >= 20016
+        first = buf.capacity
+    assert buf.released
+    with pool.acquire(20001) as again:
+        assert again.capacity == first
+    stats = pool.stats()
+    assert stats["acquires"] == 2
+    assert stats["hits"] == 1
+    assert stats["outstanding"] == 0
+
+def test_double_release_fails():
+    pool = buffers.BufferPool()
+    buf = pool.acquire(100)
+    buf.release()
+    with pytest.raises(ValueError):
+        buf.release()
+
+def test_limits():
+    pool = buffers.BufferPool(per_class=1, max_bytes=1 << 20)
+    big = pool.acquire(pool.max_class + 1)
+    big.release()
+    held = [pool.acquire(20000) for _ in range(3)]
+    for buf in held:
+        buf.release()
+    stats = pool.stats()
+    assert stats["oversize"] == 1
+    # Mỗi lớp chỉ giữ lại per_class buffer rảnh
+    assert stats["discarded"] == 2
+    assert sum(stats["free"].values()) == 1
+    pool.clear()
+    assert pool.stats()["retained_bytes"] == 0
@@ -0,0 +1,65 @@
+import os
+import stat
+import sys
+
+import pytest
+
+from tbcryptography.__main__ import main
+from tbcryptography.tbstandard.vigenere import VigenereCipher
+
+DATA = b"Hello, World!\0 Xin ch\xc3\xa0o\n" * 3000
+
+def _round_trip(tmp_path, *options):
+    src = tmp_path / "plain.txt"
+    src.write_bytes(DATA)
+    assert main([*options[:1], "encrypt", str(src), "-o", str(tmp_path / "enc"), "-q", *options[1:]]) == 0
+    enc = tmp_path / "enc" / "plain.txt.tb"
+    assert main([*options[:1], "decrypt", str(enc), "-o", str(tmp_path / "dec"), "-q", *options[1:]]) == 0
+    assert (tmp_path / "dec" / "plain.txt").read_bytes() == DATA
+    return enc.read_bytes()
+
+@pytest.mark.parametrize("options", [
+    ["caesar", "--shift", "5"],
+    ["atbash"],
+    ["enigma", "--seed", "7"],
+    ["caesar", "--hex", "--chunk-size", "1000"],
+])
+def test_round_trip(tmp_path, options):
+    ciphertext = _round_trip(tmp_path, *options)
+    assert ciphertext != DATA
+
+def test_keyed_round_trip(tmp_path):
+    key = tmp_path / "tfsc.key"
+    assert main(["keygen", "tfsc", "-o", str(key)]) == 0
+    assert len(key.read_bytes()) == 128
+    _round_trip(tmp_path, "tfsc", "--key-file", str(key), "--chunk-size", "1000")
+
+def test_vigenere_key_file_newline(tmp_path):
+    key = tmp_path / "vig.key"
+    key.write_bytes(b"LEMON\n")
+    assert _round_trip(tmp_path, "vigenere", "--key-file", str(key)) == VigenereCipher().encrypt_bytes(DATA, "LEMON")
+
+def test_keygen_refuses_overwrite(tmp_path):
+    key = tmp_path / "k.bin"
+    key.write_bytes(b"old")
+    with pytest.raises(SystemExit):
+        main(["keygen", "tbaems", "-o", str(key)])
+    assert key.read_bytes() == b"old"
+    assert main(["keygen", "tbaems", "-o", str(key), "--force"]) == 0
+    assert len(key.read_bytes()) == 32
+    if sys.platform != "win32":
+        assert stat.S_IMODE(os.stat(key).st_mode) == 0o600
+
+def test_output_collision(tmp_path):
+    for name in ("a", "b"):
+        (tmp_path / name).mkdir()
+        (tmp_path / name / "same.txt").write_bytes(b"x")
+    with pytest.raises(SystemExit):
+        main(["caesar", "encrypt", str(tmp_path / "a" / "same.txt"), str(tmp_path / "b" / "same.txt"),
+              "-o", str(tmp_path / "out"), "-q"])
+
+def test_missing_key(tmp_path):
+    src = tmp_path / "plain.txt"
+    src.write_bytes(DATA)
+    with pytest.raises(SystemExit):
+        main(["tfsc", "encrypt", str(src), "-o", str(tmp_path / "out"), "-q"])
@@ -0,0 +1,62 @@
+import codecs
+import random
+
+import pytest
+
+import tbcryptography  # noqa: F401  (đăng ký codec tb-*)
+from tbcryptography.tbstandard.caesar import CaesarCipher
+from tbcryptography.tbstandard.enigma import EnigmaMachine
+
+ALPHABET = "abcXYZ hello Wörld ✓ đ ~!{}\n0123"
+TEXT = "".join(random.Random(1).choices(ALPHABET, k=20000))
+NAMES = ["tb-enigma:42", "tb-caesar:23", "tb-atbash", "tb-vigenere:Lemon"]
+
+def test_known_values():
+    assert codecs.encode("Hello", "tb-caesar:3") == CaesarCipher().process("Hello", 3).encode()
+    assert codecs.encode(TEXT, "tb-enigma:42").decode() == EnigmaMachine(42).process_text(TEXT)
+
+@pytest.mark.parametrize("name", NAMES)
+def test_incremental_matches_one_shot(name):
+    expected = codecs.encode(TEXT, name)
+    encoder = codecs.getincrementalencoder(name)()
+    assert b"".join(encoder.encode(TEXT[i:i + 777]) for i in range(0, len(TEXT), 777)) == expected
+    decoder = codecs.getincrementaldecoder(name)()
+    # Khúc 5 byte cắt ngang ký tự UTF-8 nhiều byte
+    assert "".join(decoder.decode(expected[i:i + 5]) for i in range(0, len(expected), 5)) == TEXT
+    assert codecs.decode(expected, name) == TEXT
+
+@pytest.mark.parametrize("name", NAMES)
+def test_getstate_setstate(name):
+    expected = codecs.encode(TEXT, name)
+    encoder = codecs.getincrementalencoder(name)()
+    head = encoder.encode(TEXT[:1234])
+    resumed = codecs.getincrementalencoder(name)()
+    resumed.setstate(encoder.getstate())
+    assert head + resumed.encode(TEXT[1234:]) == expected
+
+    cut = expected.index("✓".encode()) + 1
+    decoder = codecs.getincrementaldecoder(name)()
+    head = decoder.decode(expected[:cut])
+    resumed = codecs.getincrementaldecoder(name)()
+    resumed.setstate(decoder.getstate())
+    assert head + resumed.decode(expected[cut:], True) == TEXT
+
+@pytest.mark.parametrize("name", NAMES)
+def test_text_file_seek(tmp_path, name):
+    path = tmp_path / "thu.txt"
+    with open(path, "w", encoding=name, newline="") as f:
+        for i in range(0, len(TEXT), 1001):
+            f.write(TEXT[i:i + 1001])
+    assert path.read_bytes() == codecs.encode(TEXT, name)
+    with open(path, encoding=name, newline="") as f:
+        f.readline()
+        f.read(1234)
+        pos = f.tell()
+        rest = f.read(5000)
+        f.seek(pos)
+        assert f.read(5000) == rest
+
+@pytest.mark.parametrize("name", ["tb-caesar:x", "tb-foo", "tb-vigenere", "tb-atbash:1"])
+def test_bad_names(name):
+    with pytest.raises(LookupError):
+        codecs.lookup(name)
@@ -0,0 +1,49 @@
+import base64
+import random
+
+import pytest
+
+from tbcryptography.tbstandard.enigma import EnigmaMachine
+
+# Toàn ký tự Base85 nên vị trí chuỗi cũng là offset của rotor; phần đuôi có ký tự ngoài bảng
+TEXT = base64.b85encode(random.Random(4).randbytes(20000)).decode() + " đuôi é\n"
+
+@pytest.mark.parametrize("offset", [0, 1, 84, 85, 7224, 7225, 20000])
+def test_seek_matches_sequential(offset):
+    full = EnigmaMachine(8).process_text(TEXT)
+    machine = EnigmaMachine(8)
+    machine.seek(offset)
+    assert machine.tell() == offset
+    assert machine.process_text(TEXT[offset:]) == full[offset:]
+
+def test_seek_wraps_after_period():
+    a, b = EnigmaMachine(3), EnigmaMachine(3)
+    a.seek(EnigmaMachine.PERIOD + 100)
+    b.seek(100)
+    assert [r.position for r in a.rotors] == [r.position for r in b.rotors]
+    assert a.process_text(TEXT[:500]) == b.process_text(TEXT[:500])
+
+def test_parallel_matches_sequential():
+    seq, par = EnigmaMachine(5), EnigmaMachine(5)
+    assert par.process_text(TEXT, workers=2, chunk_size=4096) == seq.process_text(TEXT)
+    assert par.tell() == seq.tell()
+    assert [r.position for r in par.rotors] == [r.position for r in seq.rotors]
+
+def test_process_chunks_match_one_shot():
+    data = TEXT.encode("utf-8")
+    machine = EnigmaMachine(11)
+    chunks = b"".join(machine.process(data[i:i + 777]) for i in range(0, len(data), 777))
+    assert chunks == EnigmaMachine(11).process(data)
+    assert EnigmaMachine(11).process(chunks) == data
+
+def test_reset_and_clone():
+    machine = EnigmaMachine(42)
+    first = machine.process_text("Hello Enigma")
+    clone = machine.clone()
+    assert clone.tell() == machine.tell()
+    assert clone.process_text(TEXT[:300]) == machine.process_text(TEXT[:300])
+    machine.reset()
+    assert machine.tell() == 0
+    assert machine.process_text("Hello Enigma") == first
+    # Máy clone chạy độc lập với máy gốc
+    assert clone.tell() != machine.tell()
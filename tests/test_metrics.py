@@ -0,0 +1,56 @@
+import pytest
+
+from tbcryptography import metrics
+from tbcryptography.tbcomplex.tfsc import TebeeFastStreamCipher
+from tbcryptography.tbstandard.caesar import CaesarCipher
+
+KEY = bytes(range(128))
+
+@pytest.fixture
+def enabled():
+    metrics.reset()
+    metrics.enable()
+    yield
+    metrics.disable()
+    metrics.reset()
+
+def test_enable_records_calls(enabled):
+    events = []
+    sink = lambda *args: events.append(args)
+    metrics.add_sink(sink)
+    try:
+        CaesarCipher().process("Hello", 3)
+        CaesarCipher().process_bytes(b"Hello world", 3)
+    finally:
+        metrics.remove_sink(sink)
+    stats = metrics.stats()["caesar"]
+    assert stats["process"]["calls"] == 1
+    assert stats["process"]["bytes"] == 5
+    assert stats["process_bytes"]["bytes"] == 11
+    assert [event[:3] for event in events] == [("caesar", "process", 5), ("caesar", "process_bytes", 11)]
+    assert "tbcryptography_calls_total{cipher=\"caesar\",op=\"process\"} 1" in metrics.prometheus_text()
+
+def test_many_and_file_sizes(enabled, tmp_path):
+    cipher = TebeeFastStreamCipher()
+    cipher.encrypt_many([b"x" * 10, b"y" * 20], KEY, workers=1)
+    path = tmp_path / "data.bin"
+    path.write_bytes(b"z" * 5000)
+    cipher.encrypt_file(path, KEY)
+    stats = metrics.stats()["tfsc"]
+    assert stats["encrypt_many"]["bytes"] == 30
+    assert stats["encrypt_file"]["bytes"] == 5000
+
+def test_errors_counted(enabled):
+    with pytest.raises(ValueError):
+        TebeeFastStreamCipher().decrypt_inplace(bytearray(17), KEY)
+    assert metrics.stats()["tfsc"]["decrypt_inplace"]["errors"] == 1
+
+def test_disable_restores_methods():
+    original = CaesarCipher.process
+    metrics.enable()
+    assert CaesarCipher.process is not original
+    metrics.disable()
+    assert CaesarCipher.process is original
+    metrics.reset()
+    CaesarCipher().process("Hello", 3)
+    assert metrics.stats() == {}
@@ -0,0 +1,54 @@
+import multiprocessing
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from tbcryptography import buffers
+from tbcryptography.tbcomplex.tfsc import TebeeFastStreamCipher, TFSCEncryptor, TFSCKey
+from tbcryptography.tbstandard.caesar import CaesarCipher
+from tbcryptography.tbstandard.enigma import EnigmaMachine
+from tbcryptography.tbstandard.vigenere import VigenereCipher
+
+KEY = bytes(range(128))
+
+def _round_trip(obj):
+    return pickle.loads(pickle.dumps(obj))
+
+def test_pickle_keeps_state():
+    assert _round_trip(CaesarCipher()).process("Hello", 3) == "Khoor"
+    stream = VigenereCipher().encryptor("KEY")
+    stream.update(b"abcde")
+    assert _round_trip(stream).update(b"xyz") == stream.update(b"xyz")
+    machine = EnigmaMachine(42)
+    machine.process_text("hello world" * 10)
+    copy = _round_trip(machine)
+    assert copy.tell() == machine.tell()
+    assert copy.process_text("more text") == machine.process_text("more text")
+    assert _round_trip(TFSCKey(KEY)).words == TFSCKey(KEY).words
+    enc = TFSCEncryptor(KEY)
+    enc.update(b"abc" * 7)
+    copy = _round_trip(enc)
+    assert copy.update(b"zz") == enc.update(b"zz")
+    assert copy.finalize() == enc.finalize()
+    assert _round_trip(buffers.BufferPool(per_class=3)).per_class == 3
+
+def _encrypt(args):
+    machine, data = args
+    return machine.process_text(data), bytes(TebeeFastStreamCipher().encrypt_many([data.encode()], KEY)[0])
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="cần fork")
+def test_fork_pool_while_locks_held():
+    machine = EnigmaMachine(9)
+    machine.process_text("warm up")
+    texts = [f"message {i}" for i in range(6)]
+    # Fork trong lúc thread khác giữ lock của pool buffer: process con phải tự dựng lại lock
+    buffers.pool._lock.acquire()
+    try:
+        context = multiprocessing.get_context("fork")
+        with ProcessPoolExecutor(2, mp_context=context) as pool:
+            results = list(pool.map(_encrypt, [(machine, text) for text in texts]))
+    finally:
+        buffers.pool._lock.release()
+    assert results == [_encrypt((machine.clone(), text)) for text in texts]
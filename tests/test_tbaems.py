@@ -0,0 +1,72 @@
+import io
+import os
+import random
+
+import pytest
+
+from tbcryptography import buffers
+from tbcryptography.tbcomplex.tbaems import TBAEMS
+from tbcryptography.tbcomplex.tbaems_container import TBAEMSReader, TBAEMSWriter
+
+NONCE = b"\1" * 16
+
+@pytest.fixture
+def cipher():
+    try:
+        cipher = TBAEMS(bytes(range(32)))
+    except OSError as exc:
+        pytest.skip(f"Không load được DLL tbaems: {exc}")
+    with cipher:
+        yield cipher
+    assert buffers.stats()["outstanding"] == 0
+
+@pytest.mark.parametrize("size", [0, 1, 15, 16, 1000, 4096, 10000])
+def test_container_round_trip(cipher, size):
+    rng = random.Random(size)
+    data = rng.randbytes(size)
+    f = io.BytesIO()
+    with TBAEMSWriter(f, cipher, chunk_size=64, workers=4) as writer:
+        pos = 0
+        while pos < size:
+            step = rng.randint(1, 200)
+            writer.write(data[pos:pos + step])
+            pos += step
+    with TBAEMSReader(f, cipher, workers=3) as reader:
+        assert len(reader) == size
+        assert reader.read() == data
+        assert b"".join(reader.iter_chunks()) == data
+        # Đọc cắt ngang biên chunk (64 byte) và vượt quá cuối dữ liệu
+        for offset, length in [(0, 64), (60, 8), (63, 130), (size - 1, 10), (size + 5, 3)]:
+            offset = max(offset, 0)
+            assert reader.read(offset, length) == data[offset:offset + length]
+
+def test_container_rejects_corruption(cipher):
+    f = io.BytesIO()
+    with TBAEMSWriter(f, cipher, chunk_size=64) as writer:
+        writer.write(os.urandom(300))
+    raw = bytearray(f.getvalue())
+    for cut in (raw[:10], raw[:-5]):
+        with pytest.raises(ValueError):
+            TBAEMSReader(io.BytesIO(bytes(cut)), cipher)
+
+def test_many_matches_single(cipher):
+    msgs = [os.urandom(n) for n in (0, 1, 16, 300)]
+    nonces = [os.urandom(16) for _ in msgs]
+    out = cipher.encrypt_many(msgs, nonces)
+    for msg, nonce, ct in zip(msgs, nonces, out):
+        buf = bytearray(msg)
+        cipher.encrypt(buf, nonce)
+        assert bytes(ct) == bytes(buf)
+    assert [bytes(x) for x in cipher.decrypt_many(out, nonces)] == msgs
+
+@pytest.mark.parametrize("size", [0, 1, 17, 200000])
+def test_file_round_trip(cipher, tmp_path, size):
+    data = os.urandom(size)
+    path = tmp_path / "data.bin"
+    path.write_bytes(data)
+    expected = bytearray(data)
+    cipher.encrypt(expected, NONCE)
+    assert cipher.encrypt_file(path, NONCE) == len(expected)
+    assert path.read_bytes() == expected
+    assert cipher.decrypt_file(path, NONCE) == size
+    assert path.read_bytes() == data
@@ -0,0 +1,57 @@
+import os
+
+import pytest
+
+from tbcryptography import backends
+from tbcryptography.tbcomplex.tbc import TripleBlockCipher
+
+MSGS = [os.urandom(n) for n in (0, 1, 10, 255, 256, 300, 5000)]
+
+@pytest.fixture
+def cipher():
+    try:
+        cipher = TripleBlockCipher()
+        cipher.encrypt(b"x", 1, 1.0)
+    except OSError as exc:
+        pytest.skip(f"Không load được DLL tbc: {exc}")
+    yield cipher
+    cipher.close()
+
+def test_enigma_tier_engines_identical(cipher, monkeypatch):
+    outputs = {}
+    for name in backends.engines("tbc_enigma"):
+        monkeypatch.setenv(backends.ENV_BACKEND, f"tbc_enigma={name}")
+        backends.reset()
+        with TripleBlockCipher() as fresh:
+            outputs[name] = [fresh.encrypt(m, 7, 1.5, as_bytes=True) for m in MSGS]
+    backends.reset()
+    assert len({tuple(out) for out in outputs.values()}) == 1, list(outputs)
+
+def test_into_matches_encrypt(cipher):
+    for msg in MSGS:
+        expected = cipher.encrypt(msg, 3, 0.5, as_bytes=True)
+        assert expected == bytes.fromhex(cipher.encrypt(msg, 3, 0.5))
+        out = bytearray(len(msg) + 10)
+        assert cipher.encrypt_into(memoryview(msg), out, 3, 0.5) == len(msg)
+        assert out[:len(msg)] == expected
+        back = bytearray(expected)
+        cipher.decrypt_into(back, back, 3, 0.5)
+        assert back == msg
+    with pytest.raises(ValueError):
+        cipher.encrypt_into(b"abc", bytearray(2), 1, 1.0)
+    with pytest.raises(TypeError):
+        cipher.encrypt_into(b"abc", b"xyz", 1, 1.0)
+
+def test_many_matches_single(cipher):
+    msgs = MSGS * 3
+    out = cipher.encrypt_many(msgs, 7, 1.5, workers=4)
+    assert out == [cipher.encrypt(m, 7, 1.5) for m in msgs]
+    raw = cipher.encrypt_many(msgs, 7, 1.5, workers=4, as_bytes=True)
+    assert cipher.decrypt_many(raw, 7, 1.5, as_bytes=True) == msgs
+
+def test_session_reuse(cipher):
+    with cipher.session(1, 1.0) as session:
+        assert session.encrypt(b"abc") == cipher.encrypt(b"abc", 1, 1.0)
+    assert session.closed
+    with pytest.raises(ValueError):
+        session.encrypt(b"abc")
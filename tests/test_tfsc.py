@@ -0,0 +1,78 @@
+import os
+
+import pytest
+
+from tbcryptography import backends
+from tbcryptography.tbcomplex.tfsc import TebeeFastStreamCipher, TFSCDecryptor, TFSCEncryptor, TFSCKey
+
+KEY = bytes(range(128))
+SIZES = [0, 1, 15, 16, 17, 1000, 70000]
+
+def _encrypt(data: bytes) -> bytes:
+    buf = bytearray(data)
+    TebeeFastStreamCipher().encrypt(buf, KEY)
+    return bytes(buf)
+
+@pytest.mark.parametrize("first_block", [0, 5])
+def test_engines_identical(first_block):
+    key = TFSCKey(KEY)
+    data = os.urandom(16 * 700)
+    outputs = {}
+    for name, engine in backends.engines("tfsc").items():
+        if name == "native" and first_block:
+            continue
+        buf = bytearray(data)
+        engine(memoryview(buf), key, first_block)
+        outputs[name] = bytes(buf)
+    assert len(set(outputs.values())) == 1, list(outputs)
+
+@pytest.mark.parametrize("size", SIZES)
+def test_stream_matches_one_shot(size):
+    data = os.urandom(size)
+    expected = _encrypt(data)
+    enc = TFSCEncryptor(KEY)
+    out = b"".join(enc.update(data[i:i + 333]) for i in range(0, size, 333)) + enc.finalize()
+    assert out == expected
+    dec = TFSCDecryptor(KEY)
+    back = b"".join(dec.update(out[i:i + 100]) for i in range(0, len(out), 100)) + dec.finalize()
+    assert back == data
+    assert TebeeFastStreamCipher().decrypt(bytearray(out), KEY, as_bytes=True) == data
+
+def test_inplace_buffer_and_prepared_key():
+    cipher = TebeeFastStreamCipher()
+    data = os.urandom(1000)
+    expected = _encrypt(data)
+    big = bytearray(2048)
+    big[100:1100] = data
+    assert cipher.encrypt_inplace(memoryview(big)[100:], cipher.prepare_key(KEY), 1000) == len(expected)
+    assert big[100:100 + len(expected)] == expected
+    assert cipher.decrypt_inplace(memoryview(big)[100:100 + len(expected)], KEY) == 1000
+    assert big[100:1100] == data
+    with pytest.raises(ValueError):
+        cipher.encrypt_inplace(bytearray(1000), KEY, 1000)
+    with pytest.raises(TypeError):
+        cipher.encrypt_inplace(b"x" * 32, KEY, 1)
+
+@pytest.mark.parametrize("size", SIZES)
+def test_file_round_trip(tmp_path, size):
+    cipher = TebeeFastStreamCipher()
+    data = os.urandom(size)
+    path = tmp_path / "data.bin"
+    path.write_bytes(data)
+    assert cipher.encrypt_file(path, KEY) == len(_encrypt(data))
+    assert path.read_bytes() == _encrypt(data)
+    assert cipher.decrypt_file(path, KEY) == size
+    assert path.read_bytes() == data
+
+def test_many_matches_single():
+    cipher = TebeeFastStreamCipher()
+    msgs = [os.urandom(n) for n in (0, 1, 16, 255, 5000)] * 3
+    expected = [_encrypt(m) for m in msgs]
+    out = cipher.encrypt_many(msgs, KEY, workers=3)
+    assert [bytes(x) for x in out] == expected
+    assert [bytes(x) for x in cipher.decrypt_many(out, KEY, workers=3)] == msgs
+    offsets = [0]
+    for m in msgs:
+        offsets.append(offsets[-1] + len(m))
+    packed = cipher.encrypt_many(b"".join(msgs), KEY, offsets=offsets, workers=1)
+    assert [bytes(x) for x in packed] == expected
@@ -0,0 +1,28 @@
+import pytest
+
+from tbcryptography.tbstandard.vigenere import VigenereCipher
+
+DATA = b"Attack at dawn!\0\0Xin ch\xc3\xa0o, Tebee\0" * 500
+
+@pytest.mark.parametrize("step", [1, 7, 100, len(DATA)])
+def test_stream_matches_one_shot(step):
+    cipher = VigenereCipher()
+    expected = cipher.encrypt_bytes(DATA, "LeMon")
+    assert len(expected) == len(DATA)
+    stream = cipher.encryptor("LeMon")
+    out = b"".join(stream.update(DATA[i:i + step]) for i in range(0, len(DATA), step)) + stream.finalize()
+    assert out == expected
+    stream = cipher.decryptor("LeMon")
+    assert b"".join(stream.update(out[i:i + step]) for i in range(0, len(out), step)) == DATA
+
+def test_offset_continues_key():
+    cipher = VigenereCipher()
+    stream = cipher.encryptor("LeMon")
+    head = stream.update(DATA[:33])
+    assert head + cipher.encrypt_bytes(DATA[33:], "LeMon", offset=stream.offset) == cipher.encrypt_bytes(DATA, "LeMon")
+
+def test_text_api_unchanged():
+    cipher = VigenereCipher()
+    assert cipher.encrypt("Attack at dawn", "LEMON") == "Lxfopv ef rnhr"
+    assert cipher.decrypt("Lxfopv ef rnhr", "LEMON") == "Attack at dawn"
+    assert cipher.encrypt_bytes(b"Attack at dawn", "LEMON") == b"Lxfopv ef rnhr"